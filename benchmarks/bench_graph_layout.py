@@ -0,0 +1,84 @@
+# benchmarks/bench_graph_layout.py
+"""
+Measures how the commit graph layout scales with history size.
+
+Run from the repository root:
+    python -m benchmarks.bench_graph_layout [max_commits]
+
+The layout is linear in the number of commits (apart from a log factor in the
+number of lanes), so the time per commit should stay roughly flat from 10k to
+1M commits.
+"""
+
+import random
+import sys
+import time
+from typing import List, Dict, Any
+
+from ui.graph_layout import GraphLayout
+
+BRANCH_PROBABILITY = 0.02  # Chance that a commit starts a new feature branch
+MERGE_PROBABILITY = 0.03  # Chance that a commit merges a feature branch into main
+MAX_OPEN_BRANCHES = 12
+
+
+def make_history(commit_count: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Builds a synthetic history with feature branches and merges, newest first like 'git log'."""
+    rng = random.Random(seed)
+    commits = []
+    main_tip = None
+    branch_tips: List[str] = []
+    for index in range(commit_count):
+        commit_hash = f"{index:040x}"
+        roll = rng.random()
+        if branch_tips and roll < MERGE_PROBABILITY:
+            # Merge commit on main: first parent main, second a feature branch tip
+            parents = [main_tip, branch_tips.pop(rng.randrange(len(branch_tips)))]
+            main_tip = commit_hash
+        elif main_tip and roll < MERGE_PROBABILITY + BRANCH_PROBABILITY and len(branch_tips) < MAX_OPEN_BRANCHES:
+            parents = [main_tip]  # New feature branch off main
+            branch_tips.append(commit_hash)
+        elif branch_tips and rng.random() < 0.5:
+            # Work on an existing feature branch
+            branch_index = rng.randrange(len(branch_tips))
+            parents = [branch_tips[branch_index]]
+            branch_tips[branch_index] = commit_hash
+        else:
+            parents = [main_tip] if main_tip else []
+            main_tip = commit_hash
+        commits.append({"hash": commit_hash, "parents": parents, "date_ts": index})
+    commits.reverse()  # Children before parents, as 'git log' emits them
+    return commits
+
+
+def time_layout(commits: List[Dict[str, Any]]) -> float:
+    """Returns the seconds needed to lay out the commits."""
+    layout = GraphLayout()
+    start = time.perf_counter()
+    layout.append(commits)
+    elapsed = time.perf_counter() - start
+    assert len(layout) == len(commits)
+    return elapsed
+
+
+def main():
+    max_commits = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    sizes = [size for size in (10_000, 100_000, 1_000_000) if size <= max_commits]
+    results = []
+    for size in sizes:
+        commits = make_history(size)
+        elapsed = time_layout(commits)
+        results.append((size, elapsed))
+        print(
+            f"{size:>9} commits: {elapsed:7.3f} s  ({elapsed / size * 1e6:6.2f} us/commit)"
+        )
+    if len(results) > 1:
+        (small_n, small_t), (large_n, large_t) = results[0], results[-1]
+        print(
+            f"Time grew {large_t / small_t:.1f}x for {large_n / small_n:.0f}x more commits "
+            f"(linear scaling would be {large_n / small_n:.0f}x)."
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_status.py
+"""
+Checks the in-process status (git_ops.worktree_status) against 'git status'
+on a real repository and compares their speed.
+
+Run from the repository root:
+    python -m benchmarks.bench_status <repository> [rounds]
+
+The first in-process round parses the index and may hash files whose stat
+data is stale; later rounds reuse that work, which is the case that matters
+for the refresh-on-every-change pattern of the UI.
+
+It also times the two steps of a deferred refresh (staged/unstaged changes
+first, then the untracked scan) to show how much sooner the first lists
+appear.
+"""
+
+import sys
+import time
+from typing import List, Tuple
+
+from git_ops.object_store import GitObjectStore
+from git_ops.porcelain import StatusEntry, read_status
+from git_ops.worktree_status import WorkingTreeStatus
+
+
+def summarize(entries: List[StatusEntry]) -> List[Tuple[str, str, str]]:
+    """What both sides must agree on: (XY, path, rename source) per record."""
+    return sorted((entry.xy, entry.path, entry.orig_path) for entry in entries)
+
+
+def main():
+    repo_path = sys.argv[1] if len(sys.argv) > 1 else "."
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    status = WorkingTreeStatus(repo_path, GitObjectStore(repo_path))
+
+    started = time.perf_counter()
+    expected = read_status(repo_path)
+    git_seconds = time.perf_counter() - started
+
+    in_process_seconds = []
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = status.compute()
+        in_process_seconds.append(time.perf_counter() - started)
+
+    if result is None:
+        status.close()
+        print("In-process status not supported for this repository (falls back to git).")
+        return
+    got, want = summarize(result), summarize(expected)
+    matches = got == want
+    if not matches:
+        print("records differ:")
+        print(f"  in-process only: {sorted(set(got) - set(want))}")
+        print(f"  git status only: {sorted(set(want) - set(got))}")
+    print(f"{len(result)} records: " + ("identical to git status" if matches else "MISMATCH"))
+    print(f"git status:            {git_seconds * 1000:8.1f} ms")
+    print(f"in-process, first run: {in_process_seconds[0] * 1000:8.1f} ms")
+    if rounds > 1:
+        print(f"in-process, best rerun:{min(in_process_seconds[1:]) * 1000:8.1f} ms")
+    print("last phases (ms): " + ", ".join(
+        f"{phase} {seconds * 1000:.1f}" for phase, seconds in status.last_timings.items()
+    ))
+
+    # Deferred untracked scan: the first lists only wait for the tracked step
+    started = time.perf_counter()
+    read_status(repo_path, untracked="no")
+    git_tracked = time.perf_counter() - started
+    started = time.perf_counter()
+    status.compute(include_untracked=False)
+    in_process_tracked = time.perf_counter() - started
+    started = time.perf_counter()
+    status.compute_untracked()
+    in_process_untracked = time.perf_counter() - started
+    status.close()
+    print(
+        f"git status -uno:       {git_tracked * 1000:8.1f} ms"
+        f"  (first lists {(git_seconds - git_tracked) * 1000:.1f} ms sooner)"
+    )
+    print(
+        f"in-process tracked:    {in_process_tracked * 1000:8.1f} ms"
+        f"  (untracked scan after it: {in_process_untracked * 1000:.1f} ms)"
+    )
+    if not matches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
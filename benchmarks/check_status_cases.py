@@ -0,0 +1,167 @@
+# benchmarks/check_status_cases.py
+"""
+Checks the in-process status (git_ops.worktree_status) against 'git status'
+in small temporary repositories, one per tricky case: entries git smudged
+for being racily clean, nested .gitattributes, the executable bit, a file
+replaced by a symlink, ignore negation and untracked directories.
+
+Run from the repository root:
+    python -m benchmarks.check_status_cases
+
+Exits with status 1 if any case differs. A case may allow the in-process
+status to give up (compute() returning None, so the UI asks git); it must
+never give a different answer.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_status import summarize
+from git_ops.object_store import GitObjectStore
+from git_ops.porcelain import read_status
+from git_ops.worktree_status import WorkingTreeStatus
+
+# Far enough ahead that every index written during a case is older: entries with
+# this mtime are racily clean, whatever the file system's timestamp precision
+FUTURE_SECONDS = 3600
+
+
+def git(repo_path: str, *args: str):
+    subprocess.run(
+        ["git", "-c", "user.name=check", "-c", "user.email=check@example.com", *args],
+        cwd=repo_path,
+        check=True,
+        capture_output=True,
+    )
+
+
+def write(repo_path: str, path: str, content: bytes, mtime: float = None):
+    full_path = os.path.join(repo_path, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "wb") as file:
+        file.write(content)
+    if mtime is not None:
+        os.utime(full_path, (mtime, mtime))
+
+
+def case_smudged_entry(repo_path: str):
+    """A racily clean entry whose content changed is stored with size 0; reverting the file makes it clean again."""
+    future = time.time() + FUTURE_SECONDS
+    write(repo_path, "f.txt", b"hello\n", future)
+    git(repo_path, "add", "f.txt")
+    git(repo_path, "commit", "-m", "initial")
+    # Same size and mtime: only the content tells it changed, which git records
+    # by storing size 0 when it next writes the index
+    write(repo_path, "f.txt", b"HELLO\n", future)
+    write(repo_path, "g.txt", b"other\n")
+    git(repo_path, "add", "g.txt")  # Writes the index, smudging the racy entry
+    write(repo_path, "f.txt", b"hello\n", future)
+
+
+def case_nested_attributes(repo_path: str):
+    """A .gitattributes below the root converts line endings of the files next to it."""
+    write(repo_path, "sub/f.txt", b"a\r\nb\r\n")
+    write(repo_path, "sub/.gitattributes", b"* text eol=crlf\n")
+    git(repo_path, "add", ".")
+    git(repo_path, "commit", "-m", "initial")
+    # Stat data no longer matching the index makes the content count
+    os.utime(os.path.join(repo_path, "sub/f.txt"), (time.time() - 60, time.time() - 60))
+
+
+def case_untracked_nested_attributes(repo_path: str):
+    """Like case_nested_attributes, with the .gitattributes itself untracked."""
+    write(repo_path, "sub/f.txt", b"a\r\nb\r\n")
+    git(repo_path, "add", ".")
+    git(repo_path, "commit", "-m", "initial")
+    write(repo_path, "sub/.gitattributes", b"* text eol=crlf\n")
+
+
+def case_executable_bit(repo_path: str):
+    write(repo_path, "run.sh", b"echo run\n")
+    write(repo_path, "other.sh", b"echo other\n")
+    git(repo_path, "add", ".")
+    git(repo_path, "commit", "-m", "initial")
+    os.chmod(os.path.join(repo_path, "run.sh"), 0o755)
+
+
+def case_symlink_type_change(repo_path: str):
+    write(repo_path, "target.txt", b"target\n")
+    write(repo_path, "link", b"not yet a link\n")
+    git(repo_path, "add", ".")
+    git(repo_path, "commit", "-m", "initial")
+    os.remove(os.path.join(repo_path, "link"))
+    os.symlink("target.txt", os.path.join(repo_path, "link"))
+
+
+def case_ignore_negation(repo_path: str):
+    write(repo_path, ".gitignore", b"*.log\n!keep.log\nbuild/\n!build/\n/only-root.tmp\n")
+    write(repo_path, "sub/.gitignore", b"!sub.log\n")
+    git(repo_path, "add", ".")
+    git(repo_path, "commit", "-m", "initial")
+    for path in ("a.log", "keep.log", "sub/b.log", "sub/sub.log", "build/out.o", "only-root.tmp", "sub/only-root.tmp"):
+        write(repo_path, path, b"x\n")
+
+
+def case_untracked_dirs(repo_path: str):
+    write(repo_path, ".gitignore", b"*.o\n")
+    write(repo_path, "src/main.c", b"int main;\n")
+    git(repo_path, "add", ".")
+    git(repo_path, "commit", "-m", "initial")
+    write(repo_path, "new/deep/file.c", b"x\n")  # Listed as 'new/'
+    write(repo_path, "objs/a.o", b"x\n")  # Only ignored content: not listed
+    os.makedirs(os.path.join(repo_path, "empty/dir"))  # Empty: not listed
+    write(repo_path, "src/extra.c", b"x\n")  # In a tracked directory: listed as a file
+    write(repo_path, "src/main.c", b"int main(void);\n")  # And one unstaged change
+
+
+# (case, whether compute() may fall back to git for it)
+CASES = [
+    (case_smudged_entry, False),
+    (case_nested_attributes, True),
+    (case_untracked_nested_attributes, True),
+    (case_executable_bit, False),
+    (case_symlink_type_change, False),
+    (case_ignore_negation, False),
+    (case_untracked_dirs, False),
+]
+
+
+def check(case, may_fall_back: bool) -> bool:
+    repo_path = tempfile.mkdtemp(prefix="status-check-")
+    status = None
+    try:
+        git(repo_path, "init", "-q")
+        git(repo_path, "config", "core.autocrlf", "false")
+        case(repo_path)
+        want = summarize(read_status(repo_path))
+        status = WorkingTreeStatus(repo_path, GitObjectStore(repo_path))
+        result = status.compute()
+        if result is None:
+            print(f"{case.__name__}: " + ("ok (falls back to git)" if may_fall_back else "FELL BACK to git"))
+            return may_fall_back
+        got = summarize(result)
+        if got != want:
+            print(f"{case.__name__}: MISMATCH")
+            print(f"  in-process only: {sorted(set(got) - set(want))}")
+            print(f"  git status only: {sorted(set(want) - set(got))}")
+            return False
+        print(f"{case.__name__}: ok ({len(got)} records)")
+        return True
+    finally:
+        if status is not None:
+            status.close()
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+
+def main():
+    results = [check(case, may_fall_back) for case, may_fall_back in CASES]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,59 @@
 # git_ops/commands.py
+import codecs
 import subprocess
-import os
+import tempfile
+import time
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from .environment import git_env
+
+# --- Streaming Constants ---
+STREAM_FIRST_BATCH_SIZE = 64  # Small first batch so the first screen shows up quickly
+STREAM_BATCH_SIZE = 2000  # Items per batch once the first screen is filled
+STREAM_FLUSH_INTERVAL = 0.1  # Seconds; flush a partial batch at least this often
+STREAM_READ_SIZE = 64 * 1024  # Bytes read from the pipe at a time in chunked mode
+STREAM_TEXT_BATCH_BYTES = 1024 * 1024  # Chunked mode: text gathered per batch after the first
+
 
 class GitCommandThread(QThread):
     """Runs a Git command in a separate thread."""
 
     # Single signal: Emits (thread_instance, success_bool, stdout_str, stderr_str)
     command_finished = pyqtSignal(object, bool, str, str)
+    # Streaming mode only: Emits (thread_instance, list_of_parsed_items) while stdout arrives.
+    # Declared as object so the list is passed as is instead of being converted
+    # to a QVariantList and back (which copies every string in it twice).
+    batch_ready = pyqtSignal(object, object)
 
     # command_output = pyqtSignal(str) # No longer needed
     # command_error = pyqtSignal(str) # No longer needed
 
-    def __init__(self, command_list, cwd):
+    def __init__(
+        self,
+        command_list,
+        cwd,
+        line_parser=None,
+        read_only=False,
+        chunked=False,
+        max_bytes=None,
+        max_lines=None,
+    ):
         super().__init__()
         self.command_list = command_list
         self.cwd = cwd
+        self.read_only = read_only  # Read-only commands take no optional locks (see git_env())
+        # If set, stdout is read line by line and each line is passed through
+        # line_parser (returning an item or None to skip it). Parsed items are
+        # emitted in batches via batch_ready instead of in command_finished.
+        self.line_parser = line_parser
+        # Chunked mode: stdout is emitted via batch_ready as decoded text
+        # chunks (each batch a one-item list), without any per-line work.
+        # Reading stops at the last full line within max_bytes/max_lines;
+        # the process is then killed and `truncated` set.
+        self.chunked = chunked
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.truncated = False
         if not self.cwd:
             raise ValueError(
                 "Cannot run Git command without a working directory (cwd)."
@@ -27,22 +64,25 @@ class GitCommandThread(QThread):
         stderr = ""
         success = False
         try:
-            env = os.environ.copy()
-            env["LANG"] = "C"
-            env["LC_ALL"] = "C"
+            env = git_env(self.read_only)
 
-            process = subprocess.run(
-                self.command_list,
-                capture_output=True,
-                text=True,
-                check=False,
-                cwd=self.cwd,
-                env=env,
-                encoding="utf-8",
-            )
-            stdout = process.stdout
-            stderr = process.stderr
-            success = process.returncode == 0
+            if self.chunked:
+                success, stderr = self._run_chunked(env)
+            elif self.line_parser is not None:
+                success, stderr = self._run_streaming(env)
+            else:
+                process = subprocess.run(
+                    self.command_list,
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                    cwd=self.cwd,
+                    env=env,
+                    encoding="utf-8",
+                )
+                stdout = process.stdout
+                stderr = process.stderr
+                success = process.returncode == 0
 
         except FileNotFoundError:
             stderr = f"Error: 'git' command not found. Is Git installed and in PATH?"
@@ -53,3 +93,137 @@ class GitCommandThread(QThread):
         finally:
             # Emit results regardless of success/failure in run()
             self.command_finished.emit(self, success, stdout, stderr)
+
+    def _run_streaming(self, env):
+        """Reads stdout incrementally, emitting parsed items in batches. Returns (success, stderr)."""
+        # stderr goes to a temp file so a chatty stderr can never block the stdout pipe
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                self.command_list,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                cwd=self.cwd,
+                env=env,
+                text=True,
+                encoding="utf-8",
+                errors="replace",  # Don't abort a long stream on one bad byte
+            )
+            batch = []
+            batch_limit = STREAM_FIRST_BATCH_SIZE
+            last_flush = time.monotonic()
+            for line in process.stdout:
+                item = self.line_parser(line.rstrip("\n"))
+                if item is None:
+                    continue
+                batch.append(item)
+                if (
+                    len(batch) >= batch_limit
+                    or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL
+                ):
+                    self.batch_ready.emit(self, batch)
+                    batch = []
+                    batch_limit = STREAM_BATCH_SIZE
+                    last_flush = time.monotonic()
+            if batch:
+                self.batch_ready.emit(self, batch)
+            process.stdout.close()
+            returncode = process.wait()
+
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+        return returncode == 0, stderr
+
+    def _run_chunked(self, env):
+        """Reads stdout as text chunks up to the limits, emitting them in batches. Returns (success, stderr)."""
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                self.command_list,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file,
+                cwd=self.cwd,
+                env=env,
+            )
+            # Chunks may end inside a multi-byte character; the decoder carries it over
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            pending = []
+            pending_size = 0
+            first_batch = True
+            total_bytes = 0
+            total_lines = 0
+            last_flush = time.monotonic()
+            while True:
+                data = process.stdout.read1(STREAM_READ_SIZE)
+                if not data:
+                    break
+                data = self._within_limits(data, total_bytes, total_lines)
+                total_bytes += len(data)
+                total_lines += data.count(b"\n")
+                pending.append(decoder.decode(data))
+                pending_size += len(data)
+                if (
+                    first_batch  # The first screen shows as soon as anything arrives
+                    or self.truncated
+                    or pending_size >= STREAM_TEXT_BATCH_BYTES
+                    or time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL
+                ):
+                    self.batch_ready.emit(self, ["".join(pending)])
+                    pending = []
+                    pending_size = 0
+                    first_batch = False
+                    last_flush = time.monotonic()
+                if self.truncated:
+                    process.kill()  # The rest is never read
+                    break
+            pending.append(decoder.decode(b"", final=True))
+            if "".join(pending):
+                self.batch_ready.emit(self, ["".join(pending)])
+            process.stdout.close()
+            returncode = process.wait()
+
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode("utf-8", errors="replace")
+        # A killed process fails, but the part read is what was asked for
+        return self.truncated or returncode == 0, stderr
+
+    def _within_limits(self, data: bytes, total_bytes: int, total_lines: int) -> bytes:
+        """Cuts `data` after the last full line within max_bytes/max_lines (setting `truncated`)."""
+        end = len(data)
+        if self.max_bytes is not None and total_bytes + end > self.max_bytes:
+            end = data.rfind(b"\n", 0, self.max_bytes - total_bytes) + 1
+            self.truncated = True
+        if self.max_lines is not None and total_lines + data.count(b"\n", 0, end) >= self.max_lines:
+            # Find the end of the last allowed line
+            position = 0
+            for _ in range(self.max_lines - total_lines):
+                position = data.find(b"\n", position) + 1
+            # Output ending exactly at the cap isn't truncated; only cut if more follows
+            if position < len(data) or self.truncated:
+                end = min(end, position)
+                self.truncated = True
+        return data[:end]
+
+
+class GitFunctionThread(QThread):
+    """Runs a Python function (e.g. reading objects from a long-lived git process) in a separate thread."""
+
+    # Same signals as GitCommandThread, so both can be scheduled alike.
+    # stdout is always "" here; the function's return value is kept in `result`.
+    command_finished = pyqtSignal(object, bool, str, str)
+    batch_ready = pyqtSignal(object, object)
+
+    def __init__(self, function):
+        super().__init__()
+        self.function = function
+        self.result = None
+
+    def run(self):
+        stderr = ""
+        success = False
+        try:
+            self.result = self.function()
+            success = True
+        except Exception as e:
+            stderr = f"An unexpected error occurred: {e}"
+            success = False
+        finally:
+            self.command_finished.emit(self, success, "", stderr)
@@ -0,0 +1,243 @@
+# git_ops/commit_graph.py
+"""
+Reader for git's commit-graph files and a history walker built on it.
+
+The commit-graph (.git/objects/info/commit-graph, or a split chain under
+info/commit-graphs/) stores every commit's parents and commit time in fixed
+size records, so walking the history needs no object parsing at all. Commits
+newer than the file are read from the object store instead.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+from typing import List, Dict, Tuple, Optional, Any
+
+from .object_store import find_git_dir, find_common_dir
+from .objects import parse_commit
+
+GRAPH_SIGNATURE = b"CGPH"
+GRAPH_VERSION = 1
+GRAPH_HASH_SHA1 = 1
+OID_SIZE = 20
+# Parent fields of a CDAT record
+GRAPH_PARENT_NONE = 0x70000000
+GRAPH_EXTRA_EDGES = 0x80000000  # Second parent field: index into the EDGE chunk
+GRAPH_LAST_EDGE = 0x80000000  # EDGE entry: last parent of the commit
+CDAT_RECORD_SIZE = OID_SIZE + 16
+
+
+class CommitGraphLayer:
+    """One memory-mapped commit-graph file."""
+
+    def __init__(self, path: str, position_offset: int):
+        self.path = path
+        self.position_offset = position_offset  # Global position of this layer's first commit
+        with open(path, "rb") as graph_file:
+            self._data = mmap.mmap(graph_file.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._data
+        signature, version, hash_version, chunk_count, _base_count = struct.unpack_from(
+            ">4sBBBB", data, 0
+        )
+        if signature != GRAPH_SIGNATURE or version != GRAPH_VERSION:
+            raise ValueError(f"not a commit-graph file: {path}")
+        if hash_version != GRAPH_HASH_SHA1:
+            raise ValueError("only SHA-1 commit-graphs are supported")
+        chunks = {}
+        for index in range(chunk_count):
+            chunk_id, offset = struct.unpack_from(">4sQ", data, 8 + index * 12)
+            chunks[chunk_id] = offset
+        for required in (b"OIDF", b"OIDL", b"CDAT"):
+            if required not in chunks:
+                raise ValueError(f"commit-graph without {required.decode()} chunk")
+        self._fanout = struct.unpack_from(">256I", data, chunks[b"OIDF"])
+        self.count = self._fanout[255]
+        self._oids_start = chunks[b"OIDL"]
+        self._cdat_start = chunks[b"CDAT"]
+        self._edges_start = chunks.get(b"EDGE")
+
+    def close(self):
+        self._data.close()
+
+    def oid_at(self, index: int) -> bytes:
+        start = self._oids_start + index * OID_SIZE
+        return self._data[start : start + OID_SIZE]
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """Returns the local index of a commit, or None. Binary search within the fan-out bucket."""
+        first_byte = oid[0]
+        low = self._fanout[first_byte - 1] if first_byte else 0
+        high = self._fanout[first_byte]
+        data = self._data
+        start = self._oids_start
+        while low < high:
+            middle = (low + high) // 2
+            middle_start = start + middle * OID_SIZE
+            middle_oid = data[middle_start : middle_start + OID_SIZE]
+            if middle_oid < oid:
+                low = middle + 1
+            elif middle_oid > oid:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def record(self, index: int) -> Tuple[List[int], int, int]:
+        """Returns (parent global positions, commit time, generation) of a local index."""
+        start = self._cdat_start + index * CDAT_RECORD_SIZE + OID_SIZE  # Skip the tree id
+        parent1, parent2, high, low = struct.unpack_from(">IIII", self._data, start)
+        generation = high >> 2
+        commit_time = ((high & 0x3) << 32) | low
+        parents = []
+        if parent1 != GRAPH_PARENT_NONE:
+            parents.append(parent1)
+            if parent2 & GRAPH_EXTRA_EDGES:
+                # Octopus merge: parents 2.. are listed in the EDGE chunk
+                edge_index = parent2 & 0x7FFFFFFF
+                while True:
+                    edge = struct.unpack_from(">I", self._data, self._edges_start + edge_index * 4)[0]
+                    parents.append(edge & 0x7FFFFFFF)
+                    if edge & GRAPH_LAST_EDGE:
+                        break
+                    edge_index += 1
+            elif parent2 != GRAPH_PARENT_NONE:
+                parents.append(parent2)
+        return parents, commit_time, generation
+
+
+class CommitGraph:
+    """All layers of a repository's commit-graph, addressed by global position."""
+
+    def __init__(self, layers: List[CommitGraphLayer]):
+        self.layers = layers  # Base layer first
+        self.count = sum(layer.count for layer in layers)
+
+    @classmethod
+    def open(cls, repo_path: str) -> Optional["CommitGraph"]:
+        """Opens the repository's commit-graph (single file or split chain), or returns None."""
+        git_dir = find_git_dir(repo_path)
+        if not git_dir:
+            return None
+        info_dir = os.path.join(find_common_dir(git_dir), "objects", "info")
+        paths = []
+        chain_path = os.path.join(info_dir, "commit-graphs", "commit-graph-chain")
+        try:
+            with open(chain_path, "r", encoding="ascii") as chain_file:
+                paths = [
+                    os.path.join(info_dir, "commit-graphs", f"graph-{line.strip()}.graph")
+                    for line in chain_file
+                    if line.strip()
+                ]
+        except OSError:
+            single_path = os.path.join(info_dir, "commit-graph")
+            if os.path.isfile(single_path):
+                paths = [single_path]
+        if not paths:
+            return None
+        layers = []
+        position_offset = 0
+        try:
+            for path in paths:
+                layer = CommitGraphLayer(path, position_offset)
+                layers.append(layer)
+                position_offset += layer.count
+        except (OSError, ValueError, struct.error) as e:
+            print(f"Ignoring commit-graph: {e}")
+            for layer in layers:
+                layer.close()
+            return None
+        return cls(layers)
+
+    def close(self):
+        for layer in self.layers:
+            layer.close()
+
+    def _layer_of(self, position: int) -> Tuple[CommitGraphLayer, int]:
+        for layer in self.layers:
+            if position < layer.position_offset + layer.count:
+                return layer, position - layer.position_offset
+        raise IndexError(position)
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """Returns the global position of a commit, or None if it isn't in the graph."""
+        for layer in reversed(self.layers):  # Newest layer first: recent commits are asked most
+            index = layer.find(oid)
+            if index is not None:
+                return layer.position_offset + index
+        return None
+
+    def oid_at(self, position: int) -> bytes:
+        layer, index = self._layer_of(position)
+        return layer.oid_at(index)
+
+    def record(self, position: int) -> Tuple[List[int], int, int]:
+        layer, index = self._layer_of(position)
+        return layer.record(index)
+
+
+class HistoryWalker:
+    """
+    Yields commits reachable from a tip in the order of a plain 'git log':
+    newest commit time first, ties in the order they were discovered.
+
+    Commits come from the commit-graph when possible (no object parsing);
+    commits newer than the graph are read through `object_reader`.
+    Each produced commit is a dict with hash, parents and date_ts (the commit
+    time); author and subject are left for callers to fetch when needed.
+    """
+
+    def __init__(self, graph: Optional[CommitGraph], object_reader, tip: str):
+        self.graph = graph
+        self.object_reader = object_reader
+        # Heap of (-commit time, sequence, oid, parent oids); the sequence keeps ties in discovery order
+        self._queue: List[Tuple[int, int, bytes, List[bytes]]] = []
+        self._seen = set()  # Commit ids ever queued
+        self._sequence = 0
+        self.produced = 0  # Commits returned so far
+        self._push(bytes.fromhex(tip))
+
+    def _lookup(self, oid: bytes) -> Tuple[List[bytes], int]:
+        """Returns (parent ids, commit time) of a commit."""
+        if self.graph is not None:
+            position = self.graph.find(oid)
+            if position is not None:
+                parent_positions, commit_time, _generation = self.graph.record(position)
+                return [self.graph.oid_at(parent) for parent in parent_positions], commit_time
+        found = self.object_reader.read(oid.hex())
+        if found is None or found[0] != "commit":
+            raise ValueError(f"commit {oid.hex()} not found")
+        commit = parse_commit(found[1])
+        committer = commit["committer"] or commit["author"] or {"ts": 0}
+        return [bytes.fromhex(parent) for parent in commit["parents"]], committer["ts"]
+
+    def _push(self, oid: bytes):
+        if oid in self._seen:
+            return
+        self._seen.add(oid)
+        parents, commit_time = self._lookup(oid)
+        heapq.heappush(self._queue, (-commit_time, self._sequence, oid, parents))
+        self._sequence += 1
+
+    def next_commits(self, count: int) -> List[Dict[str, Any]]:
+        """Returns up to `count` further commits (fewer once the history is exhausted)."""
+        commits = []
+        queue = self._queue
+        while queue and len(commits) < count:
+            negative_time, _sequence, oid, parents = heapq.heappop(queue)
+            for parent in parents:
+                self._push(parent)
+            commits.append(
+                {
+                    "hash": oid.hex(),
+                    "parents": [parent.hex() for parent in parents],
+                    "date_ts": -negative_time,
+                }
+            )
+        self.produced += len(commits)
+        return commits
+
+    def skip(self, count: int):
+        """Advances past `count` commits (e.g. the pages restored from the history cache)."""
+        while count > 0 and self._queue:
+            count -= len(self.next_commits(min(count, 10000)))
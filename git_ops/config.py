@@ -0,0 +1,107 @@
+# git_ops/config.py
+"""
+Minimal reader for git configuration files.
+
+Only what is needed to decide how to read the repository natively: plain
+'[section]' / '[section "subsection"]' headers and 'key = value' lines.
+'[include] path' is followed; conditional '[includeIf]' sections are kept
+as plain 'includeif.<condition>.path' entries, not evaluated, so callers
+that need exact values can tell they are present (see has_conditional_includes()).
+"""
+
+import os
+from typing import Dict, List, Optional
+
+CONFIG_TRUE = ("true", "yes", "on", "1", "")  # A bare 'key' line means true
+MAX_INCLUDE_DEPTH = 10  # Like git, which refuses deeper (likely circular) includes
+
+
+def _unquote(value: str) -> str:
+    """Removes comments and quoting from a raw config value."""
+    result = []
+    quoted = False
+    index = 0
+    while index < len(value):
+        char = value[index]
+        if char == '"':
+            quoted = not quoted
+        elif char in "#;" and not quoted:
+            break
+        elif char == "\\" and index + 1 < len(value):
+            index += 1
+            result.append({"n": "\n", "t": "\t"}.get(value[index], value[index]))
+        else:
+            result.append(char)
+        index += 1
+    return "".join(result).strip()
+
+
+def parse_config_file(path: str, values: Dict[str, str], depth: int = 0):
+    """
+    Adds the entries of one config file to `values` (key: 'section[.subsection].name'),
+    and those of the files it includes where the include stands.
+    """
+    if depth > MAX_INCLUDE_DEPTH:
+        return
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as config_file:
+            lines = config_file.read().splitlines()
+    except OSError:
+        return
+    section = ""
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.startswith("["):
+            header = line[1 : line.find("]")] if "]" in line else line[1:]
+            name, _, subsection = header.partition(" ")
+            section = name.lower()
+            if subsection:
+                # Subsection names are case sensitive
+                section += "." + subsection.strip().strip('"')
+            continue
+        key, has_value, value = line.partition("=")
+        full_key = f"{section}.{key.strip().lower()}"
+        value = _unquote(value) if has_value else ""
+        if full_key == "include.path":
+            if value:
+                # Relative to the including file's directory; '~/' is the home directory
+                include_path = os.path.join(os.path.dirname(path), os.path.expanduser(value))
+                parse_config_file(include_path, values, depth + 1)
+            continue
+        values[full_key] = value
+
+
+def global_config_paths() -> List[str]:
+    """Returns the system and user config files, lowest precedence first."""
+    home = os.path.expanduser("~")
+    xdg_config = os.environ.get("XDG_CONFIG_HOME") or os.path.join(home, ".config")
+    return [
+        "/etc/gitconfig",
+        os.path.join(xdg_config, "git", "config"),
+        os.path.join(home, ".gitconfig"),
+    ]
+
+
+def read_git_config(git_dir: str, common_dir: Optional[str] = None) -> Dict[str, str]:
+    """Returns the effective configuration of a repository (later files override earlier ones)."""
+    values: Dict[str, str] = {}
+    for path in global_config_paths():
+        parse_config_file(path, values)
+    parse_config_file(os.path.join(common_dir or git_dir, "config"), values)
+    if common_dir and common_dir != git_dir:
+        parse_config_file(os.path.join(git_dir, "config.worktree"), values)
+    return values
+
+
+def has_conditional_includes(values: Dict[str, str]) -> bool:
+    """True if an '[includeIf]' section may add values that weren't read."""
+    return any(key.startswith("includeif.") for key in values)
+
+
+def config_bool(values: Dict[str, str], key: str, default: bool = False) -> bool:
+    value = values.get(key)
+    if value is None:
+        return default
+    return value.lower() in CONFIG_TRUE
@@ -0,0 +1,83 @@
+# git_ops/diff_filter.py
+"""
+Early checks that decide whether a file's diff is worth loading at all.
+
+Binary files and generated files (lock files, minified bundles, protobuf
+output, ...) can produce huge diffs nobody reads. They are recognised from
+the path and the first few KB of the file, before any diff is started.
+"""
+
+import fnmatch
+import os
+from typing import List, Optional
+
+from .objects import BINARY_CHECK_BYTES, is_binary
+
+# Matched against the file name (not the directory)
+GENERATED_FILE_PATTERNS = (
+    "package-lock.json",
+    "npm-shrinkwrap.json",
+    "yarn.lock",
+    "pnpm-lock.yaml",
+    "Cargo.lock",
+    "poetry.lock",
+    "Pipfile.lock",
+    "composer.lock",
+    "Gemfile.lock",
+    "go.sum",
+    "*.min.js",
+    "*.min.css",
+    "*.js.map",
+    "*.css.map",
+    "*_pb2.py",
+    "*_pb2_grpc.py",
+    "*.pb.go",
+    "*.pb.cc",
+    "*.pb.h",
+    "*.designer.cs",
+)
+# Marker comments generators put near the top of their output
+GENERATED_MARKERS = (b"@generated", b"DO NOT EDIT", b"Code generated by", b"auto-generated", b"autogenerated")
+GENERATED_MARKER_BYTES = 1024  # Only the start of the file is searched for a marker
+
+
+def read_file_head(full_path: str, size: int = BINARY_CHECK_BYTES) -> Optional[bytes]:
+    """Returns the first `size` bytes of a file, or None if it can't be read (e.g. deleted)."""
+    try:
+        with open(full_path, "rb") as file:
+            return file.read(size)
+    except OSError:
+        return None
+
+
+def generated_pattern(path: str) -> Optional[str]:
+    """Returns the GENERATED_FILE_PATTERNS entry the file name matches, or None."""
+    name = os.path.basename(path)
+    for pattern in GENERATED_FILE_PATTERNS:
+        if fnmatch.fnmatchcase(name, pattern):
+            return pattern
+    return None
+
+
+def generated_exclude_pathspecs() -> List[str]:
+    """Pathspecs leaving files matching GENERATED_FILE_PATTERNS (in any directory) out of a git command."""
+    return [":(exclude,glob)**/" + pattern for pattern in GENERATED_FILE_PATTERNS]
+
+
+def diff_skip_reason(path: str, head: Optional[bytes] = None) -> Optional[str]:
+    """
+    Returns why the diff of `path` shouldn't be loaded automatically ('binary
+    file', 'generated file (...)'), or None. `head` is the start of the file's
+    content if available.
+    """
+    if head is not None and is_binary(head):
+        return "binary file"
+    pattern = generated_pattern(path)
+    if pattern:
+        return f"generated file (matches '{pattern}')"
+    if head is not None:
+        start = head[:GENERATED_MARKER_BYTES]
+        for marker in GENERATED_MARKERS:
+            if marker in start:
+                return f"generated file (contains '{marker.decode('ascii')}')"
+    return None
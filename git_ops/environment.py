@@ -0,0 +1,16 @@
+# git_ops/environment.py
+import os
+from typing import Dict
+
+
+def git_env(read_only: bool = True) -> Dict[str, str]:
+    """
+    Returns the environment to start git with: the app's own, with git's
+    messages untranslated (C locale). Read-only commands also take no optional
+    locks (e.g. 'git status' refreshing the index), so they never make a
+    concurrent mutating command fail.
+    """
+    env = dict(os.environ, LANG="C", LC_ALL="C")
+    if read_only:
+        env["GIT_OPTIONAL_LOCKS"] = "0"
+    return env
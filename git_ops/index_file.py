@@ -0,0 +1,164 @@
+# git_ops/index_file.py
+"""
+Parser for git's index file (.git/index), versions 2 to 4.
+
+Entries keep the stat data git recorded when it last refreshed the index, so
+a working tree file whose stat still matches is known to be unchanged without
+reading it. Extensions are skipped by their size field, except the cache-tree
+('TREE'), which tells which directories still match a known tree object.
+"""
+
+import struct
+from typing import List, Dict, NamedTuple
+
+INDEX_SIGNATURE = b"DIRC"
+INDEX_VERSIONS = (2, 3, 4)
+OID_SIZE = 20
+# Fixed part of an entry: ten 32-bit stat fields, the object id and the 16-bit flags
+_ENTRY_HEADER = struct.Struct(">10I20sH")
+# Flags
+ENTRY_ASSUME_VALID = 0x8000
+ENTRY_EXTENDED = 0x4000
+ENTRY_STAGE_MASK = 0x3000
+ENTRY_NAME_MASK = 0x0FFF
+# Extended flags (version 3 and later)
+ENTRY_SKIP_WORKTREE = 0x4000
+ENTRY_INTENT_TO_ADD = 0x2000
+# Extensions that change how entries must be interpreted
+UNSUPPORTED_EXTENSIONS = (
+    b"link",  # Split index: most entries live in a shared index file
+    b"sdir",  # Sparse index: directories collapsed into single entries
+)
+
+
+class UnsupportedIndex(ValueError):
+    """The index uses a feature this parser doesn't handle; ask git instead."""
+
+
+class IndexEntry(NamedTuple):
+    path: bytes
+    ctime_s: int
+    ctime_ns: int
+    mtime_s: int
+    mtime_ns: int
+    dev: int
+    ino: int
+    mode: int
+    uid: int
+    gid: int
+    size: int
+    oid: bytes
+    flags: int
+    extended_flags: int
+
+    @property
+    def stage(self) -> int:
+        return (self.flags & ENTRY_STAGE_MASK) >> 12
+
+
+class GitIndex(NamedTuple):
+    version: int
+    entries: List[IndexEntry]  # Sorted by path (then stage), like in the file
+    # Cache-tree: directory path ('' for the root, no trailing slash) -> tree id,
+    # for the directories whose tree is still valid
+    cache_tree: Dict[bytes, bytes]
+
+
+def _read_offset_varint(data, position: int):
+    """Reads the variable length integer of version 4 path compression."""
+    byte = data[position]
+    position += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[position]
+        position += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, position
+
+
+def _parse_cache_tree(data: bytes) -> Dict[bytes, bytes]:
+    """Parses the TREE extension: nodes in pre-order, each followed by its subtrees."""
+    trees = {}
+    position = 0
+    # Stack of (directory path, subtrees still to read) for the nodes being filled
+    stack = []
+    while position < len(data):
+        nul = data.index(b"\x00", position)
+        name = data[position:nul]
+        newline = data.index(b"\n", nul)
+        entry_count, subtree_count = (int(field) for field in data[nul + 1 : newline].split(b" "))
+        position = newline + 1
+        while stack and stack[-1][1] == 0:
+            stack.pop()
+        if stack:
+            parent_path, remaining = stack[-1]
+            stack[-1] = (parent_path, remaining - 1)
+            path = parent_path + b"/" + name if parent_path else name
+        else:
+            path = name  # The root node has an empty name
+        if entry_count >= 0:  # -1 marks an invalidated directory, which has no tree id
+            trees[path] = data[position : position + OID_SIZE]
+            position += OID_SIZE
+        stack.append((path, subtree_count))
+    return trees
+
+
+def parse_index(data: bytes) -> GitIndex:
+    """Parses the content of an index file. Raises UnsupportedIndex for unsupported variants."""
+    signature, version, entry_count = struct.unpack_from(">4sII", data, 0)
+    if signature != INDEX_SIGNATURE:
+        raise ValueError("not an index file")
+    if version not in INDEX_VERSIONS:
+        raise UnsupportedIndex(f"index version {version}")
+    entries = []
+    position = 12
+    previous_path = b""
+    unpack_header = _ENTRY_HEADER.unpack_from
+    header_size = _ENTRY_HEADER.size
+    for _ in range(entry_count):
+        entry_start = position
+        fields = unpack_header(data, position)
+        flags = fields[11]
+        position += header_size
+        extended_flags = 0
+        if flags & ENTRY_EXTENDED:
+            (extended_flags,) = struct.unpack_from(">H", data, position)
+            position += 2
+        if version == 4:
+            # Path = previous path minus N trailing bytes, plus a NUL terminated suffix
+            strip, position = _read_offset_varint(data, position)
+            nul = data.index(b"\x00", position)
+            path = previous_path[: len(previous_path) - strip] + data[position:nul]
+            position = nul + 1
+        else:
+            name_length = flags & ENTRY_NAME_MASK
+            if name_length < ENTRY_NAME_MASK:
+                nul = position + name_length
+            else:
+                nul = data.index(b"\x00", position)  # Longer names aren't stored in the flags
+            path = data[position:nul]
+            # Entries are NUL padded to a multiple of 8 bytes (at least one NUL)
+            position = entry_start + ((nul - entry_start + 8) & ~7)
+        previous_path = path
+        entries.append(IndexEntry(path, *fields[:10], fields[10], flags, extended_flags))
+
+    # Extensions: 4 byte signature, 32-bit size, data; the file ends with its checksum
+    cache_tree = {}
+    end = len(data) - OID_SIZE
+    while position + 8 <= end:
+        signature, size = struct.unpack_from(">4sI", data, position)
+        position += 8
+        if signature in UNSUPPORTED_EXTENSIONS:
+            raise UnsupportedIndex(f"index extension {signature.decode('ascii', 'replace')}")
+        if signature == b"TREE":
+            cache_tree = _parse_cache_tree(data[position : position + size])
+        elif not b"A" <= signature[:1] <= b"Z":
+            # Lowercase first letter: git itself refuses indexes with unknown required extensions
+            raise UnsupportedIndex(f"index extension {signature.decode('ascii', 'replace')}")
+        position += size
+    return GitIndex(version, entries, cache_tree)
+
+
+def read_index(path: str) -> GitIndex:
+    with open(path, "rb") as index_file:
+        return parse_index(index_file.read())
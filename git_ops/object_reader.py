@@ -0,0 +1,99 @@
+# git_ops/object_reader.py
+import subprocess
+import threading
+from typing import Optional, Tuple
+
+from .environment import git_env
+
+# How often a request is retried after the 'cat-file' process died under it
+OBJECT_READER_MAX_RESTARTS = 2
+
+
+class GitObjectReader:
+    """
+    Reads objects through one long-lived 'git cat-file --batch' process per repository.
+
+    Starting git costs several milliseconds per command; this process is started
+    once (lazily) and then answers requests over its pipes. Requests from several
+    worker threads are multiplexed over the pipe one at a time. If the process
+    dies (killed, repository repacked under it, ...) it is restarted transparently.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()  # One request/response on the pipe at a time
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.repo_path,
+            env=git_env(),  # Never blocks concurrent mutating commands
+        )
+
+    def _stop(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def close(self):
+        """Stops the background process (it is restarted by the next request)."""
+        with self._lock:
+            self._stop()
+
+    def read(self, name: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Returns (type, content) of an object, or None if it doesn't exist.
+        `name` is anything 'git cat-file' accepts, e.g. a hash or '<commit>:<path>'.
+        """
+        if "\n" in name:
+            return None  # Would break the line based protocol
+        with self._lock:
+            for attempt in range(OBJECT_READER_MAX_RESTARTS + 1):
+                if self._process is None or self._process.poll() is not None:
+                    if self._process is not None:
+                        print("git cat-file process exited, restarting it.")
+                    self._stop()
+                    self._start()
+                try:
+                    return self._request(name)
+                except (OSError, ValueError) as e:
+                    # Broken pipe or truncated answer: the process is gone or confused
+                    print(f"Object reader failed ({e}), restarting git cat-file.")
+                    self._stop()
+                    if attempt == OBJECT_READER_MAX_RESTARTS:
+                        raise
+        return None
+
+    def _request(self, name: str) -> Optional[Tuple[str, bytes]]:
+        process = self._process
+        process.stdin.write(name.encode("utf-8") + b"\n")
+        process.stdin.flush()
+        header = process.stdout.readline()
+        if not header.endswith(b"\n"):
+            raise ValueError("unexpected end of output")
+        # "<oid> <type> <size>" or "<name> missing" / "<name> ambiguous"
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        fields = header.split()
+        if len(fields) != 3:
+            raise ValueError(f"unexpected header {header!r}")
+        object_type = fields[1].decode("ascii")
+        size = int(fields[2])
+        content = process.stdout.read(size + 1)  # Content plus trailing newline
+        if len(content) != size + 1:
+            raise ValueError("unexpected end of output")
+        return object_type, content[:size]
@@ -0,0 +1,517 @@
+# git_ops/object_store.py
+"""
+Pure-Python reader for a repository's object database (.git/objects).
+
+Reads loose objects (zlib) and packed objects (mmap'd .idx/.pack, including
+OFS/REF deltas) without starting any process. Anything it doesn't handle
+(revision expressions like 'HEAD~2', SHA-256 repositories, objects it can't
+find or decode) goes to a fallback reader, normally GitObjectReader.
+"""
+
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from typing import List, Dict, Tuple, Optional
+
+from utils.cache import LRUCache
+
+from .objects import parse_commit, parse_tree
+
+OBJECT_CACHE_BYTES = 64 * 1024 * 1024  # Inflated objects kept in memory
+DELTA_BASE_CACHE_BYTES = 32 * 1024 * 1024  # Delta bases, keyed by pack position
+MAX_DELTA_CHAIN = 10000  # Guard against corrupt packs with cyclic deltas
+
+# Pack object types
+OBJ_COMMIT, OBJ_TREE, OBJ_BLOB, OBJ_TAG = 1, 2, 3, 4
+OBJ_OFS_DELTA, OBJ_REF_DELTA = 6, 7
+TYPE_NAMES = {OBJ_COMMIT: "commit", OBJ_TREE: "tree", OBJ_BLOB: "blob", OBJ_TAG: "tag"}
+
+IDX_V2_MAGIC = b"\xfftOc"
+OID_SIZE = 20  # SHA-1; SHA-256 repositories are left to the fallback
+_HEX_OID = re.compile(r"^[0-9a-f]{40}$")
+
+
+class UnsupportedObject(Exception):
+    """Raised for objects this reader can't decode; callers fall back to git."""
+
+
+def find_git_dir(repo_path: str) -> Optional[str]:
+    """Returns the git directory of a work tree ('.git' dir or the one a '.git' file points to)."""
+    dot_git = os.path.join(repo_path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    try:
+        with open(dot_git, "r", encoding="utf-8") as git_file:
+            content = git_file.read().strip()
+    except OSError:
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    git_dir = content[len("gitdir:") :].strip()
+    return os.path.normpath(os.path.join(repo_path, git_dir))
+
+
+def find_common_dir(git_dir: str) -> str:
+    """Returns the directory holding objects/refs shared by all worktrees."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
+def resolve_ref(repo_path: str, ref_name: str = "HEAD") -> Optional[str]:
+    """
+    Resolves a ref (following symbolic refs) to a hex commit id by reading loose
+    refs and packed-refs. Returns None when it can't (unborn branch, reftable, ...).
+    """
+    git_dir = find_git_dir(repo_path)
+    if not git_dir:
+        return None
+    common_dir = find_common_dir(git_dir)
+    for _depth in range(5):  # Symbolic refs rarely nest; guard against loops
+        # HEAD and other pseudo refs are per worktree, everything under refs/ is shared
+        base_dir = common_dir if ref_name.startswith("refs/") else git_dir
+        try:
+            with open(os.path.join(base_dir, ref_name), "r", encoding="utf-8") as ref_file:
+                value = ref_file.read().strip()
+        except OSError:
+            value = _read_packed_ref(common_dir, ref_name)
+            if value is None:
+                return None
+        if value.startswith("ref:"):
+            ref_name = value[len("ref:") :].strip()
+            continue
+        return value if _HEX_OID.match(value) else None
+    return None
+
+
+def _read_packed_ref(common_dir: str, ref_name: str) -> Optional[str]:
+    try:
+        with open(os.path.join(common_dir, "packed-refs"), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                oid, _, name = line.rstrip("\n").partition(" ")
+                if name == ref_name:
+                    return oid
+    except OSError:
+        pass
+    return None
+
+
+def _read_varint_size(data, position: int) -> Tuple[int, int]:
+    """Reads a delta header size (little-endian base-128). Returns (value, new_position)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Applies a git delta (copy/insert instructions) to its base object."""
+    source_size, position = _read_varint_size(delta, 0)
+    target_size, position = _read_varint_size(delta, position)
+    if source_size != len(base):
+        raise UnsupportedObject("delta base size mismatch")
+    result = bytearray()
+    delta_size = len(delta)
+    while position < delta_size:
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            # Copy from base: offset and size bytes are present per flag bit
+            offset = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            size = 0
+            for bit in range(3):
+                if opcode & (0x10 << bit):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            if size == 0:
+                size = 0x10000
+            result += base[offset : offset + size]
+        elif opcode:
+            # Insert the next `opcode` bytes literally
+            result += delta[position : position + opcode]
+            position += opcode
+        else:
+            raise UnsupportedObject("invalid delta opcode 0")
+    if len(result) != target_size:
+        raise UnsupportedObject("delta result size mismatch")
+    return bytes(result)
+
+
+class PackFile:
+    """One .pack with its .idx (version 1 or 2), both memory-mapped."""
+
+    def __init__(self, pack_path: str):
+        self.pack_path = pack_path
+        self.idx_path = pack_path[: -len(".pack")] + ".idx"
+        with open(self.idx_path, "rb") as idx_file:
+            self._idx = mmap.mmap(idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.pack_path, "rb") as pack_file:
+            self._pack = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._pack[:4] != b"PACK":
+            raise UnsupportedObject(f"not a pack file: {pack_path}")
+        idx = self._idx
+        if idx[:4] == IDX_V2_MAGIC:
+            version = struct.unpack_from(">I", idx, 4)[0]
+            if version != 2:
+                raise UnsupportedObject(f"unsupported pack index version {version}")
+            self._version = 2
+            fanout_start = 8
+        else:
+            self._version = 1
+            fanout_start = 0
+        self._fanout = struct.unpack_from(">256I", idx, fanout_start)
+        self.count = self._fanout[255]
+        table_start = fanout_start + 256 * 4
+        if self._version == 2:
+            self._oids_start = table_start
+            self._crc_start = self._oids_start + self.count * OID_SIZE
+            self._offsets_start = self._crc_start + self.count * 4
+            self._large_offsets_start = self._offsets_start + self.count * 4
+        else:
+            self._entries_start = table_start  # (offset, oid) pairs of 24 bytes
+
+    def close(self):
+        self._idx.close()
+        self._pack.close()
+
+    def _oid_at(self, index: int) -> bytes:
+        if self._version == 2:
+            start = self._oids_start + index * OID_SIZE
+        else:
+            start = self._entries_start + index * (4 + OID_SIZE) + 4
+        return self._idx[start : start + OID_SIZE]
+
+    def _offset_at(self, index: int) -> int:
+        if self._version == 1:
+            return struct.unpack_from(">I", self._idx, self._entries_start + index * 24)[0]
+        offset = struct.unpack_from(">I", self._idx, self._offsets_start + index * 4)[0]
+        if offset & 0x80000000:  # Index into the 8-byte offset table (packs > 2 GiB)
+            large_index = offset & 0x7FFFFFFF
+            offset = struct.unpack_from(
+                ">Q", self._idx, self._large_offsets_start + large_index * 8
+            )[0]
+        return offset
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """Returns the pack offset of an object, or None. Binary search within the fan-out bucket."""
+        first_byte = oid[0]
+        low = self._fanout[first_byte - 1] if first_byte else 0
+        high = self._fanout[first_byte]
+        while low < high:
+            middle = (low + high) // 2
+            middle_oid = self._oid_at(middle)
+            if middle_oid < oid:
+                low = middle + 1
+            elif middle_oid > oid:
+                high = middle
+            else:
+                return self._offset_at(middle)
+        return None
+
+    def read_entry_header(self, offset: int) -> Tuple[int, int, int]:
+        """Reads an object header in the pack. Returns (type, inflated size, data position)."""
+        pack = self._pack
+        byte = pack[offset]
+        object_type = (byte >> 4) & 0x7
+        size = byte & 0x0F
+        shift = 4
+        position = offset + 1
+        while byte & 0x80:
+            byte = pack[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        return object_type, size, position
+
+    def read_ofs_delta_base(self, position: int) -> Tuple[int, int]:
+        """Reads an OFS_DELTA's negative base offset. Returns (distance, new_position)."""
+        pack = self._pack
+        byte = pack[position]
+        position += 1
+        distance = byte & 0x7F
+        while byte & 0x80:
+            byte = pack[position]
+            position += 1
+            distance = ((distance + 1) << 7) | (byte & 0x7F)
+        return distance, position
+
+    def read_ref_delta_base(self, position: int) -> Tuple[bytes, int]:
+        return self._pack[position : position + OID_SIZE], position + OID_SIZE
+
+    def inflate(self, position: int, size: int) -> bytes:
+        """Inflates the zlib stream starting at `position` in the pack (`size` bytes expected)."""
+        decompressor = zlib.decompressobj()
+        parts = []
+        # Compressed data is rarely much larger than the inflated size; read more if needed
+        chunk = max(size + 64, 4096)
+        with memoryview(self._pack) as view:
+            while not decompressor.eof:
+                piece = view[position : position + chunk]
+                if not piece:
+                    break
+                parts.append(decompressor.decompress(piece))
+                position += len(piece)
+                chunk *= 2
+        data = b"".join(parts)
+        if len(data) != size:
+            raise UnsupportedObject("truncated pack object")
+        return data
+
+
+class GitObjectStore:
+    """
+    Object reader working directly on .git/objects, with an LRU of inflated objects.
+
+    read(name) has the same contract as GitObjectReader.read: `name` may be a
+    full hex object id or '<full hex commit/tree id>:<path>'; other names, and
+    objects that can't be read natively, are passed to `fallback`.
+    """
+
+    def __init__(self, repo_path: str, fallback=None):
+        self.repo_path = repo_path
+        self.fallback = fallback
+        self._lock = threading.Lock()  # Guards the pack list
+        self._packs: Dict[str, PackFile] = {}  # Map: pack path -> PackFile
+        self._packs_mtime = None  # mtime of the pack directory at the last scan
+        # Map: object id bytes -> (type, content)
+        self._objects = LRUCache(OBJECT_CACHE_BYTES, sizeof=lambda item: len(item[1]))
+        # Map: (pack path, offset) -> (type, content), for resolving delta chains
+        self._delta_bases = LRUCache(DELTA_BASE_CACHE_BYTES, sizeof=lambda item: len(item[1]))
+
+        self._object_dirs: List[str] = []
+        git_dir = find_git_dir(repo_path)
+        if git_dir and not self._uses_unsupported_format(git_dir):
+            objects_dir = os.path.join(find_common_dir(git_dir), "objects")
+            self._object_dirs = [objects_dir] + self._read_alternates(objects_dir)
+
+    # --- Setup ---
+
+    @staticmethod
+    def _uses_unsupported_format(git_dir: str) -> bool:
+        """True for repositories using SHA-256 object ids (left to the fallback)."""
+        try:
+            with open(os.path.join(find_common_dir(git_dir), "config"), "r", encoding="utf-8") as f:
+                config = f.read().lower()
+        except OSError:
+            return False
+        return re.search(r"objectformat\s*=\s*sha256", config) is not None
+
+    @staticmethod
+    def _read_alternates(objects_dir: str) -> List[str]:
+        """Returns the object directories listed in objects/info/alternates."""
+        try:
+            with open(os.path.join(objects_dir, "info", "alternates"), "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return []
+        return [
+            os.path.normpath(os.path.join(objects_dir, line.strip()))
+            for line in lines
+            if line.strip() and not line.startswith("#")
+        ]
+
+    def _scan_packs(self, force: bool = False):
+        """Opens packs that appeared (fetch, gc) since the last scan and drops the ones deleted (gc, repack)."""
+        with self._lock:
+            mtimes = []
+            for objects_dir in self._object_dirs:
+                try:
+                    mtimes.append(os.stat(os.path.join(objects_dir, "pack")).st_mtime_ns)
+                except OSError:
+                    mtimes.append(None)
+            if not force and mtimes == self._packs_mtime:
+                return
+            self._packs_mtime = mtimes
+            present = set()
+            for objects_dir in self._object_dirs:
+                pack_dir = os.path.join(objects_dir, "pack")
+                try:
+                    names = os.listdir(pack_dir)
+                except OSError:
+                    continue
+                for name in names:
+                    path = os.path.join(pack_dir, name)
+                    if not name.endswith(".pack"):
+                        continue
+                    present.add(path)
+                    if path in self._packs:
+                        continue
+                    try:
+                        self._packs[path] = PackFile(path)
+                    except (OSError, ValueError, UnsupportedObject, struct.error) as e:
+                        print(f"Skipping pack {name}: {e}")
+            # Unmap deleted packs so their disk space is freed and lookups skip them
+            for path in [path for path in self._packs if path not in present]:
+                try:
+                    self._packs.pop(path).close()
+                except BufferError:
+                    pass  # Still being read by a worker thread; freed with it
+
+    def close(self):
+        """Unmaps all packs and stops the fallback reader."""
+        with self._lock:
+            for pack in self._packs.values():
+                try:
+                    pack.close()
+                except BufferError:
+                    pass  # Still being read by a worker thread; freed with it
+            self._packs.clear()
+            self._packs_mtime = None
+        self._objects.clear()
+        self._delta_bases.clear()
+        if self.fallback is not None:
+            self.fallback.close()
+
+    # --- Reading ---
+
+    def read(self, name: str) -> Optional[Tuple[str, bytes]]:
+        """Returns (type, content) of an object, or None if it doesn't exist."""
+        if self._object_dirs:
+            try:
+                if _HEX_OID.match(name):
+                    found = self.read_oid(bytes.fromhex(name))
+                    if found is not None:
+                        return found
+                elif ":" in name:
+                    revision, _, path = name.partition(":")
+                    if _HEX_OID.match(revision):
+                        return self._read_path(bytes.fromhex(revision), path)
+            except (UnsupportedObject, OSError, ValueError, zlib.error, struct.error) as e:
+                print(f"Object store can't read {name} natively ({e}), asking git.")
+        if self.fallback is None:
+            return None
+        return self.fallback.read(name)
+
+    def read_oid(self, oid: bytes) -> Optional[Tuple[str, bytes]]:
+        """Reads an object by binary id, from the cache, loose objects or packs."""
+        cached = self._objects.get(oid)
+        if cached is not None:
+            return cached
+        found = self._read_loose(oid)
+        if found is None:
+            found = self._read_packed(oid)
+        if found is None:
+            # Maybe packed since the last scan (fetch, gc, ...)
+            self._scan_packs()
+            found = self._read_packed(oid)
+        if found is not None:
+            self._objects.put(oid, found)
+        return found
+
+    def _read_loose(self, oid: bytes) -> Optional[Tuple[str, bytes]]:
+        hex_oid = oid.hex()
+        for objects_dir in self._object_dirs:
+            path = os.path.join(objects_dir, hex_oid[:2], hex_oid[2:])
+            try:
+                with open(path, "rb") as loose_file:
+                    raw = zlib.decompress(loose_file.read())
+            except FileNotFoundError:
+                continue
+            header, _, content = raw.partition(b"\x00")
+            object_type, _, size = header.partition(b" ")
+            if int(size) != len(content):
+                raise UnsupportedObject("loose object size mismatch")
+            return object_type.decode("ascii"), content
+        return None
+
+    def _read_packed(self, oid: bytes) -> Optional[Tuple[str, bytes]]:
+        if self._packs_mtime is None:
+            self._scan_packs()
+        for pack in list(self._packs.values()):
+            offset = pack.find(oid)
+            if offset is not None:
+                return self._read_pack_entry(pack, offset)
+        return None
+
+    def _read_pack_entry(self, pack: PackFile, offset: int) -> Tuple[str, bytes]:
+        """Reads the object at a pack offset, resolving its delta chain iteratively."""
+        # Walk down to a full object (or a cached intermediate result), collecting deltas
+        deltas: List[Tuple[Tuple[str, int], bytes]] = []  # ((pack path, offset), delta)
+        while True:
+            key = (pack.pack_path, offset)
+            cached = self._delta_bases.get(key)
+            if cached is not None:
+                object_type, content = cached
+                break
+            object_type, size, position = pack.read_entry_header(offset)
+            if object_type in TYPE_NAMES:
+                object_type = TYPE_NAMES[object_type]
+                content = pack.inflate(position, size)
+                if deltas:  # Only worth keeping as the base of a delta
+                    self._delta_bases.put(key, (object_type, content))
+                break
+            if object_type == OBJ_OFS_DELTA:
+                distance, position = pack.read_ofs_delta_base(position)
+                deltas.append((key, pack.inflate(position, size)))
+                offset -= distance
+            elif object_type == OBJ_REF_DELTA:
+                base_oid, position = pack.read_ref_delta_base(position)
+                deltas.append((key, pack.inflate(position, size)))
+                pack, offset = self._locate(base_oid)
+                if pack is None:
+                    raise UnsupportedObject("delta base not in any pack")
+            else:
+                raise UnsupportedObject(f"unknown pack object type {object_type}")
+            if len(deltas) > MAX_DELTA_CHAIN:
+                raise UnsupportedObject("delta chain too long")
+
+        # Apply the deltas from the base up; intermediate results are bases of
+        # their neighbours in the pack too, so keep them (the requested object
+        # itself is cached by id in read_oid)
+        for index in range(len(deltas) - 1, -1, -1):
+            key, delta = deltas[index]
+            content = apply_delta(content, delta)
+            if index:
+                self._delta_bases.put(key, (object_type, content))
+        return object_type, content
+
+    def _locate(self, oid: bytes) -> Tuple[Optional[PackFile], int]:
+        for pack in list(self._packs.values()):
+            offset = pack.find(oid)
+            if offset is not None:
+                return pack, offset
+        return None, 0
+
+    def _read_path(self, root_oid: bytes, path: str) -> Optional[Tuple[str, bytes]]:
+        """Resolves '<commit or tree>:<path>' by walking the trees."""
+        found = self.read_oid(root_oid)
+        if found is None:
+            raise UnsupportedObject("root object not found")
+        object_type, content = found
+        if object_type == "commit":
+            found = self.read_oid(bytes.fromhex(parse_commit(content)["tree"]))
+            if found is None:
+                raise UnsupportedObject("tree not found")
+            object_type, content = found
+        if object_type != "tree":
+            return None
+        for component in [part for part in path.split("/") if part]:
+            if object_type != "tree":
+                return None
+            entry = parse_tree(content, OID_SIZE).get(component.encode("utf-8"))
+            if entry is None:
+                return None
+            mode, hex_oid = entry
+            if mode == b"160000":
+                return None  # Submodule commit; not in this repository
+            found = self.read_oid(bytes.fromhex(hex_oid))
+            if found is None:
+                raise UnsupportedObject("object in tree not found")
+            object_type, content = found
+        return object_type, content
@@ -0,0 +1,189 @@
+# git_ops/objects.py
+"""
+Commit details and their changed files, computed from raw git objects.
+
+Everything here takes an object reader (anything with a `read(name)` method
+returning (type, content) or None, e.g. GitObjectReader) instead of starting
+a git process per request.
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import List, Dict, Tuple, Optional, Any
+
+TREE_MODE = b"40000"  # Mode of a subdirectory entry in a tree object
+BINARY_CHECK_BYTES = 8000  # Like git: a NUL in the first 8000 bytes means binary
+
+
+def parse_person(value: bytes) -> Dict[str, Any]:
+    """Parses an author/committer line value: 'Name <email> timestamp +zone'."""
+    text = value.decode("utf-8", errors="replace")
+    name, _, rest = text.partition(" <")
+    email, _, when = rest.partition("> ")
+    timestamp, _, zone = when.partition(" ")
+    try:
+        ts = int(timestamp)
+    except ValueError:
+        ts = 0
+    return {"name": name, "email": email, "ts": ts, "tz": zone or "+0000"}
+
+
+def format_person_date(person: Dict[str, Any]) -> str:
+    """Formats a parsed person's date like git's %aD (RFC 2822, in their own timezone)."""
+    zone = person["tz"]
+    try:
+        sign = -1 if zone.startswith("-") else 1
+        offset = timedelta(hours=int(zone[1:3]), minutes=int(zone[3:5])) * sign
+    except ValueError:
+        offset = timedelta(0)
+    moment = datetime.fromtimestamp(person["ts"], timezone(offset))
+    return format_datetime(moment)
+
+
+def parse_commit(content: bytes) -> Dict[str, Any]:
+    """Parses a raw commit object into tree, parents, author, committer and message."""
+    header, _, message = content.partition(b"\n\n")
+    commit = {"tree": None, "parents": [], "author": None, "committer": None}
+    for line in header.split(b"\n"):
+        if line.startswith(b" "):
+            continue  # Continuation of a multi-line header (e.g. gpgsig)
+        key, _, value = line.partition(b" ")
+        if key == b"tree":
+            commit["tree"] = value.decode("ascii")
+        elif key == b"parent":
+            commit["parents"].append(value.decode("ascii"))
+        elif key in (b"author", b"committer"):
+            commit[key.decode("ascii")] = parse_person(value)
+    commit["message"] = message.decode("utf-8", errors="replace")
+    return commit
+
+
+def parse_tree(content: bytes, oid_size: int = 20) -> Dict[bytes, Tuple[bytes, str]]:
+    """
+    Parses a raw tree object into a map: name -> (mode, hex object id).
+    Trees store raw ids of the repository's hash size (20 bytes SHA-1, 32 SHA-256).
+    """
+    entries = {}
+    position = 0
+    size = len(content)
+    while position < size:
+        space = content.index(b" ", position)
+        nul = content.index(b"\x00", space)
+        oid_end = nul + 1 + oid_size
+        entries[content[space + 1 : nul]] = (
+            content[position:space],
+            content[nul + 1 : oid_end].hex(),
+        )
+        position = oid_end
+    return entries
+
+
+def read_object(reader, name: str, expected_type: str) -> Optional[bytes]:
+    """Reads an object and returns its content if it has the expected type."""
+    found = reader.read(name)
+    if found is None or found[0] != expected_type:
+        return None
+    return found[1]
+
+
+def diff_trees(
+    reader, old_tree: Optional[str], new_tree: Optional[str], prefix: str = ""
+) -> List[Tuple[str, str]]:
+    """
+    Returns (status, path) for each file that differs between two trees, with
+    status 'A', 'M' or 'D'. Subtrees with the same id are skipped entirely, so
+    the cost depends on the size of the change, not of the repository.
+    """
+    if old_tree == new_tree:
+        return []
+    oid_size = len(old_tree or new_tree) // 2
+    old_entries = {}
+    new_entries = {}
+    if old_tree:
+        old_entries = parse_tree(read_object(reader, old_tree, "tree") or b"", oid_size)
+    if new_tree:
+        new_entries = parse_tree(read_object(reader, new_tree, "tree") or b"", oid_size)
+    changes = []
+    for name in sorted(set(old_entries) | set(new_entries)):
+        old_mode, old_oid = old_entries.get(name, (None, None))
+        new_mode, new_oid = new_entries.get(name, (None, None))
+        if old_oid == new_oid and old_mode == new_mode:
+            continue
+        path = prefix + name.decode("utf-8", errors="replace")
+        old_is_tree = old_mode == TREE_MODE
+        new_is_tree = new_mode == TREE_MODE
+        # Recurse into directories; a file replaced by a directory (or the
+        # reverse) shows up as the file's deletion/addition plus the directory's content
+        if old_is_tree or new_is_tree:
+            changes.extend(
+                diff_trees(
+                    reader,
+                    old_oid if old_is_tree else None,
+                    new_oid if new_is_tree else None,
+                    path + "/",
+                )
+            )
+        if old_mode is not None and not old_is_tree and (new_mode is None or new_is_tree):
+            changes.append(("D", path))
+        elif new_mode is not None and not new_is_tree and (old_mode is None or old_is_tree):
+            changes.append(("A", path))
+        elif not old_is_tree and not new_is_tree:
+            changes.append(("M", path))
+    return changes
+
+
+def commit_details(reader, commit_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the data shown in the commit detail view: hash, author, email,
+    date (RFC 2822), message and the files changed relative to the first parent.
+    """
+    content = read_object(reader, commit_hash, "commit")
+    if content is None:
+        return None
+    commit = parse_commit(content)
+    parent_tree = None
+    if commit["parents"]:
+        parent_content = read_object(reader, commit["parents"][0], "commit")
+        if parent_content is not None:
+            parent_tree = parse_commit(parent_content)["tree"]
+    author = commit["author"] or parse_person(b"")
+    return {
+        "hash": commit_hash,
+        "author": author["name"],
+        "email": author["email"],
+        "date": format_person_date(author),
+        "message": commit["message"],
+        "parents": commit["parents"],
+        "files": diff_trees(reader, parent_tree, commit["tree"]),
+    }
+
+
+def commit_details_size(details: Dict[str, Any]) -> int:
+    """Approximate memory held by a commit_details() result, for byte-bounded caches."""
+    size = len(details["message"]) + len(details["author"]) + len(details["email"]) + 256
+    # Each changed file: the path plus its tuple and status string
+    return size + sum(len(path) + 100 for _status, path in details["files"])
+
+
+def commit_summaries(reader, commit_hashes: List[str]) -> Dict[str, Dict[str, str]]:
+    """
+    Returns a map: hash -> {"author", "msg"} with the author name and subject
+    (first paragraph of the message on one line, like git's %s) of each commit.
+    Commits that can't be read are left out.
+    """
+    summaries = {}
+    for commit_hash in commit_hashes:
+        content = read_object(reader, commit_hash, "commit")
+        if content is None:
+            continue
+        commit = parse_commit(content)
+        subject = commit["message"].strip("\n").split("\n\n", 1)[0]
+        summaries[commit_hash] = {
+            "author": (commit["author"] or parse_person(b""))["name"],
+            "msg": " ".join(line.strip() for line in subject.split("\n")),
+        }
+    return summaries
+
+
+def is_binary(content: bytes) -> bool:
+    return b"\x00" in content[:BINARY_CHECK_BYTES]
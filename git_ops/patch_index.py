@@ -0,0 +1,166 @@
+# git_ops/patch_index.py
+"""
+Whole patches (of a commit, or of the index or work tree) read with one git
+command and indexed by file, so showing any of their files is a slice
+instead of another process.
+"""
+
+import subprocess
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from .commands import STREAM_READ_SIZE
+from .environment import git_env
+
+# First-parent patch of one commit (everything added for a root commit), like
+# the detail view's file list. Non-ASCII paths are written as they are, so
+# only paths with quotes, backslashes or control characters come quoted.
+COMMIT_PATCH_COMMAND = [
+    "git",
+    "-c",
+    "core.quotepath=false",
+    "diff-tree",
+    "-p",
+    "--root",
+    "-m",
+    "--first-parent",
+    "--no-commit-id",
+]
+# Staged and unstaged changes, appended with '--cached' for staged ones. Renames
+# are off (the porcelain 'git diff' detects them by default) so that every
+# header names one path; staged renames are diffed on their own. The prefixes
+# are explicit because the porcelain command follows diff.noprefix and
+# diff.mnemonicPrefix, which would change what the headers look like.
+WORKTREE_PATCH_COMMAND = [
+    "git",
+    "-c",
+    "core.quotepath=false",
+    "diff",
+    "--no-color",
+    "--no-renames",
+    "--src-prefix=a/",
+    "--dst-prefix=b/",
+]
+FILE_HEADER = "diff --git "
+# Escapes of git's C-style path quoting, besides octal byte values
+QUOTE_ESCAPES = {"a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13, '"': 34, "\\": 92}
+
+
+def unquote_path(text: str) -> str:
+    """Undoes git's C-style quoting of a path ('"a\\tb"' -> 'a<TAB>b'); unquoted text is returned as is."""
+    if not (text.startswith('"') and text.endswith('"')):
+        return text
+    raw = bytearray()
+    index = 1
+    end = len(text) - 1
+    while index < end:
+        char = text[index]
+        if char != "\\":
+            raw += char.encode("utf-8")
+            index += 1
+        elif text[index + 1] in QUOTE_ESCAPES:
+            raw.append(QUOTE_ESCAPES[text[index + 1]])
+            index += 2
+        else:  # \ooo: one byte in octal
+            raw.append(int(text[index + 1 : index + 4], 8))
+            index += 4
+    return raw.decode("utf-8", errors="replace")
+
+
+def _header_path(header_line: str) -> str:
+    """
+    Returns the path of a 'diff --git a/P b/P' line. Without rename detection
+    both names are the same path, so the line splits in the middle, whatever
+    spaces (or ' b/') the path contains.
+    """
+    names = header_line[len(FILE_HEADER) :]
+    half = (len(names) - 1) // 2
+    old_name = names[:half]
+    if old_name.startswith('"'):
+        return unquote_path(old_name)[2:]  # Quoted together with its 'a/' prefix
+    return old_name[2:]
+
+
+class PatchIndex:
+    """
+    A patch as one string plus the span of each file's part in it.
+    If reading stopped at a size cap (`truncated`), only files whose part was
+    read completely are listed.
+    """
+
+    def __init__(self, text: str, truncated: bool = False):
+        self.text = text
+        self.truncated = truncated
+        self.files: Dict[str, Tuple[int, int]] = {}  # Map: path -> (start, end) in text
+        starts = []
+        position = 0 if text.startswith(FILE_HEADER) else text.find("\n" + FILE_HEADER)
+        while position >= 0:
+            if text[position] == "\n":
+                position += 1
+            starts.append(position)
+            position = text.find("\n" + FILE_HEADER, position)
+        ends = starts[1:] + [len(text)]
+        if truncated and starts:
+            ends.pop()  # The last part may be cut short
+            starts.pop()
+        for start, end in zip(starts, ends):
+            header_end = text.find("\n", start)
+            self.files[_header_path(text[start:header_end])] = (start, end)
+
+    def file_diff(self, path: str) -> Optional[str]:
+        """Returns the patch of one file, or None if it isn't (completely) in this patch."""
+        span = self.files.get(path)
+        return self.text[span[0] : span[1]] if span else None
+
+
+def read_patch(
+    command: List[str], repo_path: str, max_bytes: Optional[int] = None
+) -> PatchIndex:
+    """
+    Runs a git command printing a patch, reading its output as it comes and
+    stopping (killing git) after the last full line within max_bytes. Blocks;
+    meant for function jobs. Raises RuntimeError if git fails.
+    """
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            cwd=repo_path,
+            env=git_env(),
+        )
+        output = bytearray()
+        truncated = False
+        while True:
+            data = process.stdout.read1(STREAM_READ_SIZE)
+            if not data:
+                break
+            output += data
+            if max_bytes is not None and len(output) > max_bytes:
+                del output[output.rfind(b"\n", 0, max_bytes) + 1 :]
+                truncated = True
+                process.kill()  # The rest is never read
+                break
+        process.stdout.close()
+        returncode = process.wait()
+        if returncode != 0 and not truncated:
+            stderr_file.seek(0)
+            message = stderr_file.read().decode("utf-8", errors="replace").strip()
+            raise RuntimeError(message or f"exit code {returncode}")
+    return PatchIndex(output.decode("utf-8", errors="replace"), truncated)
+
+
+def read_commit_patch(repo_path: str, commit_hash: str, max_bytes: Optional[int] = None) -> PatchIndex:
+    """Reads the patch of one commit (see COMMIT_PATCH_COMMAND and read_patch())."""
+    return read_patch(COMMIT_PATCH_COMMAND + [commit_hash], repo_path, max_bytes)
+
+
+def read_worktree_patch(
+    repo_path: str, staged: bool, exclude: List[str], max_bytes: Optional[int] = None
+) -> PatchIndex:
+    """
+    Reads all staged or unstaged changes as one patch (see read_patch()).
+    `exclude` holds pathspecs of files to leave out, e.g. generated ones.
+    """
+    command = WORKTREE_PATCH_COMMAND + (["--cached"] if staged else [])
+    return read_patch(command + ["--"] + exclude, repo_path, max_bytes)
@@ -0,0 +1,204 @@
+# git_ops/porcelain.py
+"""
+Status records and the parser for 'git status --porcelain=v2 -z'.
+
+With -z every record ends with a NUL and paths are written verbatim: no
+quoting, no escaping, no ' -> ' between rename source and target. The
+source of a rename or copy follows its record as a separate NUL terminated
+field, so parsing is one pass over the fields with no guessing.
+"""
+
+import os
+import subprocess
+from typing import List, NamedTuple
+
+from .config import read_git_config, config_bool
+from .environment import git_env
+from .object_store import find_git_dir, find_common_dir
+
+STATUS_COMMAND = ["git", "status", "--porcelain=v2", "-z"]
+UNCHANGED = "."  # Letter of a side (index or work tree) without changes
+
+
+class StatusEntry(NamedTuple):
+    """
+    One changed, unmerged or untracked path, as in porcelain v2.
+
+    kind: '1' changed, '2' renamed or copied, 'u' unmerged, '?' untracked,
+    '!' ignored. xy holds the index and work tree letters ('.' when that
+    side is unchanged). Modes are ints (0 when unknown), object ids hex
+    strings ('' when unknown). Unmerged records only fill xy, path and
+    mode_worktree. The in-process status (git_ops/worktree_status.py) fills
+    kind, xy and path.
+    """
+
+    kind: str
+    xy: str
+    path: str
+    orig_path: str = ""  # Rename/copy source, else ''
+    submodule: str = "N..."  # Submodule state ('N...' for ordinary files)
+    mode_head: int = 0
+    mode_index: int = 0
+    mode_worktree: int = 0
+    oid_head: str = ""
+    oid_index: str = ""
+    score: str = ""  # Rename/copy letter and similarity, e.g. 'R100'
+
+    @property
+    def index_code(self) -> str:
+        return self.xy[0]
+
+    @property
+    def worktree_code(self) -> str:
+        return self.xy[1]
+
+    @property
+    def paths(self) -> List[str]:
+        """The paths a command about this entry must name (both sides of a rename)."""
+        return [self.orig_path, self.path] if self.orig_path else [self.path]
+
+
+def parse_porcelain_v2(output: bytes) -> List[StatusEntry]:
+    """Parses the output of STATUS_COMMAND. Header lines ('# ...') are skipped."""
+    entries = []
+    fields = output.split(b"\x00")
+    field_count = len(fields)
+    decode = os.fsdecode  # Paths round-trip to later git commands byte for byte
+    index = 0
+    while index < field_count:
+        record = fields[index]
+        index += 1
+        kind = record[:1]
+        if kind == b"1":
+            _, xy, submodule, mode_head, mode_index, mode_worktree, oid_head, oid_index, path = (
+                record.split(b" ", 8)
+            )
+            entries.append(
+                StatusEntry(
+                    "1",
+                    xy.decode("ascii"),
+                    decode(path),
+                    "",
+                    submodule.decode("ascii"),
+                    int(mode_head, 8),
+                    int(mode_index, 8),
+                    int(mode_worktree, 8),
+                    oid_head.decode("ascii"),
+                    oid_index.decode("ascii"),
+                )
+            )
+        elif kind == b"2":
+            (_, xy, submodule, mode_head, mode_index, mode_worktree, oid_head, oid_index, score, path) = (
+                record.split(b" ", 9)
+            )
+            orig_path = fields[index]  # The source is the next field
+            index += 1
+            entries.append(
+                StatusEntry(
+                    "2",
+                    xy.decode("ascii"),
+                    decode(path),
+                    decode(orig_path),
+                    submodule.decode("ascii"),
+                    int(mode_head, 8),
+                    int(mode_index, 8),
+                    int(mode_worktree, 8),
+                    oid_head.decode("ascii"),
+                    oid_index.decode("ascii"),
+                    score.decode("ascii"),
+                )
+            )
+        elif kind == b"u":
+            # Stage 1-3 modes and ids aren't kept; conflicts aren't listed by the UI
+            parts = record.split(b" ", 10)
+            entries.append(
+                StatusEntry(
+                    "u",
+                    parts[1].decode("ascii"),
+                    decode(parts[10]),
+                    submodule=parts[2].decode("ascii"),
+                    mode_worktree=int(parts[6], 8),
+                )
+            )
+        elif kind in (b"?", b"!"):
+            entries.append(StatusEntry(kind.decode("ascii"), kind.decode("ascii") * 2, decode(record[2:])))
+        # Empty fields (the final terminator) and '#' headers are skipped
+    return entries
+
+
+def literal_pathspecs(paths: List[str]) -> List[str]:
+    """Marks paths for git commands so that characters like '*' or ':' aren't read as pathspec magic."""
+    return [":(literal)" + path for path in paths]
+
+
+def read_status(repo_path: str, untracked: str = "normal") -> List[StatusEntry]:
+    """
+    Runs STATUS_COMMAND in `repo_path` and parses it. Raises RuntimeError if git
+    fails. `untracked` is the --untracked-files mode: 'normal', or 'no' to skip
+    the (often slowest) scan for untracked files.
+    """
+    # No optional locks: status must not refresh the index under a concurrent command
+    process = subprocess.run(
+        STATUS_COMMAND + [f"--untracked-files={untracked}"],
+        cwd=repo_path,
+        capture_output=True,
+        env=git_env(),
+    )
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.decode("utf-8", errors="replace").strip())
+    return parse_porcelain_v2(process.stdout)
+
+
+def status_caches_enabled(repo_path: str) -> bool:
+    """True if the repository has git's untracked cache turned on (see enable_status_caches())."""
+    git_dir = find_git_dir(repo_path)
+    if not git_dir:
+        return False
+    config = read_git_config(git_dir, find_common_dir(git_dir))
+    return config_bool(config, "core.untrackedcache")
+
+
+def fsmonitor_supported(repo_path: str) -> bool:
+    """True if this git has a built-in file system monitor for this platform."""
+    process = subprocess.run(
+        ["git", "fsmonitor--daemon", "status"], cwd=repo_path, capture_output=True
+    )
+    output = process.stdout + process.stderr
+    # Unsupported platforms and gits older than 2.36 say so; 'not watching' just means not started yet
+    return b"not supported" not in output and b"not a git command" not in output
+
+
+def enable_status_caches(repo_path: str) -> List[str]:
+    """
+    Turns on git's untracked cache, and its built-in fsmonitor where supported,
+    for one repository. Returns the names of what was enabled. Raises
+    subprocess.CalledProcessError if git refuses.
+    """
+    def run(*args):
+        subprocess.run(["git", *args], cwd=repo_path, capture_output=True, check=True)
+
+    run("config", "core.untrackedCache", "true")
+    enabled = ["untracked cache"]
+    if fsmonitor_supported(repo_path):
+        run("config", "core.fsmonitor", "true")
+        enabled.append("fsmonitor")
+    # Refreshes store the caches in the index only when they may write it, and the
+    # app's own status runs never do (GIT_OPTIONAL_LOCKS=0); fill them once now
+    run("status", "--porcelain")
+    return enabled
+
+
+def merge_status_changes(staged, unstaged, untracked: List[str]) -> List[StatusEntry]:
+    """
+    Builds records from per-side (letter, path) changes and untracked paths,
+    e.g. the in-process status, in path order.
+    """
+    codes = {}
+    for code, path in staged:
+        codes[path] = code + UNCHANGED
+    for code, path in unstaged:
+        codes[path] = codes.get(path, UNCHANGED + UNCHANGED)[0] + code
+    entries = [StatusEntry("1", xy, path) for path, xy in codes.items()]
+    entries.extend(StatusEntry("?", "??", path) for path in untracked)
+    entries.sort(key=lambda entry: entry.path)
+    return entries
@@ -0,0 +1,512 @@
+# git_ops/repo_watcher.py
+"""
+Watches a repository and reports which panels need refreshing.
+
+On Linux the work tree and the git directory are watched through inotify
+directly (read via a QSocketNotifier, so nothing polls): unlike
+QFileSystemWatcher's directory watches this also sees files being written in
+place, and it names the file that changed, so changes to ignored, untracked
+files (build output, ...) don't trigger anything. Elsewhere
+QFileSystemWatcher is used.
+
+Events are coalesced: a burst (a build, a checkout, a branch switch in an
+editor) becomes one refresh_needed emission once things are quiet for
+WATCH_DEBOUNCE_MS, or at the latest WATCH_MAX_DELAY_MS after the first event.
+
+Reading the index and walking the work tree (up to WATCH_MAX_DIRECTORIES
+directories) happen on a worker thread; the directories found are then
+watched WATCH_BATCH_SIZE at a time from the event loop, so opening a large
+repository doesn't block the UI.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from typing import List, Dict, Optional, Set, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, QSocketNotifier, QFileSystemWatcher, pyqtSignal
+
+from .config import read_git_config
+from .index_file import read_index
+from .object_store import find_git_dir, find_common_dir
+from .worktree_status import IgnoreRule, base_ignore_rules, is_ignored, read_ignore_file
+
+WATCH_DEBOUNCE_MS = 50  # Quiet time before a refresh (keeps editor saves well under 100 ms)
+WATCH_MAX_DELAY_MS = 1000  # Refresh at least this often while events keep coming
+WATCH_MAX_DIRECTORIES = 20000  # Stay well below the kernel's inotify watch limit
+WATCH_BATCH_SIZE = 1000  # Directories watched per event loop pass after the work tree walk
+# Panels that can be named in refresh_needed
+PANEL_STATUS = "status"
+PANEL_BRANCHES = "branches"
+PANEL_HISTORY = "history"
+ALL_PANELS = (PANEL_STATUS, PANEL_BRANCHES, PANEL_HISTORY)
+
+# inotify (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+def _load_inotify():
+    """Returns libc if it provides inotify (Linux), else None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+def read_tracked_paths(git_dir: str) -> Optional[Tuple[Set[str], Set[str]]]:
+    """
+    Returns the paths in the index and the directories holding them ('a/b/'),
+    or None if the index can't be read here (e.g. a split or sparse index).
+    """
+    try:
+        index = read_index(os.path.join(git_dir, "index"))
+    except FileNotFoundError:
+        return set(), set()
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Can't read the index ({e}), watching ignored paths too.")
+        return None
+    files = {os.fsdecode(entry.path) for entry in index.entries}
+    directories = set()
+    for path in files:
+        slash = path.rfind("/")
+        while slash > 0:
+            directory = path[: slash + 1]
+            if directory in directories:
+                break  # Its parents were added along with it
+            directories.add(directory)
+            slash = path.rfind("/", 0, slash)
+    return files, directories
+
+
+class _WorkTreeFilter:
+    """
+    Tells which work tree paths git status looks at: everything but ignored
+    paths holding nothing tracked. Keeps the ignore rules of each directory.
+    """
+
+    def __init__(self, repo_path: str, base_rules: List[IgnoreRule], tracked: Optional[Tuple[Set[str], Set[str]]]):
+        self.repo_path = repo_path
+        self.base_rules = base_rules  # core.excludesFile and info/exclude
+        self._ignore_rules: Dict[str, List[IgnoreRule]] = {}  # Map: work tree dir ('' or 'a/b/') -> rules
+        self._ignored_dirs: Dict[str, bool] = {}  # Map: work tree dir -> whether it is or lies in an ignored one
+        self.set_tracked(tracked)
+
+    def set_tracked(self, tracked: Optional[Tuple[Set[str], Set[str]]]):
+        """Takes over read_tracked_paths()'s result. None: unknown, nothing is skipped."""
+        self.tracked_files, self.tracked_dirs = tracked if tracked is not None else (None, None)
+
+    def rules_for(self, relative_dir: str) -> List[IgnoreRule]:
+        """Returns the ignore rules in effect inside a work tree directory ('' or 'a/b/')."""
+        rules = self._ignore_rules.get(relative_dir)
+        if rules is None:
+            if relative_dir:
+                parent_rules = self.rules_for(relative_dir[: relative_dir.rstrip("/").rfind("/") + 1])
+            else:
+                parent_rules = self.base_rules
+            rules = parent_rules + read_ignore_file(
+                os.path.join(self.repo_path, relative_dir, ".gitignore"), relative_dir
+            )
+            self._ignore_rules[relative_dir] = rules
+        return rules
+
+    def forget(self, relative_dir: str):
+        """Drops what is known about a directory's rules and those below it (built on top of them)."""
+        for cached_dir in [cached for cached in self._ignore_rules if cached.startswith(relative_dir)]:
+            del self._ignore_rules[cached_dir]
+        for cached_dir in [cached for cached in self._ignored_dirs if cached.startswith(relative_dir)]:
+            del self._ignored_dirs[cached_dir]
+
+    def is_ignored(self, relative_dir: str, path: str, is_dir: bool) -> bool:
+        """True for a work tree path git status skips: matched by an ignore rule and holding nothing tracked."""
+        if self.tracked_files is None:
+            return False  # Anything may be tracked
+        if path in self.tracked_files or (is_dir and path + "/" in self.tracked_dirs):
+            return False
+        return self.in_ignored_dir(relative_dir) or is_ignored(self.rules_for(relative_dir), path, is_dir)
+
+    def in_ignored_dir(self, relative_dir: str) -> bool:
+        """True if a work tree directory ('a/b/') is or lies in an ignored one (watched for its tracked files)."""
+        ignored = self._ignored_dirs.get(relative_dir)
+        if ignored is None:
+            parent = relative_dir[: relative_dir.rstrip("/").rfind("/") + 1]
+            ignored = bool(relative_dir) and (
+                self.in_ignored_dir(parent) or is_ignored(self.rules_for(parent), relative_dir.rstrip("/"), True)
+            )
+            self._ignored_dirs[relative_dir] = ignored
+        return ignored
+
+    def list_dirs(self, relative_dir: str, limit: int) -> List[str]:
+        """Returns a work tree directory and, up to `limit` in all, the subdirectories below it git status looks into."""
+        found = []
+        pending = [relative_dir]
+        while pending and len(found) < limit:
+            current = pending.pop()
+            found.append(current)
+            try:
+                with os.scandir(os.path.join(self.repo_path, current)) as scanner:
+                    names = [entry.name for entry in scanner if entry.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+            for name in names:
+                path = current + name
+                if name == ".git" or self.is_ignored(current, path, True):
+                    continue  # The repository itself, nested repositories' git dirs, build output, ...
+                pending.append(path + "/")
+        return found
+
+
+def _scan_work_tree(repo_path: str, git_dir: str, base_rules: List[IgnoreRule], limit: int):
+    """Returns (filter, work tree directories to watch) for a repository being opened; runs on a worker thread."""
+    work_tree_filter = _WorkTreeFilter(repo_path, base_rules, read_tracked_paths(git_dir))
+    return work_tree_filter, work_tree_filter.list_dirs("", limit)
+
+
+class RepositoryWatcher(QObject):
+    """Emits refresh_needed with the panels ('status', 'branches', 'history') affected by changes."""
+
+    refresh_needed = pyqtSignal(list)
+    # Results of the worker threads, emitted there with the generation they were
+    # started in (see _run_in_background()); delivered on the GUI thread
+    _work_tree_scanned = pyqtSignal(int, object)
+    _tracked_read = pyqtSignal(int, object)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._libc = _load_inotify()
+        self._fd = -1
+        self._notifier: Optional[QSocketNotifier] = None
+        self._qt_watcher: Optional[QFileSystemWatcher] = None
+        self._watch_dirs: Dict[int, str] = {}  # Map: inotify watch descriptor -> directory
+        self._watched: Set[str] = set()  # Directories being watched (both backends)
+        self._filter: Optional[_WorkTreeFilter] = None  # Set once the work tree walk is done
+        self._generation = 0  # Counts start()/stop(), so late worker results are dropped
+        self._reading_tracked = False
+        self._tracked_stale = False  # The index changed again while it was being read
+        self._watch_queue: deque = deque()  # Work tree directories ('' or 'a/b/') yet to be watched
+        self._watch_timer = QTimer(self)
+        self._watch_timer.setSingleShot(True)
+        self._watch_timer.setInterval(0)
+        self._watch_timer.timeout.connect(self._watch_next_batch)
+        self._started = 0.0  # When the repository was opened, until its directories are all watched
+        self._warned_limit = False
+        self.repo_path: Optional[str] = None
+        # Coalescing
+        self._pending: Set[str] = set()
+        self._burst_started = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(WATCH_DEBOUNCE_MS)
+        self._timer.timeout.connect(self._flush)
+        self._work_tree_scanned.connect(self._on_work_tree_scanned)
+        self._tracked_read.connect(self._on_tracked_read)
+
+    # --- Setup ---
+
+    def start(self, repo_path: str):
+        """Starts watching a repository (stops watching the previous one)."""
+        self.stop()
+        git_dir = find_git_dir(repo_path)
+        if not git_dir:
+            return
+        self.repo_path = os.path.abspath(repo_path)
+        self._git_dir = os.path.abspath(git_dir)
+        self._common_dir = os.path.abspath(find_common_dir(git_dir))
+        self._refs_dir = os.path.join(self._common_dir, "refs")
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                print(f"inotify unavailable ({os.strerror(ctypes.get_errno())}), using QFileSystemWatcher.")
+        if self._fd >= 0:
+            self._notifier = QSocketNotifier(self._fd, QSocketNotifier.Type.Read, self)
+            self._notifier.activated.connect(self._read_events)
+        else:
+            self._qt_watcher = QFileSystemWatcher(self)
+            self._qt_watcher.directoryChanged.connect(self._on_qt_directory_changed)
+        config = read_git_config(self._git_dir, self._common_dir)
+        base_rules = base_ignore_rules(self._common_dir, config)
+        self._started = time.perf_counter()
+        # Git's own files: HEAD and index live in the git dir, refs in the common dir
+        self._watch(self._git_dir)
+        if self._common_dir != self._git_dir:
+            self._watch(self._common_dir)
+        self._watch_tree(self._refs_dir)
+        limit = WATCH_MAX_DIRECTORIES - len(self._watched)
+        self._run_in_background(
+            self._work_tree_scanned, _scan_work_tree, self.repo_path, self._git_dir, base_rules, limit
+        )
+
+    def stop(self):
+        self._generation += 1
+        self._timer.stop()
+        self._pending.clear()
+        self._watch_timer.stop()
+        self._watch_queue.clear()
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier.deleteLater()
+            self._notifier = None
+        if self._fd >= 0:
+            os.close(self._fd)  # Removes all its watches
+            self._fd = -1
+        if self._qt_watcher is not None:
+            self._qt_watcher.deleteLater()
+            self._qt_watcher = None
+        self._watch_dirs.clear()
+        self._watched.clear()
+        self._filter = None
+        self._reading_tracked = False
+        self._tracked_stale = False
+        self._warned_limit = False
+        self.repo_path = None
+
+    def _watch(self, directory: str) -> bool:
+        if directory in self._watched:
+            return True
+        if len(self._watched) >= WATCH_MAX_DIRECTORIES:
+            if not self._warned_limit:
+                self._warned_limit = True
+                print(f"Not watching more than {WATCH_MAX_DIRECTORIES} directories.")
+            return False
+        if self._fd >= 0:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                return False  # Vanished meanwhile, or the watch limit was reached
+            self._watch_dirs[wd] = directory
+        elif not self._qt_watcher.addPath(directory):
+            return False
+        self._watched.add(directory)
+        return True
+
+    def _watch_tree(self, directory: str):
+        """Watches a directory of the git dir (e.g. refs) and everything below it."""
+        if not self._watch(directory):
+            return
+        try:
+            with os.scandir(directory) as scanner:
+                subdirectories = [entry.path for entry in scanner if entry.is_dir(follow_symlinks=False)]
+        except OSError:
+            return
+        for subdirectory in subdirectories:
+            self._watch_tree(subdirectory)
+
+    def _run_in_background(self, signal, function, *args):
+        """Runs function(*args) on a worker thread and emits (generation, result) through `signal`."""
+        generation = self._generation
+
+        def run():
+            try:
+                result = function(*args)
+            except Exception as e:
+                print(f"Watcher setup failed: {e}")
+                result = None
+            try:
+                signal.emit(generation, result)
+            except RuntimeError:
+                pass  # The watcher is gone (the app is closing)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _on_work_tree_scanned(self, generation: int, scan):
+        if generation != self._generation or scan is None:
+            return  # A repository no longer watched, or the walk failed
+        self._filter, relative_dirs = scan
+        self._queue_watches(relative_dirs)
+
+    def _queue_watches(self, relative_dirs: List[str]):
+        self._watch_queue.extend(relative_dirs)
+        if self._watch_queue and not self._watch_timer.isActive():
+            self._watch_timer.start()
+
+    def _watch_next_batch(self):
+        """Watches the next WATCH_BATCH_SIZE queued work tree directories, letting the event loop run in between."""
+        for _ in range(min(WATCH_BATCH_SIZE, len(self._watch_queue))):
+            self._watch(self._work_tree_path(self._watch_queue.popleft()))
+        if self._watch_queue:
+            self._watch_timer.start()
+        elif self._started:
+            print(
+                f"Watching {len(self._watched)} directories "
+                f"({'inotify' if self._fd >= 0 else 'QFileSystemWatcher'}, "
+                f"{(time.perf_counter() - self._started) * 1000:.0f} ms)."
+            )
+            self._started = 0.0
+
+    def _reload_tracked(self):
+        """Re-reads the tracked paths on a worker thread after the index changed (one read at a time)."""
+        if self._reading_tracked:
+            self._tracked_stale = True
+            return
+        self._reading_tracked = True
+        self._run_in_background(self._tracked_read, read_tracked_paths, self._git_dir)
+
+    def _on_tracked_read(self, generation: int, tracked):
+        if generation != self._generation:
+            return
+        self._reading_tracked = False
+        if self._tracked_stale:
+            self._tracked_stale = False
+            self._reload_tracked()
+        if self._filter is None:
+            return  # The work tree walk reads them itself
+        self._filter.set_tracked(tracked)
+        # Directories that became tracked, e.g. by force-adding a file in an ignored one
+        self._queue_watches(
+            [
+                relative_dir
+                for relative_dir in self._filter.tracked_dirs or ()
+                if self._work_tree_path(relative_dir) not in self._watched
+            ]
+        )
+
+    def _work_tree_path(self, relative_dir: str) -> str:
+        return os.path.join(self.repo_path, relative_dir).rstrip(os.sep) or os.sep
+
+    def _watch_work_tree(self, relative_dir: str):
+        """Watches a new work tree directory and the subdirectories below it git status looks into."""
+        if self._filter is None:
+            return  # The work tree walk is still running
+        limit = max(WATCH_MAX_DIRECTORIES - len(self._watched), 1)
+        for found in self._filter.list_dirs(relative_dir, limit):
+            if not self._watch(self._work_tree_path(found)):
+                break
+
+    # --- Events ---
+
+    def _read_events(self):
+        """Reads all pending inotify events and classifies them."""
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"Reading file system events failed: {e}")
+            return
+        position = 0
+        while position + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_length = _EVENT_HEADER.unpack_from(data, position)
+            position += _EVENT_HEADER.size
+            name = os.fsdecode(data[position : position + name_length].rstrip(b"\x00"))
+            position += name_length
+            if mask & IN_Q_OVERFLOW:
+                self._schedule(ALL_PANELS)  # Events were lost: refresh everything
+                continue
+            directory = self._watch_dirs.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                # The directory is gone; the kernel dropped its watch
+                del self._watch_dirs[wd]
+                self._watched.discard(directory)
+                continue
+            if name:
+                self._on_changed(directory, name, bool(mask & IN_ISDIR), bool(mask & (IN_CREATE | IN_MOVED_TO)))
+
+    def _on_qt_directory_changed(self, path: str):
+        """QFileSystemWatcher only says which directory changed; new subdirectories get watched here."""
+        if path.startswith(self._common_dir + os.sep) or path in (self._git_dir, self._common_dir):
+            self._schedule(ALL_PANELS)
+            if path == self._git_dir:
+                self._reload_tracked()  # Maybe the index
+            if path.startswith(self._refs_dir):
+                self._watch_tree(path)
+            return
+        relative_dir = os.path.relpath(path, self.repo_path)
+        relative_dir = "" if relative_dir == "." else relative_dir.replace(os.sep, "/") + "/"
+        self._schedule((PANEL_STATUS,))
+        if os.path.isdir(path):
+            self._watch_work_tree(relative_dir)
+
+    def _on_changed(self, directory: str, name: str, is_dir: bool, created: bool):
+        """Maps one changed entry to the panels showing it."""
+        if directory == self._git_dir or directory == self._common_dir:
+            if name == "HEAD" and directory == self._git_dir:
+                self._schedule(ALL_PANELS)  # Checkout, commit on a detached HEAD, ...
+            elif name == "index" and directory == self._git_dir:
+                self._schedule((PANEL_STATUS,))  # Staging from elsewhere (index.lock renamed)
+                self._reload_tracked()
+            elif name == "packed-refs" and directory == self._common_dir:
+                self._schedule(ALL_PANELS)
+            return  # Lock files, logs, FETCH_HEAD, ...: nothing shown depends on them
+        if directory == self._refs_dir or directory.startswith(self._refs_dir + os.sep):
+            if name.endswith(".lock"):
+                return
+            path = os.path.join(directory, name)
+            if is_dir:
+                if created:
+                    self._watch_tree(path)
+                return
+            self._schedule((PANEL_BRANCHES,))
+            ref_name = os.path.relpath(path, self._common_dir).replace(os.sep, "/")
+            if ref_name == self._head_ref():
+                self._schedule(ALL_PANELS)  # The checked out branch moved
+            return
+        if directory.startswith(self._git_dir + os.sep) or directory.startswith(self._common_dir + os.sep):
+            return  # Should not happen: only refs are watched below the git dir
+        # Work tree
+        relative_dir = os.path.relpath(directory, self.repo_path)
+        relative_dir = "" if relative_dir == "." else relative_dir.replace(os.sep, "/") + "/"
+        if name == ".git":
+            return
+        path = relative_dir + name
+        if self._filter is not None:
+            if self._filter.is_ignored(relative_dir, path, is_dir):
+                return  # Untracked build output and the like never shows up in the status
+            if name == ".gitignore":
+                self._filter.forget(relative_dir)  # Re-read, along with every subdirectory's rules
+        if is_dir and created:
+            self._watch_work_tree(path + "/")
+        self._schedule((PANEL_STATUS,))
+
+    def _head_ref(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self._git_dir, "HEAD"), "r", encoding="utf-8") as head_file:
+                value = head_file.read().strip()
+        except OSError:
+            return None
+        return value[len("ref:") :].strip() if value.startswith("ref:") else None
+
+    # --- Coalescing ---
+
+    def _schedule(self, panels):
+        """Adds panels to the pending refresh and (re)starts the quiet-period timer."""
+        self._pending.update(panels)
+        now = time.monotonic()
+        if not self._timer.isActive():
+            self._burst_started = now
+            self._timer.start()
+        elif (now - self._burst_started) * 1000 < WATCH_MAX_DELAY_MS:
+            self._timer.start()  # Still in the burst: wait for it to calm down
+        # else: let the running timer fire, so a long burst still refreshes periodically
+
+    def _flush(self):
+        panels, self._pending = self._pending, set()
+        if panels and self.repo_path:
+            self.refresh_needed.emit([panel for panel in ALL_PANELS if panel in panels])
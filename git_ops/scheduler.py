@@ -0,0 +1,272 @@
+# git_ops/scheduler.py
+from collections import deque
+from typing import List, Dict, Optional, Callable, Any
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .commands import GitCommandThread, GitFunctionThread
+
+# --- Scheduling Constants ---
+MAX_PARALLEL_READS = 4  # Read-only commands allowed to run at the same time
+MAX_BACKGROUND_JOBS = 1  # Background (speculative) jobs allowed to run at the same time
+# Subcommands that never change the repository; anything else runs exclusively
+READ_ONLY_SUBCOMMANDS = {
+    "log",
+    "show",
+    "diff",
+    "diff-tree",
+    "status",
+    "for-each-ref",
+    "rev-parse",
+    "rev-list",
+    "cat-file",
+    "ls-files",
+    "merge-base",
+}
+
+
+def is_read_only_command(command_list: List[str]) -> bool:
+    """Returns True if a 'git ...' command list only reads from the repository."""
+    return len(command_list) > 1 and command_list[1] in READ_ONLY_SUBCOMMANDS
+
+
+class GitJob:
+    """
+    One scheduled git command and where its results go.
+
+    Instead of a command, a job may run a Python `function` on a worker thread
+    (read-only unless told otherwise); its return value is stored in `result`
+    and passed to parser_slot in place of stdout.
+
+    A `chunked` job streams stdout as text chunks to batch_slot, optionally
+    stopping after max_bytes/max_lines; `truncated` tells whether it did.
+
+    A `background` job (e.g. a prefetch) is read-only and low priority: it
+    only starts while no other job is waiting.
+    """
+
+    def __init__(
+        self,
+        command: Optional[List[str]],
+        operation_name: str,
+        parser_slot: Optional[Callable[[str], Any]] = None,
+        line_parser: Optional[Callable[[str], Any]] = None,
+        batch_slot: Optional[Callable[[list], Any]] = None,
+        key: Optional[str] = None,
+        read_only: Optional[bool] = None,
+        function: Optional[Callable[[], Any]] = None,
+        chunked: bool = False,
+        max_bytes: Optional[int] = None,
+        max_lines: Optional[int] = None,
+        background: bool = False,
+    ):
+        self.command = command
+        self.function = function
+        self.result: Any = None
+        self.operation_name = operation_name
+        self.parser_slot = parser_slot  # Called with stdout on success
+        self.line_parser = line_parser  # Streaming mode: parses each stdout line
+        self.batch_slot = batch_slot  # Streaming mode: called with each parsed batch
+        self.key = key  # Jobs sharing a key supersede each other (latest wins)
+        self.chunked = chunked
+        self.max_bytes = max_bytes
+        self.max_lines = max_lines
+        self.truncated = False  # Chunked jobs: output was cut at the limits
+        if read_only is None:
+            read_only = function is not None or is_read_only_command(command)
+        self.read_only = read_only
+        self.background = background
+        if background and not read_only:
+            raise ValueError("Background jobs must be read-only.")
+        self.superseded = False  # Results of superseded jobs are dropped
+        self.thread: Optional[GitCommandThread] = None
+
+    def __repr__(self) -> str:
+        return f"<GitJob {self.operation_name}>"
+
+
+class GitCommandScheduler(QObject):
+    """
+    Runs git commands on GitCommandThreads, replacing the single 'current thread' lock.
+
+    Read-only commands run in parallel (up to MAX_PARALLEL_READS); a mutating
+    command waits for everything queued before it and runs alone. Jobs start in
+    submission order, so a read submitted after a write sees the write's result.
+    Background jobs wait in a queue of their own and start (up to
+    MAX_BACKGROUND_JOBS) only when the main queue is empty and no write runs.
+    """
+
+    # Emits (job, success_bool, stdout_str, stderr_str) once a job is done
+    job_finished = pyqtSignal(object, bool, str, str)
+    # Streaming jobs only: Emits (job, list_of_parsed_items); object, not list, so nothing is converted
+    job_batch = pyqtSignal(object, object)
+    # Emitted whenever jobs start or finish (e.g. to update busy indicators)
+    activity_changed = pyqtSignal()
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.cwd: Optional[str] = None
+        self._queue: deque = deque()  # Jobs waiting to start, in order
+        self._background: deque = deque()  # Background jobs waiting to start, in order
+        self._running: Dict[GitCommandThread, GitJob] = {}  # Map: thread -> job
+        # Threads that reported their result but whose run() hasn't returned yet;
+        # kept referenced so Python doesn't destroy a still running QThread
+        self._retiring: List[GitCommandThread] = []
+
+    # --- Queries ---
+
+    def isIdle(self) -> bool:
+        return not self._queue and not self._background and not self._running
+
+    def isWriting(self) -> bool:
+        """Returns True while a mutating command is running or waiting to run."""
+        return any(not job.read_only for job in self._running.values()) or any(
+            not job.read_only for job in self._queue
+        )
+
+    def activeJobs(self) -> List[GitJob]:
+        """Returns running and queued jobs (superseded ones excluded)."""
+        jobs = list(self._running.values()) + list(self._queue) + list(self._background)
+        return [job for job in jobs if not job.superseded]
+
+    def isActive(self, key: str) -> bool:
+        """Returns True if a job with this key is running or queued."""
+        return any(job.key == key for job in self.activeJobs())
+
+    def writingOperation(self) -> Optional[str]:
+        """Returns the name of the running or queued mutating operation, if any."""
+        for job in self.activeJobs():
+            if not job.read_only:
+                return job.operation_name
+        return None
+
+    # --- Submitting ---
+
+    def submit(self, job: GitJob) -> GitJob:
+        """Queues a job and starts it as soon as the scheduling rules allow."""
+        if job.key is not None:
+            self.cancel(job.key)
+        (self._background if job.background else self._queue).append(job)
+        self._start_ready_jobs()
+        return job
+
+    def cancel(self, key: str):
+        """Drops queued jobs with this key and ignores the results of running ones."""
+        for queue in (self._queue, self._background):
+            for job in [job for job in queue if job.key == key]:
+                queue.remove(job)
+        for job in self._running.values():
+            if job.key == key:
+                job.superseded = True
+
+    def cancelBackground(self, operation_name: Optional[str] = None):
+        """
+        Drops queued background jobs and ignores the results of running ones;
+        only those of one operation if operation_name is given.
+        """
+        def matches(job: GitJob) -> bool:
+            return job.background and operation_name in (None, job.operation_name)
+
+        for job in [job for job in self._background if matches(job)]:
+            self._background.remove(job)
+        for job in self._running.values():
+            if matches(job):
+                job.superseded = True
+
+    def clear(self):
+        """Forgets all queued jobs and ignores the results of running ones (e.g. repository switch)."""
+        self._queue.clear()
+        self._background.clear()
+        for job in self._running.values():
+            job.superseded = True
+        self.activity_changed.emit()
+
+    def waitForAll(self):
+        """Blocks until all running commands have finished. Queued jobs are dropped."""
+        self._queue.clear()
+        self._background.clear()
+        for thread in list(self._running) + self._retiring:
+            thread.wait()
+
+    def _start_ready_jobs(self):
+        started = False
+        while self._queue:
+            job = self._queue[0]
+            running_jobs = self._running.values()
+            if job.read_only:
+                # Reads wait for a running write and for a free slot
+                if any(not running.read_only for running in running_jobs):
+                    break
+                if len(self._running) >= MAX_PARALLEL_READS:
+                    break
+            elif self._running:
+                break  # A write runs alone
+            self._queue.popleft()
+            self._start(job)
+            started = True
+        # Background jobs only fill otherwise idle read slots
+        while self._background and not self._queue:
+            running_jobs = self._running.values()
+            if any(not running.read_only for running in running_jobs):
+                break
+            if len(self._running) >= MAX_PARALLEL_READS:
+                break
+            if sum(running.background for running in running_jobs) >= MAX_BACKGROUND_JOBS:
+                break
+            self._start(self._background.popleft())
+            started = True
+        if started:
+            self.activity_changed.emit()
+
+    def _start(self, job: GitJob):
+        try:
+            if job.function is not None:
+                thread = GitFunctionThread(job.function)
+            else:
+                thread = GitCommandThread(
+                    job.command,
+                    self.cwd,
+                    line_parser=job.line_parser,
+                    read_only=job.read_only,
+                    chunked=job.chunked,
+                    max_bytes=job.max_bytes,
+                    max_lines=job.max_lines,
+                )
+        except Exception as e:
+            # Report through the normal path so callers clean up as usual
+            print(f"Failed to start Git thread for {job.operation_name}: {e}")
+            self.job_finished.emit(job, False, "", f"Failed to start: {e}")
+            return
+        job.thread = thread
+        self._running[thread] = job
+        thread.command_finished.connect(self._on_thread_finished)
+        thread.batch_ready.connect(self._on_thread_batch)
+        thread.finished.connect(self._on_thread_exited)
+        thread.start()
+
+    # --- Thread Signals ---
+
+    def _on_thread_batch(self, thread, batch):
+        job = self._running.get(thread)
+        if job is not None and not job.superseded:
+            self.job_batch.emit(job, batch)
+
+    def _on_thread_finished(self, thread, success, stdout, stderr):
+        job = self._running.pop(thread, None)
+        if job is None:
+            return
+        if thread.isRunning():
+            self._retiring.append(thread)
+        job.result = getattr(thread, "result", None)
+        job.truncated = getattr(thread, "truncated", False)
+        if job.superseded:
+            print(f"Dropping result of superseded '{job.operation_name}'.")
+        else:
+            self.job_finished.emit(job, success, stdout, stderr)
+        self._start_ready_jobs()
+        self.activity_changed.emit()
+
+    def _on_thread_exited(self):
+        thread = self.sender()
+        if thread in self._retiring:
+            self._retiring.remove(thread)
@@ -0,0 +1,669 @@
+# git_ops/worktree_status.py
+"""
+Computes 'git status' (staged, unstaged and untracked files) in-process.
+
+- staged: index entries against the HEAD tree. Directories whose cache-tree
+  entry in the index still equals HEAD's tree are skipped without reading them.
+- unstaged: index entries against the working tree. Files are lstat'ed on a
+  thread pool; only files whose stat data differs from the index (or from the
+  previous refresh) are hashed.
+- untracked: a directory walk honouring .gitignore, info/exclude and
+  core.excludesFile, reporting wholly untracked directories as 'dir/' like
+  'git status --untracked-files=normal'.
+
+Whatever this can't reproduce exactly (merge conflicts, submodules, renames,
+content filters, split/sparse indexes, ...) makes compute() return None, and
+the caller runs 'git status' instead.
+"""
+
+import hashlib
+import os
+import re
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Optional, Set
+
+from .config import read_git_config, config_bool, has_conditional_includes
+from .index_file import (
+    GitIndex,
+    IndexEntry,
+    UnsupportedIndex,
+    read_index,
+    ENTRY_ASSUME_VALID,
+    ENTRY_SKIP_WORKTREE,
+    ENTRY_INTENT_TO_ADD,
+)
+from .object_store import find_git_dir, find_common_dir, resolve_ref
+from .objects import parse_commit, parse_tree, read_object, TREE_MODE
+from .porcelain import StatusEntry, merge_status_changes
+
+STATUS_WORKER_THREADS = min(8, (os.cpu_count() or 2) * 2)  # lstat mostly waits on the kernel
+STAT_CHUNK_SIZE = 512  # Index entries per lstat task
+HASH_CHUNK_SIZE = 1 << 20
+# Files modified this shortly before a scan may change again within the same
+# timestamp tick, so their hash isn't remembered for the next refresh
+RACY_MARGIN_NS = 2 * 1000 * 1000 * 1000
+GITLINK_MODE = 0o160000
+SYMLINK_MODE = 0o120000
+EXECUTABLE_MODE = 0o100755
+
+# (status letter, path) of one side (staged or unstaged), merged into StatusEntry records at the end
+StatusEntries = List[Tuple[str, str]]
+
+
+class UnsupportedStatus(Exception):
+    """The repository uses something compute() can't reproduce; fall back to git."""
+
+
+# --- Ignore rules ---
+
+
+def _translate_pattern(pattern: str) -> str:
+    """Translates a gitignore glob into a regular expression ('*' and '?' don't match '/')."""
+    parts = []
+    index = 0
+    length = len(pattern)
+    while index < length:
+        char = pattern[index]
+        if char == "*":
+            end = index
+            while end < length and pattern[end] == "*":
+                end += 1
+            whole_component = (index == 0 or pattern[index - 1] == "/") and (
+                end == length or pattern[end] == "/"
+            )
+            if end - index >= 2 and whole_component:
+                if end == length:
+                    parts.append(".*")  # Trailing '/**': everything inside
+                else:
+                    parts.append("(?:.*/)?")  # '**/': zero or more directories
+                    end += 1
+            else:
+                parts.append("[^/]*")
+            index = end
+        elif char == "?":
+            parts.append("[^/]")
+            index += 1
+        elif char == "[":
+            end = index + 1
+            if end < length and pattern[end] in "!^":
+                end += 1
+            if end < length and pattern[end] == "]":
+                end += 1
+            while end < length and pattern[end] != "]":
+                end += 1
+            if end >= length:
+                parts.append(re.escape(char))  # Unterminated: a literal '['
+                index += 1
+                continue
+            body = pattern[index + 1 : end]
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("[", "\\[") + "]")
+            index = end + 1
+        elif char == "\\" and index + 1 < length:
+            parts.append(re.escape(pattern[index + 1]))
+            index += 2
+        else:
+            parts.append(re.escape(char))
+            index += 1
+    return "".join(parts)
+
+
+class IgnoreRule:
+    """One line of an ignore file, bound to the directory it applies to."""
+
+    __slots__ = ("base", "regex", "negated", "dir_only", "anchored")
+
+    def __init__(self, base: str, line: str):
+        self.base = base  # Directory of the ignore file ('' or 'dir/'), patterns are relative to it
+        self.negated = line.startswith("!")
+        if self.negated:
+            line = line[1:]
+        self.dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        # A slash anywhere but at the end anchors the pattern to the base directory
+        self.anchored = "/" in line
+        self.regex = re.compile(_translate_pattern(line.lstrip("/")) + r"\Z", re.DOTALL)
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if not path.startswith(self.base):
+            return False
+        if self.anchored:
+            return self.regex.match(path, len(self.base)) is not None
+        return self.regex.match(path, path.rfind("/") + 1) is not None
+
+
+def parse_ignore_lines(text: str, base: str) -> List[IgnoreRule]:
+    rules = []
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        # Trailing spaces are ignored unless escaped ('\ '); '\#' and '\!' are
+        # literal, which _translate_pattern handles like any escaped character
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        if stripped.lstrip("!").strip("/"):
+            rules.append(IgnoreRule(base, stripped))
+    return rules
+
+
+def read_ignore_file(path: str, base: str) -> List[IgnoreRule]:
+    try:
+        with open(path, "rb") as ignore_file:
+            text = os.fsdecode(ignore_file.read())
+    except OSError:
+        return []
+    return parse_ignore_lines(text, base)
+
+
+def is_ignored(rules: List[IgnoreRule], path: str, is_dir: bool) -> bool:
+    """The last matching rule decides; rules are ordered from lowest to highest precedence."""
+    for rule in reversed(rules):
+        if rule.matches(path, is_dir):
+            return not rule.negated
+    return False
+
+
+def global_attributes_file(config: Dict[str, str]) -> str:
+    """The user's attributes file: core.attributesFile, by default $XDG_CONFIG_HOME/git/attributes."""
+    attributes_file = config.get("core.attributesfile")
+    if attributes_file:
+        return os.path.expanduser(attributes_file)
+    xdg_config = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(xdg_config, "git", "attributes")
+
+
+def base_ignore_rules(common_dir: str, config: Dict[str, str]) -> List[IgnoreRule]:
+    """Rules that apply everywhere: core.excludesFile, then info/exclude (higher precedence)."""
+    excludes_file = config.get("core.excludesfile")
+    if excludes_file:
+        excludes_file = os.path.expanduser(excludes_file)
+    else:
+        xdg_config = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+        excludes_file = os.path.join(xdg_config, "git", "ignore")
+    rules = read_ignore_file(excludes_file, "")
+    rules += read_ignore_file(os.path.join(common_dir, "info", "exclude"), "")
+    return rules
+
+
+# --- Status ---
+
+
+class WorkingTreeStatus:
+    """
+    Computes the status of one repository, keeping what it learnt between
+    refreshes: the parsed index (reused while the file is unchanged) and the
+    hashes of files whose stat data no longer matches the index.
+    """
+
+    def __init__(self, repo_path: str, object_reader):
+        self.repo_path = repo_path
+        self.object_reader = object_reader
+        self._lock = threading.Lock()  # One computation at a time (they share the caches)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._index_key = None  # Stat of the index file that _index was parsed from
+        self._index: Optional[GitIndex] = None
+        self._tracked_dirs: Set[str] = set()
+        self._tracked_paths: Set[str] = set()
+        self._tracked_attributes = False  # True if the index holds a .gitattributes (at any depth)
+        # Map: path -> (stat key, blob id) for files hashed by an earlier refresh
+        self._hashed: Dict[str, Tuple[tuple, bytes]] = {}
+        self._index_mtime_ns = 0
+        # Per checked index entry: (full path, path, entry, stat key, mode mask, expected mode bits)
+        self._stat_checks: List[tuple] = []
+        self._filemode = True  # core.fileMode: compare the executable bit
+        self._trust_ctime = True  # core.trustCtime
+        self.last_timings: Dict[str, float] = {}  # Seconds per phase of the last compute()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def compute(self, include_untracked: bool = True) -> Optional[List[StatusEntry]]:
+        """
+        Returns the status records in path order, or None when 'git status' must
+        be asked instead. Without include_untracked, only staged and unstaged
+        changes are computed (the untracked walk is usually the slow part; see
+        compute_untracked()).
+        """
+        with self._lock:
+            try:
+                return self._compute(include_untracked)
+            except (UnsupportedStatus, UnsupportedIndex) as e:
+                print(f"Status computed by git: {e}")
+                return None
+
+    def compute_untracked(self) -> Optional[List[StatusEntry]]:
+        """Returns only the untracked records, or None when 'git status' must be asked instead."""
+        with self._lock:
+            try:
+                git_dir, common_dir, config = self._open_repository()
+                started = time.perf_counter()
+                self._load_index(os.path.join(git_dir, "index"))  # Untracked means not in the index
+                untracked = self._untracked_files(common_dir, config)
+                self.last_timings = {"untracked": time.perf_counter() - started}
+                return merge_status_changes([], [], untracked)
+            except (UnsupportedStatus, UnsupportedIndex) as e:
+                print(f"Untracked files listed by git: {e}")
+                return None
+
+    def _open_repository(self) -> Tuple[str, str, Dict[str, str]]:
+        """Returns (git dir, common dir, config), raising UnsupportedStatus if git must be asked."""
+        git_dir = find_git_dir(self.repo_path)
+        if not git_dir:
+            raise UnsupportedStatus("git directory not found")
+        common_dir = find_common_dir(git_dir)
+        config = read_git_config(git_dir, common_dir)
+        self._check_supported(common_dir, config)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=STATUS_WORKER_THREADS, thread_name_prefix="status"
+            )
+        return git_dir, common_dir, config
+
+    def _compute(self, include_untracked: bool):
+        git_dir, common_dir, config = self._open_repository()
+        timings = {}
+        started = time.perf_counter()
+
+        index_path = os.path.join(git_dir, "index")
+        index = self._load_index(index_path)
+        if self._tracked_attributes:
+            # A nested .gitattributes may filter or convert contents like the root one
+            raise UnsupportedStatus("gitattributes")
+        entries = index.entries if index else []
+        for entry in entries:
+            if entry.stage:
+                raise UnsupportedStatus("unmerged entries")
+            if entry.mode == GITLINK_MODE:
+                raise UnsupportedStatus("submodules")
+            if entry.extended_flags & ENTRY_INTENT_TO_ADD:
+                raise UnsupportedStatus("intent-to-add entries")
+        timings["index"] = time.perf_counter() - started
+
+        phase_start = time.perf_counter()
+        staged = self._staged_changes(git_dir, index)
+        timings["staged"] = time.perf_counter() - phase_start
+
+        phase_start = time.perf_counter()
+        untracked_future = None
+        if include_untracked:
+            # Submitted first so the directory walk overlaps with the lstat calls
+            untracked_future = self._executor.submit(self._untracked_files, common_dir, config)
+        unstaged = self._unstaged_changes()
+        untracked = untracked_future.result() if untracked_future else []
+        timings["worktree"] = time.perf_counter() - phase_start
+        timings["total"] = time.perf_counter() - started
+        self.last_timings = timings
+        return merge_status_changes(staged, unstaged, untracked)
+
+    def _check_supported(self, common_dir: str, config: Dict[str, str]):
+        if has_conditional_includes(config):
+            # Could set any of the values checked here (core.autocrlf, core.excludesFile, ...)
+            raise UnsupportedStatus("conditional config includes")
+        if config.get("core.autocrlf", "false").lower() not in ("false", "no", "off", "0"):
+            raise UnsupportedStatus("core.autocrlf converts file contents")
+        if config.get("extensions.objectformat", "sha1").lower() != "sha1":
+            raise UnsupportedStatus("object format")
+        attributes_files = [
+            os.path.join(self.repo_path, ".gitattributes"),
+            os.path.join(common_dir, "info", "attributes"),
+            global_attributes_file(config),
+        ]
+        if any(os.path.exists(path) for path in attributes_files):
+            # Attributes may filter or convert contents (eol, LFS, ...)
+            raise UnsupportedStatus("gitattributes")
+        if config.get("core.ignorecase", "false").lower() in ("true", "yes", "on", "1"):
+            raise UnsupportedStatus("case insensitive file system")
+        self._filemode = config_bool(config, "core.filemode", True)
+        self._trust_ctime = config_bool(config, "core.trustctime", True)
+
+    def _load_index(self, index_path: str) -> Optional[GitIndex]:
+        """Returns the parsed index, reparsing only when the file changed since the last call."""
+        try:
+            index_stat = os.stat(index_path)
+        except FileNotFoundError:
+            self._index_key = None
+            self._index = None
+            self._tracked_paths = set()
+            self._tracked_attributes = False
+            self._tracked_dirs = set()
+            self._stat_checks = []
+            return None
+        key = (index_stat.st_mtime_ns, index_stat.st_size, index_stat.st_ino)
+        if key != self._index_key:
+            index = read_index(index_path)
+            for entry in index.entries:
+                if entry.path.endswith(b"/") or entry.path.startswith(b"/"):
+                    raise UnsupportedStatus("unexpected index path")
+            self._index = index
+            self._index_key = key
+            self._index_mtime_ns = index_stat.st_mtime_ns
+            paths = [os.fsdecode(entry.path) for entry in index.entries]
+            self._tracked_paths = set(paths)
+            self._tracked_attributes = any(
+                path == ".gitattributes" or path.endswith("/.gitattributes") for path in paths
+            )
+            tracked_dirs = set()
+            for path in paths:
+                slash = path.rfind("/")
+                while slash > 0:
+                    directory = path[:slash]
+                    if directory in tracked_dirs:
+                        break  # Its parents were added along with it
+                    tracked_dirs.add(directory)
+                    slash = path.rfind("/", 0, slash)
+            self._tracked_dirs = tracked_dirs
+            self._stat_checks = self._prepare_stat_checks(index.entries, paths)
+            # Hashes cached for files git has refreshed since are obsolete
+            self._hashed = {}
+        return self._index
+
+    # --- Staged: index against HEAD ---
+
+    def _head_tree(self, git_dir: str) -> Optional[str]:
+        """Returns HEAD's tree id, or None on an unborn branch."""
+        head = resolve_ref(self.repo_path, "HEAD")
+        if head is None:
+            try:
+                with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as head_file:
+                    symbolic = head_file.read().startswith("ref:")
+            except OSError:
+                symbolic = False
+            if symbolic and not os.path.isdir(os.path.join(find_common_dir(git_dir), "reftable")):
+                return None  # Unborn branch: everything in the index is new
+            raise UnsupportedStatus("HEAD can't be resolved")
+        content = read_object(self.object_reader, head, "commit")
+        if content is None:
+            raise UnsupportedStatus("HEAD commit not readable")
+        return parse_commit(content)["tree"]
+
+    def _flatten_tree(
+        self,
+        tree: str,
+        prefix: bytes,
+        cache_tree: Dict[bytes, bytes],
+        files: Dict[bytes, Tuple[int, bytes]],
+        same_dirs: Set[bytes],
+    ):
+        """Lists HEAD's files as path -> (mode, id), skipping directories the index has unchanged."""
+        directory = prefix[:-1]
+        if cache_tree.get(directory) == bytes.fromhex(tree):
+            same_dirs.add(directory)
+            return
+        content = read_object(self.object_reader, tree, "tree")
+        if content is None:
+            raise UnsupportedStatus(f"tree {tree} not readable")
+        for name, (mode, oid) in parse_tree(content).items():
+            if mode == TREE_MODE:
+                self._flatten_tree(oid, prefix + name + b"/", cache_tree, files, same_dirs)
+            else:
+                files[prefix + name] = (int(mode, 8), bytes.fromhex(oid))
+
+    @staticmethod
+    def _in_same_dir(path: bytes, same_dirs: Set[bytes]) -> bool:
+        if b"" in same_dirs:
+            return True
+        slash = path.find(b"/")
+        while slash > 0:
+            if path[:slash] in same_dirs:
+                return True
+            slash = path.find(b"/", slash + 1)
+        return False
+
+    def _staged_changes(self, git_dir: str, index: Optional[GitIndex]) -> StatusEntries:
+        head_tree = self._head_tree(git_dir)
+        head_files: Dict[bytes, Tuple[int, bytes]] = {}
+        same_dirs: Set[bytes] = set()
+        if head_tree:
+            cache_tree = index.cache_tree if index else {}
+            self._flatten_tree(head_tree, b"", cache_tree, head_files, same_dirs)
+        changes = []
+        for entry in index.entries if index else []:
+            head_file = head_files.pop(entry.path, None)
+            if head_file is None:
+                if not self._in_same_dir(entry.path, same_dirs):
+                    changes.append(("A", entry.path))
+            elif head_file[1] != entry.oid or head_file[0] != entry.mode:
+                type_changed = stat.S_IFMT(head_file[0]) != stat.S_IFMT(entry.mode)
+                changes.append(("T" if type_changed else "M", entry.path))
+        changes.extend(("D", path) for path in head_files)  # Left over: not in the index
+        if any(code == "A" for code, _ in changes) and any(code == "D" for code, _ in changes):
+            raise UnsupportedStatus("possible renames")  # Rename detection is left to git
+        return sorted(((code, os.fsdecode(path)) for code, path in changes), key=lambda change: change[1])
+
+    # --- Unstaged: working tree against index ---
+
+    def _prepare_stat_checks(self, entries: List[IndexEntry], paths: List[str]) -> List[tuple]:
+        """
+        Precomputes what the lstat loop compares, once per index file: the stat
+        key of each entry in os.stat_result units, and the file type (plus the
+        executable bit, for regular files) its mode must have.
+        """
+        checks = []
+        root = self.repo_path.rstrip(os.sep) + os.sep
+        for entry, path in zip(entries, paths):
+            if entry.flags & ENTRY_ASSUME_VALID or entry.extended_flags & ENTRY_SKIP_WORKTREE:
+                continue  # Git doesn't look at these files either
+            mtime = entry.mtime_s * 1000000000 + entry.mtime_ns
+            stat_key = None
+            if mtime < self._index_mtime_ns:  # Racily clean entries always need their content checked
+                stat_key = (
+                    mtime,
+                    entry.size,
+                    entry.ino,
+                    entry.uid,
+                    entry.gid,
+                    entry.ctime_s * 1000000000 + entry.ctime_ns,
+                )
+            if stat.S_IFMT(entry.mode) == stat.S_IFLNK:
+                mode_mask, mode_bits = stat.S_IFMT(0o177777), stat.S_IFLNK
+            else:
+                mode_mask, mode_bits = stat.S_IFMT(0o177777) | stat.S_IXUSR, entry.mode & (
+                    stat.S_IFMT(0o177777) | stat.S_IXUSR
+                )
+            checks.append((root + path, path, entry, stat_key, mode_mask, mode_bits))
+        return checks
+
+    def _unstaged_changes(self) -> StatusEntries:
+        scan_started_ns = time.time_ns()
+        checks = self._stat_checks
+        chunks = [
+            checks[start : start + STAT_CHUNK_SIZE]
+            for start in range(0, len(checks), STAT_CHUNK_SIZE)
+        ]
+        futures = [
+            self._executor.submit(self._check_entries, chunk, scan_started_ns) for chunk in chunks
+        ]
+        changes = []
+        for future in futures:
+            changes.extend(future.result())
+        return changes  # Chunks are in index order, i.e. sorted by path
+
+    def _check_entries(self, checks: List[tuple], scan_started_ns: int) -> StatusEntries:
+        changes = []
+        lstat = os.lstat
+        trust_ctime = self._trust_ctime
+        # Without core.fileMode only the file type must match
+        type_only = 0 if self._filemode else stat.S_IXUSR
+        for full_path, path, entry, stat_key, mode_mask, mode_bits in checks:
+            try:
+                file_stat = lstat(full_path)
+            except (FileNotFoundError, NotADirectoryError):
+                changes.append(("D", path))
+                continue
+            # Fast path, taken by nearly every file: stat data as recorded in the index
+            if (
+                stat_key is not None
+                and file_stat.st_mode & (mode_mask & ~type_only) == mode_bits & ~type_only
+                and stat_key
+                == (
+                    file_stat.st_mtime_ns,
+                    file_stat.st_size & 0xFFFFFFFF,
+                    file_stat.st_ino & 0xFFFFFFFF,
+                    file_stat.st_uid,
+                    file_stat.st_gid,
+                    file_stat.st_ctime_ns if trust_ctime else stat_key[5],
+                )
+            ):
+                continue
+            code = self._entry_change(entry, path, file_stat, scan_started_ns)
+            if code:
+                changes.append((code, path))
+        return changes
+
+    def _stat_matches(self, entry: IndexEntry, file_stat: os.stat_result) -> bool:
+        """Like git's ie_match_stat: unchanged stat data means unchanged content."""
+        mtime_s, mtime_ns = divmod(file_stat.st_mtime_ns, 1000000000)
+        if (
+            entry.mtime_s != mtime_s & 0xFFFFFFFF
+            or entry.mtime_ns != mtime_ns
+            or entry.size != file_stat.st_size & 0xFFFFFFFF
+            or entry.ino != file_stat.st_ino & 0xFFFFFFFF
+            or entry.uid != file_stat.st_uid & 0xFFFFFFFF
+            or entry.gid != file_stat.st_gid & 0xFFFFFFFF
+        ):
+            return False
+        if self._trust_ctime:
+            ctime_s, ctime_ns = divmod(file_stat.st_ctime_ns, 1000000000)
+            if entry.ctime_s != ctime_s & 0xFFFFFFFF or entry.ctime_ns != ctime_ns:
+                return False
+        # Racily clean: modified in the same tick the index was written; only the content tells
+        entry_mtime = entry.mtime_s * 1000000000 + entry.mtime_ns
+        return entry_mtime < self._index_mtime_ns
+
+    def _entry_change(
+        self, entry: IndexEntry, path: str, file_stat: os.stat_result, scan_started_ns: int
+    ) -> Optional[str]:
+        """Returns 'M', 'T' (type change) or None for a tracked file present in the working tree."""
+        file_mode = file_stat.st_mode
+        entry_is_link = stat.S_IFMT(entry.mode) == stat.S_IFLNK
+        if stat.S_ISDIR(file_mode):
+            return "D"  # Replaced by a directory; its content shows up as untracked
+        if stat.S_ISLNK(file_mode) != entry_is_link:
+            return "T"
+        if not entry_is_link and self._filemode:
+            executable = bool(file_mode & stat.S_IXUSR)
+            if executable != (entry.mode == EXECUTABLE_MODE):
+                return "M"
+        if self._stat_matches(entry, file_stat):
+            return None
+        # Different size, different content (no filters, see _check_supported). Size 0
+        # is never trusted: git stores it for racily clean entries it "smudged" when
+        # writing the index, whatever the real size (see git's ie_modified)
+        if not entry_is_link and entry.size != 0 and entry.size != file_stat.st_size & 0xFFFFFFFF:
+            return "M"
+        stat_key = (
+            file_stat.st_mtime_ns,
+            file_stat.st_ctime_ns,
+            file_stat.st_size,
+            file_stat.st_ino,
+            file_mode,
+        )
+        cached = self._hashed.get(path)
+        if cached is not None and cached[0] == stat_key:
+            oid = cached[1]
+        else:
+            oid = self._hash_file(path, entry_is_link)
+            if oid is None:
+                return "D"  # Vanished while scanning
+            if file_stat.st_mtime_ns + RACY_MARGIN_NS < scan_started_ns:
+                self._hashed[path] = (stat_key, oid)
+        return None if oid == entry.oid else "M"
+
+    def _hash_file(self, path: str, is_link: bool) -> Optional[bytes]:
+        """Returns the blob id the file (or symlink target) would get if added."""
+        full_path = os.path.join(self.repo_path, path)
+        try:
+            if is_link:
+                content = os.fsencode(os.readlink(full_path))
+                return hashlib.sha1(b"blob %d\x00" % len(content) + content).digest()
+            with open(full_path, "rb") as blob_file:
+                size = os.fstat(blob_file.fileno()).st_size
+                digest = hashlib.sha1(b"blob %d\x00" % size)
+                read = 0
+                while True:
+                    chunk = blob_file.read(HASH_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    read += len(chunk)
+                    digest.update(chunk)
+                if read != size:
+                    return b""  # Changed while reading: report as modified
+                return digest.digest()
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except OSError:
+            return b""  # Unreadable: can't equal the index id
+
+    # --- Untracked ---
+
+    def _untracked_files(self, common_dir: str, config: Dict[str, str]) -> List[str]:
+        rules = base_ignore_rules(common_dir, config)
+        untracked: List[str] = []
+        self._walk_tracked_dir("", rules, untracked)
+        return sorted(untracked)
+
+    def _walk_tracked_dir(self, directory: str, rules: List[IgnoreRule], untracked: List[str]):
+        """Reports untracked files (and wholly untracked directories) below a directory holding tracked files."""
+        rules = rules + read_ignore_file(
+            os.path.join(self.repo_path, directory, ".gitignore"), directory
+        )
+        try:
+            with os.scandir(os.path.join(self.repo_path, directory)) as scanner:
+                children = list(scanner)
+        except OSError:
+            return
+        for child in children:
+            if child.name == ".git":
+                continue  # The repository itself (or a linked worktree's .git file)
+            path = directory + child.name
+            try:
+                is_dir = child.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if not is_dir:
+                if child.name == ".gitattributes" and directory:
+                    # Untracked, but it still applies to the tracked files next to it
+                    raise UnsupportedStatus("gitattributes")
+                if path not in self._tracked_paths and not is_ignored(rules, path, False):
+                    untracked.append(path)
+                continue
+            if is_ignored(rules, path, True):
+                continue  # Nothing below an ignored directory is reported
+            if path in self._tracked_dirs:
+                self._walk_tracked_dir(path + "/", rules, untracked)
+            elif self._has_untracked_content(path + "/", rules):
+                untracked.append(path + "/")
+
+    def _has_untracked_content(self, directory: str, rules: List[IgnoreRule]) -> bool:
+        """True if an untracked directory holds anything not ignored (it is then listed as 'dir/')."""
+        full_path = os.path.join(self.repo_path, directory)
+        if os.path.lexists(os.path.join(full_path, ".git")):
+            return True  # A nested repository is always shown
+        rules = rules + read_ignore_file(os.path.join(full_path, ".gitignore"), directory)
+        try:
+            with os.scandir(full_path) as scanner:
+                children = list(scanner)
+        except OSError:
+            return False
+        subdirectories = []
+        for child in children:
+            path = directory + child.name
+            try:
+                is_dir = child.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_ignored(rules, path, is_dir):
+                continue
+            if not is_dir:
+                return True
+            subdirectories.append(path + "/")
+        return any(self._has_untracked_content(path, rules) for path in subdirectories)
@@ -0,0 +1,260 @@
+# ui/branch_tree.py
+
+import bisect
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import Qt, QObject, QAbstractItemModel, QModelIndex
+from PyQt6.QtGui import QFont
+
+from .model_rows import row_diff_runs, signal_row_runs
+
+LOCAL_PREFIX = "refs/heads/"
+REMOTE_PREFIX = "refs/remotes/"
+LOCAL_GROUP = "Local"
+REMOTES_GROUP = "Remotes"
+# Branch rows a group adds per fetchMore(), i.e. when it is expanded or scrolled to its end
+BRANCH_FETCH_BATCH = 500
+# Above this many separate runs of changed rows in one group, its loaded rows are
+# removed and inserted again in two steps instead of run by run
+BRANCH_MAX_ROW_RUNS = 200
+
+
+class _BranchGroup:
+    """A row with children: the hidden root, 'Local', 'Remotes' or one remote."""
+
+    def __init__(self, name: str, parent: Optional["_BranchGroup"], ref_prefix: str = ""):
+        self.name = name
+        self.parent = parent
+        self.ref_prefix = ref_prefix  # Turns a branch name into its full ref
+        self.groups: List["_BranchGroup"] = []  # Child groups, listed before the branches
+        self.branches: List[str] = []  # All branch names, sorted; the first `loaded` are rows
+        self.loaded = 0
+
+    def row(self) -> int:
+        return self.parent.groups.index(self)
+
+    def group_named(self, name: str) -> Optional["_BranchGroup"]:
+        for group in self.groups:
+            if group.name == name:
+                return group
+        return None
+
+
+class BranchTreeModel(QAbstractItemModel):
+    """
+    The branches panel as a tree: 'Local' holds the local branches, 'Remotes'
+    one group per remote holding its branches.
+
+    Branch rows are made lazily: a group only reports rows for the branches
+    fetched so far, and the view asks for more (canFetchMore()/fetchMore())
+    when the group is expanded or scrolled to its end, BRANCH_FETCH_BATCH at a
+    time. So tens of thousands of remote branches cost nothing until their
+    remote is opened. A refresh doesn't rebuild the tree: setBranches()
+    compares each group with its previous branches and signals only the runs
+    of loaded rows that were removed or inserted, like StatusListModel, so
+    expanded groups, the selection and the scroll position survive.
+
+    Every index points at the group holding its row (its parent), which is
+    why removed groups are kept referenced until the next reset.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._root = _BranchGroup("", None)
+        self._head: Optional[str] = None  # Current local branch (shown bold)
+        self._removed_groups: List[_BranchGroup] = []
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    # --- Model interface ---
+
+    def index(self, row: int, column: int, parent=QModelIndex()) -> QModelIndex:
+        group = self._group(parent)
+        if group is None or column != 0 or not 0 <= row < len(group.groups) + group.loaded:
+            return QModelIndex()
+        return self.createIndex(row, 0, group)
+
+    def parent(self, index: QModelIndex = None):
+        if index is None:  # QObject.parent()
+            return QObject.parent(self)
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer())
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        group = self._group(parent)
+        return 0 if group is None else len(group.groups) + group.loaded
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()) -> bool:
+        # True before any branch was fetched, so the view offers to expand the group
+        group = self._group(parent)
+        return group is not None and bool(group.groups or group.branches)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        group = self._group(parent)
+        return group is not None and group.loaded < len(group.branches)
+
+    def fetchMore(self, parent: QModelIndex):
+        group = self._group(parent)
+        if group is None:
+            return
+        count = min(BRANCH_FETCH_BATCH, len(group.branches) - group.loaded)
+        if count <= 0:
+            return
+        first = len(group.groups) + group.loaded
+        self.beginInsertRows(parent, first, first + count - 1)
+        group.loaded += count
+        self.endInsertRows()
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        if self._group(index) is not None:
+            return Qt.ItemFlag.ItemIsEnabled  # Group rows can't be selected
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        child = self._group(index)
+        if child is not None:
+            return child.name if role == Qt.ItemDataRole.DisplayRole else None
+        group = index.internalPointer()
+        name = group.branches[index.row() - len(group.groups)]
+        is_local = group.ref_prefix == LOCAL_PREFIX
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return group.ref_prefix + name
+        if role == Qt.ItemDataRole.UserRole:
+            # The short name checks a local branch out; remote branches keep the full ref
+            return name if is_local else group.ref_prefix + name
+        if role == Qt.ItemDataRole.FontRole and is_local and name == self._head:
+            return self._bold_font
+        return None
+
+    # --- Access ---
+
+    def localBranch(self, index: QModelIndex) -> Optional[str]:
+        """Returns the name of the local branch at `index`, or None for any other row."""
+        if not index.isValid() or self._group(index) is not None:
+            return None
+        group = index.internalPointer()
+        if group.ref_prefix != LOCAL_PREFIX:
+            return None
+        return group.branches[index.row() - len(group.groups)]
+
+    # --- Updates ---
+
+    def clear(self):
+        self.beginResetModel()
+        self._root = _BranchGroup("", None)
+        self._head = None
+        self._removed_groups = []
+        self.endResetModel()
+
+    def setBranches(self, local: List[str], remotes: Dict[str, List[str]], head: Optional[str]):
+        """
+        Updates the tree to the given local branch names, remote branch names by
+        remote and current branch. Categories without branches aren't shown.
+        """
+        categories = []
+        if local:
+            categories.append((LOCAL_GROUP, LOCAL_PREFIX))
+        if remotes:
+            categories.append((REMOTES_GROUP, REMOTE_PREFIX))
+        self._update_groups(self._root, categories)
+        local_group = self._root.group_named(LOCAL_GROUP)
+        if local_group is not None:
+            self._update_branches(local_group, local)
+        remotes_group = self._root.group_named(REMOTES_GROUP)
+        if remotes_group is not None:
+            names = sorted(remotes)
+            self._update_groups(remotes_group, [(name, f"{REMOTE_PREFIX}{name}/") for name in names])
+            for group in remotes_group.groups:
+                self._update_branches(group, remotes[group.name])
+        old_head, self._head = self._head, head
+        if old_head != head and local_group is not None:
+            for name in (old_head, head):
+                self._branch_changed(local_group, name)
+
+    def _update_groups(self, parent: _BranchGroup, wanted):
+        """Makes parent's groups the (name, ref prefix) pairs in `wanted`, in that order."""
+        wanted_names = {name for name, _ in wanted}
+        parent_index = self._index_of(parent)
+        for row in reversed(range(len(parent.groups))):
+            if parent.groups[row].name not in wanted_names:
+                self.beginRemoveRows(parent_index, row, row)
+                self._removed_groups.append(parent.groups.pop(row))
+                self.endRemoveRows()
+        # The remaining groups are in wanted order; the new ones go in between
+        for row, (name, ref_prefix) in enumerate(wanted):
+            if row < len(parent.groups) and parent.groups[row].name == name:
+                continue
+            self.beginInsertRows(parent_index, row, row)
+            parent.groups.insert(row, _BranchGroup(name, parent, ref_prefix))
+            self.endInsertRows()
+
+    def _update_branches(self, group: _BranchGroup, names: List[str]):
+        """Takes over a group's new branch names, signalling only the loaded rows that change."""
+        names = sorted(names)
+        old = group.branches
+        if names == old:
+            return
+        loaded = group.loaded
+        # Rows stay loaded up to the same name as before (a fully loaded group also
+        # shows new branches after its last one), within what was loaded or one batch
+        if loaded == 0:
+            new_loaded = 0
+        elif loaded == len(old):
+            new_loaded = len(names)
+        else:
+            new_loaded = bisect.bisect_right(names, old[loaded - 1])
+        new_loaded = min(new_loaded, max(loaded, BRANCH_FETCH_BATCH))
+        old_rows, new_rows = old[:loaded], names[:new_loaded]
+        removed_runs, inserted_runs = row_diff_runs(old_rows, new_rows)
+        if len(removed_runs) + len(inserted_runs) > BRANCH_MAX_ROW_RUNS:
+            removed_runs = [[0, loaded - 1]] if loaded else []
+            inserted_runs = [[0, new_loaded - 1]] if new_loaded else []
+        # While rows are signalled, `branches` holds exactly the loaded rows
+        rows = list(old_rows)
+        group.branches = rows
+
+        def remove(first: int, last: int):
+            del rows[first : last + 1]
+            group.loaded = len(rows)
+
+        def insert(first: int, last: int):
+            rows[first:first] = new_rows[first : last + 1]
+            group.loaded = len(rows)
+
+        signal_row_runs(
+            self, self._index_of(group), removed_runs, inserted_runs, remove, insert, offset=len(group.groups)
+        )
+        group.branches = names
+        group.loaded = new_loaded
+
+    def _branch_changed(self, group: _BranchGroup, name: Optional[str]):
+        """Signals that a loaded branch row is shown differently (e.g. it became the current branch)."""
+        if name is None:
+            return
+        row = bisect.bisect_left(group.branches, name, 0, group.loaded)
+        if row < group.loaded and group.branches[row] == name:
+            index = self.createIndex(len(group.groups) + row, 0, group)
+            self.dataChanged.emit(index, index)
+
+    def _group(self, index: QModelIndex) -> Optional[_BranchGroup]:
+        """Returns the group a row stands for (the root for an invalid index), or None for a branch row."""
+        if not index.isValid():
+            return self._root
+        parent = index.internalPointer()
+        row = index.row()
+        return parent.groups[row] if row < len(parent.groups) else None
+
+    def _index_of(self, group: _BranchGroup) -> QModelIndex:
+        if group.parent is None:
+            return QModelIndex()
+        return self.createIndex(group.row(), 0, group.parent)
@@ -1,9 +1,21 @@
 # ui/commit_graph_widget.py
 
-from PyQt6.QtWidgets import QWidget, QScrollArea, QVBoxLayout, QSizePolicy
-from PyQt6.QtGui import QPainter, QColor, QPen, QBrush, QFontMetrics, QFont, QMouseEvent
-from PyQt6.QtCore import Qt, QRect, QPoint, QSize, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QScrollArea, QVBoxLayout, QSizePolicy, QToolTip
+from PyQt6.QtGui import (
+    QPainter,
+    QColor,
+    QPen,
+    QBrush,
+    QFontMetrics,
+    QFont,
+    QMouseEvent,
+    QPixmap,
+)
+from PyQt6.QtCore import Qt, QRect, QPoint, QSize, QEvent, QTimer, pyqtSignal
 from typing import List, Dict, Tuple, Optional, Any  # For type hinting
+from collections import OrderedDict
+
+from .graph_layout import GraphLayout
 
 # --- Constants ---
 NODE_RADIUS = 5
@@ -33,6 +45,10 @@ BRANCH_COLORS = [  # Simple cycle of colors for branches
 ]
 DEFAULT_NODE_COLOR = QColor("#AAAAAA")  # For edges where lane isn't clear
 SELECTED_PEN_COLOR = QColor("#FFD700")  # Gold for selection highlight
+MIN_GRAPH_HEIGHT = 200  # Ensure the graph is visible even when empty
+TILE_ROWS = 32  # Rows per cached pixmap tile
+MAX_CACHED_TILES = 48  # Least recently used tiles beyond this are dropped
+LOAD_MORE_THRESHOLD = V_SPACING * 20  # Pixels from the bottom that trigger loading more history
 
 
 class CommitGraphWidget(QWidget):
@@ -40,164 +56,99 @@ class CommitGraphWidget(QWidget):
 
     # Signal emitted when a commit node is clicked
     commit_selected = pyqtSignal(str)  # Emits commit hash
+    # Signal emitted after rows were inserted above the existing ones
+    rows_prepended = pyqtSignal(int)  # Emits number of new rows
+    # Signal emitted when rows on screen lack author/subject (commits walked from the commit-graph)
+    text_needed = pyqtSignal(list)  # Emits commit hashes; answer with setCommitText
+    # Signal emitted when keyboard navigation selected a node that may be off screen
+    node_focused = pyqtSignal(int, int)  # Emits the node's widget coordinates (x, y)
 
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
-        # Commit data structure: list of dicts from parser
+        # Commit data structure: list of dicts from parser, in arrival order
         # Expects dicts like: {"hash": str, "parents": List[str], "author": str, "date_ts": int, "msg": str}
+        # "author" and "msg" may be missing; they are then requested via text_needed once shown
         self._commits_data: List[Dict[str, Any]] = []
-        # Layout structures calculated by _assign_layout
-        self._nodes: Dict[
-            str, Dict[str, Any]
-        ] = {}  # Map: commit_hash -> {x, y, color_idx}
-        self._edges: List[
-            Tuple[str, str, int]
-        ] = []  # List of tuples: (from_hash, to_hash, color_idx)
-        # Dimensions calculated by _assign_layout
+        self._commits_by_hash: Dict[str, Dict[str, Any]] = {}  # Map: commit_hash -> commit dict
+        # Layout (rows, lanes, edges) calculated by _assign_layout / _prepend_layout
+        self._layout = GraphLayout()
+        # Dimensions calculated from the layout
         self._max_x = 0
         self._max_y = 0
+        self._reset_layout_state()
         # State
         self._selected_commit_hash: Optional[str] = None  # Track selected commit hash
+        self._text_requested = set()  # Hashes already announced through text_needed
+        self._text_pending: List[str] = []  # Hashes to announce once the current paint is done
 
         # Basic widget setup
-        self.setMinimumHeight(200)  # Ensure it's visible even when empty
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        # Clicking a node gives the graph focus, so Up/Down then step through history
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
         # Enable mouse tracking if needed for hover effects later
         # self.setMouseTracking(True)
 
-    def _assign_layout(self):
-        """
-        Assigns X, Y coordinates and colors to commits for drawing.
-        This is a very basic layout algorithm, prioritizing linearity and available lanes.
-        Needs significant improvement for complex histories (merges, criss-crossing).
-        """
-        # Reset layout data structures
-        self._nodes = {}
-        self._edges = []
+    def _reset_layout_state(self):
+        """Discards the layout; the next _assign_layout starts from scratch."""
+        self._layout = GraphLayout()
+        self._tiles: "OrderedDict[int, QPixmap]" = OrderedDict()  # Map: tile -> rendered pixmap
+        self._tile_width = 0
+        self._laid_out_count = 0  # Number of entries of _commits_data already placed
         self._max_x = 0
         self._max_y = 0
 
+    def _row_y(self, row: int) -> int:
+        """Returns the Y coordinate of a logical layout row."""
+        return OFFSET_Y + (row - self._layout.top_row) * V_SPACING
+
+    @staticmethod
+    def _lane_x(lane: int) -> int:
+        """Returns the X coordinate of a lane."""
+        return OFFSET_X + lane * H_SPACING
+
+    def _assign_layout(self):
+        """
+        Assigns rows and lanes to commits added since the last call.
+        Rows and lanes already assigned stay put, so further pages of history
+        simply extend the graph. See GraphLayout for the algorithm.
+        """
         # If no commit data, clear and exit
         if not self._commits_data:
+            self._reset_layout_state()
             self.updateGeometry()  # Update size hint (will shrink)
             self.update()  # Trigger repaint (will clear)
             return
 
-        # --- Layout Algorithm Data Structures ---
-        lanes: Dict[
-            int, int
-        ] = {}  # Map: lane_index -> last_commit_y occupying that lane
-        # lane_commits: Dict[int, str] = {}      # Map: lane_index -> commit_hash currently occupying it (optional)
-        commit_lane: Dict[str, int] = {}  # Map: commit_hash -> assigned_lane_index
-        commit_y_pos: Dict[
-            str, int
-        ] = {}  # Map: commit_hash -> assigned_y_pos (useful for debugging)
-        next_lane = 0  # Counter for allocating new lanes
-        y_pos = OFFSET_Y  # Current vertical position for placing nodes
-        processed_hashes = set()  # Track processed commits to avoid duplicates
-
-        # Process commits roughly in reverse chronological order (as git log usually provides)
-        # Sorting explicitly by timestamp ensures consistency
-        sorted_commits = sorted(
-            self._commits_data, key=lambda c: c.get("date_ts", 0), reverse=True
-        )
-
-        for i, commit in enumerate(sorted_commits):
-            commit_hash = commit["hash"]
-            if commit_hash in processed_hashes:
-                print(
-                    f"Warning: Duplicate commit hash {commit_hash} encountered in layout."
-                )
-                continue  # Skip duplicates
-
-            # --- Find a Lane for this Commit ---
-            assigned_lane = -1
-            parent_hashes = commit.get("parents", [])
-            available_lanes = list(
-                range(next_lane)
-            )  # Lanes potentially available to reuse
-
-            # Option 1: Try to inherit lane from first parent if it's free at this Y
-            if parent_hashes:
-                first_parent_hash = parent_hashes[0]
-                if (
-                    first_parent_hash in commit_lane
-                ):  # Check if parent has been processed and assigned a lane
-                    parent_lane_idx = commit_lane[first_parent_hash]
-                    # Is the lane free *at or before* this Y position?
-                    if lanes.get(parent_lane_idx, -1) < y_pos:
-                        assigned_lane = parent_lane_idx
-                        # Remove from available lanes check if we potentially take it
-                        if assigned_lane in available_lanes:
-                            available_lanes.remove(assigned_lane)
-
-            # Option 2: If no parent lane or parent lane occupied, find first completely free lane
-            if assigned_lane == -1:
-                for lane_idx in available_lanes:
-                    if (
-                        lanes.get(lane_idx, -1) < y_pos
-                    ):  # Check if lane is free up to this Y
-                        assigned_lane = lane_idx
-                        break
-
-            # Option 3: If still no lane found, allocate a new one
-            if assigned_lane == -1:
-                assigned_lane = next_lane
-                next_lane += 1
-
-            # --- Assign Position and Color ---
-            x_pos = OFFSET_X + assigned_lane * H_SPACING
-            color_idx = assigned_lane % len(
-                BRANCH_COLORS
-            )  # Cycle through colors based on lane index
-
-            # Store node layout information
-            self._nodes[commit_hash] = {"x": x_pos, "y": y_pos, "color_idx": color_idx}
-            commit_lane[commit_hash] = assigned_lane
-            commit_y_pos[commit_hash] = y_pos
-
-            # Mark lane as occupied up to this Y position
-            lanes[assigned_lane] = y_pos
-            # lane_commits[assigned_lane] = commit_hash # Track occupant (optional)
-
-            # Update maximum dimensions seen so far for calculating widget size
-            self._max_x = max(self._max_x, x_pos)
-            self._max_y = y_pos
-
-            processed_hashes.add(commit_hash)
-            y_pos += V_SPACING  # Increment Y for the next commit row
-
-        # --- Create Edges (after all nodes have potential positions) ---
-        # This pass ensures we only draw edges between nodes that exist in the current view
-        for commit_hash, node_info in self._nodes.items():
-            # Find the original commit data to get parent list
-            original_commit = next(
-                (c for c in self._commits_data if c["hash"] == commit_hash), None
-            )
-            if not original_commit:
-                print(
-                    f"Warning: Original commit data not found for hash {commit_hash} when creating edges."
-                )
-                continue
-
-            parent_hashes = original_commit.get("parents", [])
-            node_color_idx = node_info[
-                "color_idx"
-            ]  # Use the child node's color index for the edge
-
-            for parent_hash in parent_hashes:
-                # Only create edge if parent node exists in our processed node list
-                if parent_hash in self._nodes:
-                    # Store edge information: (child_hash, parent_hash, color_index)
-                    self._edges.append((commit_hash, parent_hash, node_color_idx))
-                else:
-                    # This means the parent is outside the range of commits we loaded (due to max-count)
-                    # print(f"Debug: Parent {parent_hash[:7]} for commit {commit_hash[:7]} not found in loaded nodes.")
-                    pass
-
-        # --- Update widget geometry and trigger repaint ---
+        # Commits are placed in arrival order ('git log' already yields them newest
+        # first). Re-sorting would move rows that are already on screen.
+        new_commits = self._commits_data[self._laid_out_count :]
+        self._laid_out_count = len(self._commits_data)
+        self._layout.append(new_commits)
+        self._layout_changed()
+
+    def _prepend_layout(self, new_commits: List[Dict[str, Any]]):
+        """Places commits above the current top row without moving the existing rows."""
+        self._layout.prepend(new_commits)
+        self._layout_changed()
+
+    def _layout_changed(self):
+        """Updates the graph size after nodes were placed and schedules a repaint."""
+        layout = self._layout
+        if len(layout):
+            self._max_x = self._lane_x(layout.lane_count - 1)
+            self._max_y = self._row_y(layout.end_row - 1)
+        else:
+            self._max_x = self._max_y = 0
+        # Tiles span the graph's width: a new lane means every tile must be redrawn
+        tile_width = self._max_x + H_SPACING + OFFSET_X
+        if tile_width != self._tile_width:
+            self._tile_width = tile_width
+            self._tiles.clear()
+            layout.take_dirty_spans()
+        for first_row, last_row in layout.take_dirty_spans():
+            self._invalidate_rows(first_row, last_row)
         print(
-            f"Layout assigned: {len(self._nodes)} nodes, {len(self._edges)} edges. MaxX: {self._max_x}, MaxY: {self._max_y}"
+            f"Layout assigned: {len(layout)} nodes, {len(layout.edge_child)} edges. MaxX: {self._max_x}, MaxY: {self._max_y}"
         )
         self.updateGeometry()  # Recalculate size hint based on content
         self.update()  # Trigger repaint event
@@ -207,8 +158,10 @@ class CommitGraphWidget(QWidget):
         print(f"GraphWidget received {len(commits_data)} commits.")
         # Store the raw data
         self._commits_data = commits_data
+        self._commits_by_hash = {commit["hash"]: commit for commit in commits_data}
         # Reset selection when data changes
         self._selected_commit_hash = None
+        self._text_requested = set()
         # Ensure data has timestamps if sort key relies on it (done in parser is better)
         for commit in self._commits_data:
             if "date_ts" not in commit:
@@ -216,9 +169,69 @@ class CommitGraphWidget(QWidget):
                     f"Warning: Commit {commit.get('hash', 'N/A')[:7]} missing 'date_ts'."
                 )
                 commit["date_ts"] = 0  # Add fallback if missing
-        # Recalculate layout and trigger repaint
+        # Recalculate layout from scratch and trigger repaint
+        self._reset_layout_state()
         self._assign_layout()
 
+    def appendData(self, commits_batch: List[Dict[str, Any]]):
+        """Adds a batch of commits (e.g. a further page of history) below the existing rows."""
+        if not commits_batch:
+            return
+        for commit in commits_batch:
+            if "date_ts" not in commit:
+                commit["date_ts"] = 0  # Add fallback if missing
+            self._commits_by_hash[commit["hash"]] = commit
+        self._commits_data.extend(commits_batch)
+        self._assign_layout()
+
+    def prependData(self, new_commits: List[Dict[str, Any]]):
+        """Adds commits newer than the current top (e.g. after a commit or pull) above the existing rows."""
+        if not new_commits:
+            return
+        if not len(self._layout):
+            self.appendData(new_commits)
+            return
+        for commit in new_commits:
+            if "date_ts" not in commit:
+                commit["date_ts"] = 0  # Add fallback if missing
+            self._commits_by_hash[commit["hash"]] = commit
+        # _commits_data keeps arrival order (not row order), so this stays an append
+        self._commits_data.extend(new_commits)
+        self._laid_out_count = len(self._commits_data)
+        self._prepend_layout(new_commits)
+        self.rows_prepended.emit(len(new_commits))
+
+    def restoreData(self, commits_data: List[Dict[str, Any]], layout: GraphLayout):
+        """Shows commits with a layout computed earlier (e.g. loaded from the history cache)."""
+        print(f"GraphWidget restoring {len(commits_data)} commits.")
+        self._commits_data = commits_data
+        self._commits_by_hash = {commit["hash"]: commit for commit in commits_data}
+        self._selected_commit_hash = None
+        self._text_requested = set()
+        self._reset_layout_state()
+        self._layout = layout
+        self._laid_out_count = len(commits_data)  # Already placed, nothing to lay out
+        self._layout_changed()
+
+    def setCommitText(self, texts: Dict[str, Dict[str, str]]):
+        """Merges loaded author/subject ("author", "msg") into the commits, keyed by hash."""
+        for commit_hash, text in texts.items():
+            commit = self._commits_by_hash.get(commit_hash)
+            if commit is not None:
+                commit.update(text)
+
+    def commitsData(self) -> List[Dict[str, Any]]:
+        """Returns the commits held by the graph, in arrival order."""
+        return self._commits_data
+
+    def graphLayout(self) -> GraphLayout:
+        """Returns the layout (rows, lanes, edges) of the commits held by the graph."""
+        return self._layout
+
+    def commitCount(self) -> int:
+        """Returns the number of commits currently held by the graph."""
+        return len(self._commits_data)
+
     def sizeHint(self) -> QSize:
         """Provide a preferred size based on graph content."""
         # Calculate width and height based on max coordinates plus padding
@@ -228,42 +241,77 @@ class CommitGraphWidget(QWidget):
         height = self._max_y + V_SPACING + OFFSET_Y  # Padding below last node
         # Ensure a minimum sensible size even if the graph is small or empty
         min_width = 150
-        min_height = self.minimumHeight()  # Use the minimum height set in init
+        # Not a fixed minimumHeight: that would override minimumSizeHint in a resizable QScrollArea
+        min_height = MIN_GRAPH_HEIGHT
         calculated_size = QSize(max(width, min_width), max(height, min_height))
         # print(f"Graph sizeHint: {calculated_size.width()}x{calculated_size.height()}")
         return calculated_size
 
+    def minimumSizeHint(self) -> QSize:
+        """A resizable QScrollArea never shrinks its widget below this, so it must cover the whole graph."""
+        return self.sizeHint()
+
+    def commitAt(self, pos: QPoint) -> Optional[str]:
+        """Returns the hash of the commit node under a widget position, or None. O(1)."""
+        layout = self._layout
+        if not len(layout):
+            return None
+        # Rows sit at fixed V_SPACING intervals: the nearest row is the only candidate,
+        # and the row's lane gives the only node on it
+        row = layout.top_row + round((pos.y() - OFFSET_Y) / V_SPACING)
+        if row < layout.top_row or row >= layout.end_row:
+            return None
+        dist_sq = (pos.x() - self._lane_x(layout.lane_at(row))) ** 2 + (
+            pos.y() - self._row_y(row)
+        ) ** 2
+        # Click sensitivity radius (slightly larger than node)
+        if dist_sq > (NODE_RADIUS * 1.5) ** 2:
+            return None
+        return layout.hash_at(row)
+
+    def neighbourCommits(self, commit_hash: str, count: int) -> List[str]:
+        """Returns the hashes of up to `count` rows above and below a commit, nearest first."""
+        layout = self._layout
+        row = layout.row_of(commit_hash)
+        if row is None:
+            return []
+        neighbours = []
+        for distance in range(1, count + 1):
+            for neighbour_row in (row + distance, row - distance):  # Older first: the usual direction
+                if layout.top_row <= neighbour_row < layout.end_row:
+                    neighbours.append(layout.hash_at(neighbour_row))
+        return neighbours
+
+    def event(self, event: QEvent) -> bool:
+        """Shows a tooltip with the commit summary when hovering a node."""
+        if event.type() == QEvent.Type.ToolTip:
+            commit_hash = self.commitAt(event.pos())
+            commit = self._commits_by_hash.get(commit_hash) if commit_hash else None
+            if commit:
+                if "author" in commit:
+                    text = f"{commit_hash[:10]}  {commit['author']}\n{commit.get('msg', '')}"
+                else:
+                    text = f"{commit_hash[:10]}\nloading…"  # Requested when the row was painted
+                QToolTip.showText(event.globalPos(), text, self)
+            else:
+                QToolTip.hideText()
+                event.ignore()
+            return True
+        return super().event(event)
+
     def mousePressEvent(self, event: QMouseEvent):
         """Handle clicks to select commit nodes."""
         if event.button() == Qt.MouseButton.LeftButton:
-            click_pos = (
-                event.position().toPoint()
-            )  # Get click position relative to widget
-            clicked_hash = None
-            # Define click sensitivity radius squared (slightly larger than node)
-            min_dist_sq = (NODE_RADIUS * 1.5) ** 2
-
-            # Iterate through drawn nodes to find if click hit one
-            for commit_hash, node_info in self._nodes.items():
-                node_center = QPoint(node_info["x"], node_info["y"])
-                # Calculate squared distance from click to node center
-                dist_sq = (click_pos.x() - node_center.x()) ** 2 + (
-                    click_pos.y() - node_center.y()
-                ) ** 2
-                # If click is within sensitivity radius
-                if dist_sq <= min_dist_sq:
-                    clicked_hash = commit_hash
-                    break  # Found the clicked node, no need to check others
+            clicked_hash = self.commitAt(event.position().toPoint())
 
             # If the clicked node is different from the currently selected one
             if clicked_hash != self._selected_commit_hash:
-                self._selected_commit_hash = clicked_hash
+                # Repaints only the tiles holding the old and new highlight
+                self.setSelectedCommit(clicked_hash)
                 print(f"Node selected: {self._selected_commit_hash}")
                 # Emit signal only if a valid node was clicked
                 if self._selected_commit_hash:
                     self.commit_selected.emit(self._selected_commit_hash)
-                # Trigger repaint to show the selection highlight change
-                self.update()
             # If clicking outside nodes, maybe deselect?
             # elif clicked_hash is None and self._selected_commit_hash is not None:
             #     self._selected_commit_hash = None
@@ -274,40 +322,58 @@ class CommitGraphWidget(QWidget):
             # Pass other mouse button events to the base class
             super().mousePressEvent(event)
 
-    def paintEvent(self, event: Optional[Any]):  # Type hint Any for QPaintEvent
-        """Draws the commit graph, highlighting the selected node."""
-        # If no nodes or edges calculated, nothing to draw
-        if not self._nodes and not self._edges:
-            # Optionally draw a placeholder text if empty?
-            # painter = QPainter(self)
-            # painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No history to display.")
-            # painter.end()
+    def keyPressEvent(self, event):
+        """Up/Down select the previous/next commit, like clicking its node."""
+        step = {Qt.Key.Key_Up: -1, Qt.Key.Key_Down: 1}.get(event.key())
+        layout = self._layout
+        row = layout.row_of(self._selected_commit_hash) if self._selected_commit_hash else None
+        if step is None or row is None:
+            return super().keyPressEvent(event)
+        row += step
+        if not layout.top_row <= row < layout.end_row:
             return
+        self.setSelectedCommit(layout.hash_at(row))
+        self.node_focused.emit(self._lane_x(layout.lane_at(row)), self._row_y(row))
+        self.commit_selected.emit(self._selected_commit_hash)
+
+    def _rows_in_rect(self, rect: QRect) -> Tuple[int, int]:
+        """Returns the (first, last) layout rows whose nodes or edges may intersect a rectangle."""
+        layout = self._layout
+        top_row = layout.top_row
+        # Nodes extend NODE_RADIUS around their row's Y; one extra row either side is plenty
+        first_row = top_row + (rect.top() - OFFSET_Y) // V_SPACING - 1
+        last_row = top_row + (rect.bottom() - OFFSET_Y) // V_SPACING + 1
+        return max(first_row, top_row), min(last_row, layout.end_row - 1)
+
+    def _edge_points(self, child_row: int, parent_row: int, via_lane: int) -> List[QPoint]:
+        """Returns the polyline of an edge: into its via lane, down the lane, into the parent."""
+        layout = self._layout
+        points = [QPoint(self._lane_x(layout.lane_at(child_row)), self._row_y(child_row))]
+        if parent_row - child_row > 1:
+            via_x = self._lane_x(via_lane)
+            points.append(QPoint(via_x, self._row_y(child_row + 1)))
+            points.append(QPoint(via_x, self._row_y(parent_row - 1)))
+        points.append(
+            QPoint(self._lane_x(layout.lane_at(parent_row)), self._row_y(parent_row))
+        )
+        return points
 
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        # Clear background
-        painter.fillRect(self.rect(), Qt.GlobalColor.white)
+    def _draw_rows(self, painter: QPainter, first_row: int, last_row: int):
+        """Draws the nodes in [first_row, last_row] and every edge touching those rows."""
+        layout = self._layout
 
         # --- Draw Edges ---
         edge_pen = QPen()
         edge_pen.setWidth(LINE_WIDTH)
-        for from_hash, to_hash, color_idx in self._edges:
-            # Ensure both ends of the edge exist in the current layout
-            if from_hash in self._nodes and to_hash in self._nodes:
-                node_from = self._nodes[from_hash]
-                node_to = self._nodes[to_hash]
-
-                # Determine edge color based on the child node's lane color
-                edge_color = BRANCH_COLORS[color_idx % len(BRANCH_COLORS)]
-                edge_pen.setColor(edge_color)
-                painter.setPen(edge_pen)
-
-                # Simple straight line connection
-                # TODO: Implement curved lines for merges (would require more complex path calculation)
-                painter.drawLine(
-                    node_from["x"], node_from["y"], node_to["x"], node_to["y"]
-                )
+        for edge_index in layout.edges_in_rows(first_row, last_row):
+            child_row = layout.edge_child[edge_index]
+            parent_row = layout.edge_parent[edge_index]
+            via_lane = layout.edge_via[edge_index]
+            # Determine edge color based on the child node's lane color
+            edge_color = BRANCH_COLORS[layout.lane_at(child_row) % len(BRANCH_COLORS)]
+            edge_pen.setColor(edge_color)
+            painter.setPen(edge_pen)
+            painter.drawPolyline(self._edge_points(child_row, parent_row, via_lane))
 
         # --- Draw Nodes ---
         node_pen = QPen(QColor("black"))  # Default outline color for nodes
@@ -315,14 +381,13 @@ class CommitGraphWidget(QWidget):
         selected_node_pen = QPen(SELECTED_PEN_COLOR)  # Outline color for selected node
         selected_node_pen.setWidth(3)  # Thicker outline for selected node
 
-        # Iterate through all nodes to draw them
-        for commit_hash, node_info in self._nodes.items():
-            color_idx = node_info["color_idx"]
-            brush_color = BRANCH_COLORS[color_idx % len(BRANCH_COLORS)]
+        for row in range(first_row, last_row + 1):
+            lane = layout.lane_at(row)
+            brush_color = BRANCH_COLORS[lane % len(BRANCH_COLORS)]
             painter.setBrush(QBrush(brush_color))  # Fill color based on lane
 
-            center_x = node_info["x"]
-            center_y = node_info["y"]
+            center_x = self._lane_x(lane)
+            center_y = self._row_y(row)
             # Define the bounding rectangle for the ellipse
             rect = QRect(
                 center_x - NODE_RADIUS,
@@ -332,7 +397,7 @@ class CommitGraphWidget(QWidget):
             )
 
             # Set the outline pen based on whether the node is selected
-            if commit_hash == self._selected_commit_hash:
+            if layout.hash_at(row) == self._selected_commit_hash:
                 painter.setPen(selected_node_pen)
             else:
                 painter.setPen(node_pen)
@@ -340,15 +405,128 @@ class CommitGraphWidget(QWidget):
             # Draw the node
             painter.drawEllipse(rect)
 
+    # --- Tile Cache ---
+    # The graph is rendered into pixmaps of TILE_ROWS rows, keyed by logical tile
+    # index (row // TILE_ROWS). Prepending rows only moves where tiles are drawn,
+    # so tiles are re-rendered only when the layout or selection inside them changes.
+
+    def _tile_origin_y(self, tile: int) -> int:
+        """Returns the widget Y of a tile's top edge (half a row above its first node)."""
+        return self._row_y(tile * TILE_ROWS) - V_SPACING // 2
+
+    def _tile_pixmap(self, tile: int) -> QPixmap:
+        """Returns the cached pixmap of a tile, rendering it first if needed."""
+        pixmap = self._tiles.get(tile)
+        if pixmap is not None:
+            self._tiles.move_to_end(tile)  # Most recently used
+            return pixmap
+
+        layout = self._layout
+        dpr = self.devicePixelRatioF()
+        pixmap = QPixmap(
+            max(1, int(self._tile_width * dpr)), int(TILE_ROWS * V_SPACING * dpr)
+        )
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.GlobalColor.white)
+        first_row = max(tile * TILE_ROWS - 1, layout.top_row)
+        last_row = min((tile + 1) * TILE_ROWS, layout.end_row - 1)
+        if first_row <= last_row:
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.translate(0, -self._tile_origin_y(tile))  # Draw in widget coordinates
+            self._draw_rows(painter, first_row, last_row)
+            painter.end()
+
+        self._tiles[tile] = pixmap
+        while len(self._tiles) > MAX_CACHED_TILES:
+            self._tiles.popitem(last=False)  # Drop least recently used
+        return pixmap
+
+    def _invalidate_rows(self, first_row: int, last_row: int):
+        """Drops cached tiles overlapping [first_row, last_row] and schedules their repaint."""
+        # Edges reach half a row into the neighbouring tile, hence the one row margin
+        first_tile = (first_row - 1) // TILE_ROWS
+        last_tile = (last_row + 1) // TILE_ROWS
+        for tile in [t for t in self._tiles if first_tile <= t <= last_tile]:
+            del self._tiles[tile]
+        top_y = self._tile_origin_y(first_tile)
+        bottom_y = self._tile_origin_y(last_tile + 1)
+        self.update(QRect(0, top_y, self.width(), bottom_y - top_y))
+
+    def _invalidate_commit(self, commit_hash: Optional[str]):
+        """Re-renders the tile holding a commit's node (e.g. after selection changes)."""
+        row = self._layout.row_of(commit_hash) if commit_hash else None
+        if row is not None:
+            self._invalidate_rows(row, row)
+
+    def setSelectedCommit(self, commit_hash: Optional[str]):
+        """Highlights a commit (or none), redrawing only the affected tiles."""
+        if commit_hash == self._selected_commit_hash:
+            return
+        previous_hash = self._selected_commit_hash
+        self._selected_commit_hash = commit_hash
+        self._invalidate_commit(previous_hash)
+        self._invalidate_commit(commit_hash)
+
+    def paintEvent(self, event: Optional[Any]):  # Type hint Any for QPaintEvent
+        """Draws the commit graph from cached tiles, highlighting the selected node."""
+        layout = self._layout
+        # If no nodes calculated, nothing to draw
+        if not len(layout):
+            # Optionally draw a placeholder text if empty?
+            # painter = QPainter(self)
+            # painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No history to display.")
+            # painter.end()
+            return
+
+        # Only tiles intersecting the exposed area are drawn, so the cost of a
+        # repaint depends on the viewport size, not on the length of the history
+        exposed_rect = event.rect() if event is not None else self.rect()
+        first_row, last_row = self._rows_in_rect(exposed_rect)
+
+        painter = QPainter(self)
+        # Clear background (tiles only cover the graph's own width)
+        painter.fillRect(exposed_rect, Qt.GlobalColor.white)
+        if first_row <= last_row:
+            for tile in range(first_row // TILE_ROWS, last_row // TILE_ROWS + 1):
+                painter.drawPixmap(0, self._tile_origin_y(tile), self._tile_pixmap(tile))
         painter.end()
+        self._request_missing_text(first_row, last_row)
+
+    def _request_missing_text(self, first_row: int, last_row: int):
+        """Queues the painted rows whose commits have no author/subject yet for text_needed."""
+        layout = self._layout
+        commits_by_hash = self._commits_by_hash
+        requested = self._text_requested
+        for row in range(first_row, last_row + 1):
+            commit_hash = layout.hash_at(row)
+            if commit_hash in requested:
+                continue
+            commit = commits_by_hash.get(commit_hash)
+            if commit is not None and "author" not in commit:
+                requested.add(commit_hash)
+                if not self._text_pending:
+                    # Emitted after painting, so the receiver may start work freely
+                    QTimer.singleShot(0, self._emit_text_needed)
+                self._text_pending.append(commit_hash)
+
+    def _emit_text_needed(self):
+        hashes, self._text_pending = self._text_pending, []
+        if hashes:
+            self.text_needed.emit(hashes)
 
 
 # --- Wrapper with Scroll Area (Provides scrolling for the graph) ---
 class ScrollableCommitGraphWidget(QScrollArea):
     """A QScrollArea specialized for holding and scrolling the CommitGraphWidget."""
 
+    # Emitted when the user scrolls near the bottom and more history may be available
+    more_commits_requested = pyqtSignal()
+
     def __init__(self, parent: Optional[QWidget] = None):
         super().__init__(parent)
+        # Whether further pages of history can be requested (set by the owner)
+        self._has_more_commits = False
         # Create the actual graph drawing widget
         self.graph_widget = CommitGraphWidget()
         # Set the inner widget for the scroll area
@@ -360,6 +538,43 @@ class ScrollableCommitGraphWidget(QScrollArea):
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         # Ensure the scroll area itself expands to fill available space
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        # Request further pages when scrolling (or resizing) brings the bottom into reach
+        self.verticalScrollBar().valueChanged.connect(self._check_load_more)
+        self.verticalScrollBar().rangeChanged.connect(self._check_load_more)
+        # Keep the rows the user is looking at in place when new commits appear on top
+        self.graph_widget.rows_prepended.connect(self._on_rows_prepended)
+        # Keep the node selected with the keyboard on screen
+        self.graph_widget.node_focused.connect(
+            lambda x, y: self.ensureVisible(x, y, OFFSET_X, V_SPACING)
+        )
+        self._pending_scroll_shift = 0
+        self.verticalScrollBar().rangeChanged.connect(self._apply_scroll_shift)
+
+    def _on_rows_prepended(self, row_count: int):
+        """Remembers how far to scroll once the scroll range has grown for the new rows."""
+        if self.verticalScrollBar().value() > 0:  # At the very top, show the new commits
+            self._pending_scroll_shift += row_count * V_SPACING
+
+    def _apply_scroll_shift(self, *_args):
+        """Shifts the scroll position by the height of rows inserted above the view."""
+        if self._pending_scroll_shift:
+            scroll_bar = self.verticalScrollBar()
+            shift, self._pending_scroll_shift = self._pending_scroll_shift, 0
+            scroll_bar.setValue(scroll_bar.value() + shift)
+
+    def setHasMoreCommits(self, has_more: bool):
+        """Tells the scroll area whether more history can be loaded on demand."""
+        self._has_more_commits = has_more
+        if has_more:
+            self._check_load_more()
+
+    def _check_load_more(self, *_args):
+        """Emits more_commits_requested if the view is within LOAD_MORE_THRESHOLD of the bottom."""
+        if not self._has_more_commits:
+            return
+        scroll_bar = self.verticalScrollBar()
+        if scroll_bar.value() >= scroll_bar.maximum() - LOAD_MORE_THRESHOLD:
+            self.more_commits_requested.emit()
 
     def setData(self, commits_data: List[Dict[str, Any]]):
         """Passes the commit data down to the inner graph widget."""
@@ -0,0 +1,334 @@
+# ui/diff_view.py
+
+import bisect
+from array import array
+from itertools import accumulate, islice
+from typing import List
+
+from PyQt6.QtCore import Qt, QRect, QTimer
+from PyQt6.QtGui import QColor, QFont, QFontMetrics, QPainter, QKeySequence, QGuiApplication
+from PyQt6.QtWidgets import QAbstractScrollArea, QMenu
+
+DIFF_ADDED_COLOR = QColor("darkgreen")
+DIFF_REMOVED_COLOR = QColor("darkred")
+DIFF_HEADER_COLOR = QColor("darkblue")
+DIFF_DEFAULT_COLOR = QColor("black")
+DIFF_SELECTION_COLOR = QColor(200, 220, 255)
+DIFF_BACKGROUND_COLOR = QColor("white")
+DIFF_HEADER_PREFIXES = ("diff --git", "index ", "---", "+++")
+DIFF_TAB_WIDTH = 8
+# Lines longer than this are cut to the visible columns before tabs are
+# expanded, so a minified one-line file doesn't cost a full expansion per paint
+DIFF_LONG_LINE = 4096
+DIFF_MARGIN = 4  # Pixels left of the text
+DIFF_INDEX_CHUNK = 1 << 20  # Characters indexed per step (see DiffDocument)
+
+
+class DiffDocument:
+    """
+    A diff held as text plus the offset of every line in it.
+
+    The index is built without keeping per-line Python objects, in chunks of
+    C-level passes: long single C calls would hold the GIL and stall the GUI
+    thread while a worker thread indexes a huge diff. The view then slices
+    out just the lines it paints.
+
+    Streamed diffs grow with append(). The text is kept as the appended
+    pieces (joined only when all of it is asked for), so appending never
+    copies what is already there.
+    """
+
+    def __init__(self, text: str = ""):
+        self._pieces: List[str] = []
+        self._piece_starts = array("q")  # Offset of each piece in the whole text
+        self.length = 0
+        # Line i spans offsets[i] to offsets[i + 1] - 1 (the '\n' excluded);
+        # an unterminated last line ends at a virtual offset length + 1
+        self.offsets = array("q", [0])
+        self.max_line_length = 0
+        self.append(text)
+
+    def append(self, text: str):
+        if not text:
+            return
+        carried = 0  # Length of the unterminated last line that text continues
+        if self.length and self.offsets[-1] > self.length:
+            self.offsets.pop()
+            carried = self.length - self.offsets[-1]
+        base = self.length
+        self._pieces.append(text)
+        self._piece_starts.append(base)
+        self.length += len(text)
+        position = 0
+        while position < len(text):
+            end = text.find("\n", position + DIFF_INDEX_CHUNK)
+            end = len(text) if end < 0 else end + 1  # Chunks end after a newline
+            lengths = array("q", map(len, text[position:end].split("\n")))
+            if text[end - 1] == "\n":
+                lengths.pop()  # The empty piece after the chunk's final newline
+            # Each line starts one past the end of the previous one
+            self.offsets.extend(
+                islice(accumulate(map((1).__add__, lengths), initial=base + position), 1, None)
+            )
+            if position == 0:
+                lengths[0] += carried
+            self.max_line_length = max(self.max_line_length, max(lengths, default=0))
+            position = end
+
+    @property
+    def text(self) -> str:
+        if len(self._pieces) > 1:
+            self._pieces = ["".join(self._pieces)]
+            self._piece_starts = array("q", [0])
+        return self._pieces[0] if self._pieces else ""
+
+    def _slice(self, start: int, end: int) -> str:
+        index = bisect.bisect_right(self._piece_starts, start) - 1
+        piece_start = self._piece_starts[index]
+        piece = self._pieces[index]
+        if end <= piece_start + len(piece):
+            return piece[start - piece_start : end - piece_start]
+        # Spans pieces: only happens for lines cut by a chunk boundary, or copies
+        parts = [piece[start - piece_start :]]
+        while end > piece_start + len(piece):
+            index += 1
+            piece_start = self._piece_starts[index]
+            piece = self._pieces[index]
+            parts.append(piece[: end - piece_start])
+        return "".join(parts)
+
+    def lineCount(self) -> int:
+        return len(self.offsets) - 1
+
+    def byteSize(self) -> int:
+        """Approximate memory held (text and index), for byte-bounded caches."""
+        return self.length + self.offsets.itemsize * len(self.offsets)
+
+    def line(self, number: int) -> str:
+        return self._slice(self.offsets[number], min(self.offsets[number + 1] - 1, self.length))
+
+    def lines(self, first: int, last: int) -> str:
+        """Lines first..last (inclusive) as text, e.g. for copying."""
+        return self._slice(self.offsets[first], min(self.offsets[last + 1] - 1, self.length))
+
+
+class DiffView(QAbstractScrollArea):
+    """
+    Read-only, virtualized diff viewer.
+
+    Only the lines inside the viewport are painted, sliced out of the
+    document's text and colored by their first characters as they are drawn,
+    so opening or scrolling a diff costs the same for 50 lines or 5 million.
+    The vertical scroll bar counts lines; the font is fixed pitch, so columns
+    map directly to pixels. Selection is by whole lines (mouse drag,
+    Shift+click, Ctrl+A) and Ctrl+C copies it.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._document = DiffDocument()
+        self._selection_anchor = -1  # First clicked line of the selection, -1: none
+        self._selection_end = -1
+        # Streamed text waiting to be indexed; one piece is added per event loop
+        # pass, so a fast stream can't queue up seconds of indexing in one go
+        self._pending: List[str] = []
+        self._append_timer = QTimer(self)
+        self._append_timer.setSingleShot(True)
+        self._append_timer.setInterval(0)
+        self._append_timer.timeout.connect(self._append_pending)
+        font = QFont("monospace")
+        font.setStyleHint(QFont.StyleHint.TypeWriter)
+        self._bold_font = QFont(font)
+        self._bold_font.setWeight(QFont.Weight.Bold)
+        self.setFont(font)
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.DefaultContextMenu)
+        self._update_metrics()
+
+    # --- Content ---
+
+    def setDiff(self, document: DiffDocument):
+        self._document = document
+        self._pending = []
+        self._selection_anchor = self._selection_end = -1
+        self.verticalScrollBar().setValue(0)
+        self.horizontalScrollBar().setValue(0)
+        self._update_scroll_bars()
+        self.viewport().update()
+
+    def appendText(self, text: str):
+        """Adds streamed text to the end of the shown diff, keeping the scroll position and selection."""
+        self._pending.append(text)
+        if not self._append_timer.isActive():
+            self._append_timer.start()
+
+    def _append_pending(self):
+        if not self._pending:
+            return
+        self._document.append(self._pending.pop(0))
+        self._update_scroll_bars()
+        self.viewport().update()
+        if self._pending:
+            self._append_timer.start()
+
+    def setText(self, text: str):
+        """Shows a short plain text (e.g. a 'Loading...' message)."""
+        self.setDiff(DiffDocument(text))
+
+    def clear(self):
+        self.setDiff(DiffDocument())
+
+    def document(self) -> DiffDocument:
+        return self._document
+
+    def toPlainText(self) -> str:
+        return self._document.text + "".join(self._pending)
+
+    # --- Geometry ---
+
+    def _update_metrics(self):
+        metrics = QFontMetrics(self.font())
+        self._line_height = metrics.lineSpacing()
+        self._ascent = metrics.ascent()
+        self._char_width = max(1, metrics.horizontalAdvance("M"))
+
+    def _visible_line_count(self) -> int:
+        return max(1, self.viewport().height() // self._line_height)
+
+    def _update_scroll_bars(self):
+        visible_lines = self._visible_line_count()
+        vertical = self.verticalScrollBar()
+        vertical.setRange(0, max(0, self._document.lineCount() - visible_lines))
+        vertical.setPageStep(visible_lines)
+        vertical.setSingleStep(1)
+        horizontal = self.horizontalScrollBar()
+        # Tabs are ignored here; lines with tabs may extend a little past the range
+        content_width = self._document.max_line_length * self._char_width + 2 * DIFF_MARGIN
+        horizontal.setRange(0, max(0, content_width - self.viewport().width()))
+        horizontal.setPageStep(self.viewport().width())
+        horizontal.setSingleStep(self._char_width * 4)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scroll_bars()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == event.Type.FontChange:
+            self._update_metrics()
+            self._update_scroll_bars()
+
+    def scrollContentsBy(self, dx: int, dy: int):
+        self.viewport().update()
+
+    def _line_at(self, y: int) -> int:
+        line = self.verticalScrollBar().value() + max(0, y) // self._line_height
+        return min(line, self._document.lineCount() - 1)
+
+    # --- Painting ---
+
+    def _line_style(self, text: str):
+        """Returns (color, bold) for a diff line, decided by its first characters."""
+        if text.startswith("+"):
+            return DIFF_ADDED_COLOR, False
+        if text.startswith("-"):
+            return DIFF_REMOVED_COLOR, False
+        if text.startswith(DIFF_HEADER_PREFIXES):
+            return DIFF_HEADER_COLOR, True
+        if text.startswith("@@"):
+            return DIFF_HEADER_COLOR, False
+        return DIFF_DEFAULT_COLOR, False
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), DIFF_BACKGROUND_COLOR)
+        document = self._document
+        first = self.verticalScrollBar().value()
+        last = min(document.lineCount() - 1, first + self._visible_line_count())
+        x_offset = self.horizontalScrollBar().value()
+        first_column = max(0, (x_offset - DIFF_MARGIN) // self._char_width)
+        visible_columns = self.viewport().width() // self._char_width + 2
+        x = DIFF_MARGIN + first_column * self._char_width - x_offset
+        selected_from, selected_to = self._selected_range()
+        width = self.viewport().width()
+        for number in range(first, last + 1):
+            y = (number - first) * self._line_height
+            if selected_from <= number <= selected_to:
+                painter.fillRect(QRect(0, y, width, self._line_height), DIFF_SELECTION_COLOR)
+            text = document.line(number).rstrip("\r")
+            color, bold = self._line_style(text)
+            if len(text) > DIFF_LONG_LINE:
+                text = text[first_column : first_column + visible_columns].expandtabs(DIFF_TAB_WIDTH)
+            else:
+                text = text.expandtabs(DIFF_TAB_WIDTH)[first_column : first_column + visible_columns]
+            if not text:
+                continue
+            painter.setPen(color)
+            painter.setFont(self._bold_font if bold else self.font())
+            painter.drawText(x, y + self._ascent, text)
+        painter.end()
+
+    # --- Selection ---
+
+    def _selected_range(self):
+        if self._selection_anchor < 0:
+            return -1, -2  # Matches no line
+        return (
+            min(self._selection_anchor, self._selection_end),
+            max(self._selection_anchor, self._selection_end),
+        )
+
+    def selectedText(self) -> str:
+        first, last = self._selected_range()
+        return self._document.lines(first, last) if first >= 0 else ""
+
+    def selectAll(self):
+        if self._document.lineCount():
+            self._selection_anchor, self._selection_end = 0, self._document.lineCount() - 1
+            self.viewport().update()
+
+    def copy(self):
+        text = self.selectedText()
+        if text:
+            QGuiApplication.clipboard().setText(text)
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton or not self._document.lineCount():
+            return super().mousePressEvent(event)
+        line = self._line_at(int(event.position().y()))
+        if event.modifiers() & Qt.KeyboardModifier.ShiftModifier and self._selection_anchor >= 0:
+            self._selection_end = line
+        else:
+            self._selection_anchor = self._selection_end = line
+        self.viewport().update()
+
+    def mouseMoveEvent(self, event):
+        if not event.buttons() & Qt.MouseButton.LeftButton or self._selection_anchor < 0:
+            return super().mouseMoveEvent(event)
+        y = int(event.position().y())
+        # Dragging past the edges scrolls
+        if y < 0:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - 1)
+        elif y > self.viewport().height():
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() + 1)
+        self._selection_end = self._line_at(min(y, self.viewport().height() - 1))
+        self.viewport().update()
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.StandardKey.Copy):
+            self.copy()
+        elif event.matches(QKeySequence.StandardKey.SelectAll):
+            self.selectAll()
+        elif event.key() == Qt.Key.Key_Home and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.verticalScrollBar().setValue(0)
+        elif event.key() == Qt.Key.Key_End and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+        else:
+            super().keyPressEvent(event)
+
+    def contextMenuEvent(self, event):
+        menu = QMenu(self)
+        copy_action = menu.addAction("Copy", self.copy)
+        copy_action.setEnabled(self._selection_anchor >= 0)
+        menu.addAction("Select All", self.selectAll)
+        menu.exec(event.globalPos())
@@ -0,0 +1,375 @@
+# ui/graph_layout.py
+
+import heapq
+from array import array
+from typing import List, Dict, Tuple, Optional, Any, Iterable  # For type hinting
+
+# Edges are indexed by the rows they cover: by their top row, plus for every
+# multiple of SPAN_BUCKET_ROWS they cross. Any row range is then answered by
+# one bucket and at most SPAN_BUCKET_ROWS + visible rows of lookups.
+SPAN_BUCKET_ROWS = 64
+
+
+class GraphLayout:
+    """
+    Lane/row layout of a commit graph, independent of any drawing code.
+
+    Each commit gets a row (vertical position) and a lane (column). Every
+    edge runs from the child's node into a "via" lane on the next row, straight
+    down that lane, and into the parent's node on the parent's row.
+
+    Commits are appended in 'git log' order (children before parents), which
+    allows a single pass with an active-lane structure:
+      - _expect maps a not-yet-placed parent to the lane reserved for it,
+      - _free is a min-heap of lanes that are currently unused.
+    Placing a commit is therefore O(parents * log(lanes)), and the whole layout
+    O(n log lanes) instead of rescanning every lane or every commit.
+
+    Rows are logical: appended commits get rows 0, 1, 2, ... and commits
+    prepended later (newer commits after a commit/pull) get -1, -2, ...
+    so existing rows never move.
+    """
+
+    def __init__(self):
+        # --- Rows ---
+        self._hashes_down: List[str] = []  # Row r >= 0 -> commit hash
+        self._hashes_up: List[str] = []  # Row r < 0 -> commit hash (index -r - 1)
+        self._lanes_down = array("i")  # Row r >= 0 -> lane
+        self._lanes_up = array("i")  # Row r < 0 -> lane (index -r - 1)
+        self._row_of: Dict[str, int] = {}  # Map: commit_hash -> row
+        # --- Edges (parallel arrays, one entry per edge) ---
+        self.edge_child = array("i")  # Row of the child commit
+        self.edge_parent = array("i")  # Row of the parent commit
+        self.edge_via = array("i")  # Lane the edge runs down in
+        # Map: top row of an edge -> edge indices starting there
+        self._edges_by_top: Dict[int, List[int]] = {}
+        # Map: bucket k -> edge indices crossing row k * SPAN_BUCKET_ROWS from above
+        self._edges_by_bucket: Dict[int, List[int]] = {}
+        # --- Active lane state for appending ---
+        self._active: List[Optional[str]] = []  # Lane -> hash it is reserved for (or None)
+        self._expect: Dict[str, int] = {}  # Map: parent_hash -> lane reserved for it
+        # Extra lanes reserved for the same parent by prepended commits
+        self._expect_extra: Dict[str, List[int]] = {}
+        self._free: List[int] = []  # Min-heap of unused lanes
+        # Map: parent_hash -> [(child_row, via_lane)] for edges whose parent isn't placed yet
+        self._pending: Dict[str, List[Tuple[int, int]]] = {}
+        # --- Change tracking, for callers caching rendered rows ---
+        self._dirty_spans: List[Tuple[int, int]] = []  # (first_row, last_row) changed
+        self._batch_rows: Tuple[float, float] = (0, -1)  # Rows placed by the running call
+        # --- Lane heads, for extending lanes upwards when prepending ---
+        self._lane_head: Dict[int, str] = {}  # Map: lane -> topmost commit hash in it
+        self._head_lane: Dict[str, int] = {}  # Map: commit hash -> lane it leads to from the top
+
+    # --- Queries ---
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, commit_hash: str) -> bool:
+        return commit_hash in self._row_of
+
+    @property
+    def top_row(self) -> int:
+        """Row of the topmost commit."""
+        return -len(self._hashes_up)
+
+    @property
+    def end_row(self) -> int:
+        """One past the row of the bottommost commit."""
+        return len(self._hashes_down)
+
+    @property
+    def lane_count(self) -> int:
+        """Number of lanes ever used (the graph's width in lanes)."""
+        return len(self._active)
+
+    def row_of(self, commit_hash: str) -> Optional[int]:
+        """Returns the row of a commit, or None if it isn't laid out."""
+        return self._row_of.get(commit_hash)
+
+    def hash_at(self, row: int) -> str:
+        """Returns the commit hash placed at a row (top_row <= row < end_row)."""
+        return self._hashes_down[row] if row >= 0 else self._hashes_up[-row - 1]
+
+    def lane_at(self, row: int) -> int:
+        """Returns the lane of the commit placed at a row."""
+        return self._lanes_down[row] if row >= 0 else self._lanes_up[-row - 1]
+
+    def edges(self) -> Iterable[Tuple[int, int, int]]:
+        """Yields all edges as (child_row, parent_row, via_lane)."""
+        return zip(self.edge_child, self.edge_parent, self.edge_via)
+
+    def edges_in_rows(self, first_row: int, last_row: int) -> List[int]:
+        """Returns the indices of edges that cover any row in [first_row, last_row]."""
+        edge_child = self.edge_child
+        edge_parent = self.edge_parent
+        bucket_start = (first_row // SPAN_BUCKET_ROWS) * SPAN_BUCKET_ROWS
+        found = []
+        # Edges starting above the bucket boundary that reach down into the range
+        for edge_index in self._edges_by_bucket.get(first_row // SPAN_BUCKET_ROWS, ()):
+            if max(edge_child[edge_index], edge_parent[edge_index]) >= first_row:
+                found.append(edge_index)
+        # Edges starting between the boundary and the end of the range
+        edges_by_top = self._edges_by_top
+        for row in range(bucket_start, last_row + 1):
+            for edge_index in edges_by_top.get(row, ()):
+                if max(edge_child[edge_index], edge_parent[edge_index]) >= first_row:
+                    found.append(edge_index)
+        return found
+
+    def take_dirty_spans(self) -> List[Tuple[int, int]]:
+        """Returns the (first_row, last_row) spans changed since the last call and forgets them."""
+        spans, self._dirty_spans = self._dirty_spans, []
+        return spans
+
+    # --- Building ---
+
+    def _new_lane(self) -> int:
+        """Adds a lane to the right of all existing ones."""
+        self._active.append(None)
+        return len(self._active) - 1
+
+    def _take_free_lane(self) -> int:
+        """Returns the leftmost unused lane, adding one if all are in use."""
+        return heapq.heappop(self._free) if self._free else self._new_lane()
+
+    def _add_edge(self, child_row: int, parent_row: int, via_lane: int):
+        edge_index = len(self.edge_child)
+        self.edge_child.append(child_row)
+        self.edge_parent.append(parent_row)
+        self.edge_via.append(via_lane)
+        top_row, bottom_row = self._index_edge(edge_index)
+        # Edges inside the rows placed by this call are covered by the batch's own span
+        batch_first, batch_last = self._batch_rows
+        if top_row < batch_first or bottom_row > batch_last:
+            self._dirty_spans.append((top_row, bottom_row))
+
+    def _index_edge(self, edge_index: int) -> Tuple[int, int]:
+        """Adds an edge to the row indexes. Returns the (top_row, bottom_row) it covers."""
+        child_row = self.edge_child[edge_index]
+        parent_row = self.edge_parent[edge_index]
+        # Index by covered rows (parents normally lie below, but don't rely on it)
+        top_row, bottom_row = min(child_row, parent_row), max(child_row, parent_row)
+        self._edges_by_top.setdefault(top_row, []).append(edge_index)
+        for bucket in range(
+            top_row // SPAN_BUCKET_ROWS + 1, bottom_row // SPAN_BUCKET_ROWS + 1
+        ):
+            self._edges_by_bucket.setdefault(bucket, []).append(edge_index)
+        return top_row, bottom_row
+
+    def _rebuild_edge_index(self):
+        """Indexes all edges at once; same result as _index_edge on each, in a tighter loop."""
+        edges_by_top: Dict[int, List[int]] = {}
+        edges_by_bucket: Dict[int, List[int]] = {}
+        for edge_index, (child_row, parent_row) in enumerate(
+            zip(self.edge_child, self.edge_parent)
+        ):
+            if child_row <= parent_row:
+                top_row, bottom_row = child_row, parent_row
+            else:
+                top_row, bottom_row = parent_row, child_row
+            edges = edges_by_top.get(top_row)
+            if edges is None:
+                edges_by_top[top_row] = [edge_index]
+            else:
+                edges.append(edge_index)
+            top_bucket = top_row // SPAN_BUCKET_ROWS
+            bottom_bucket = bottom_row // SPAN_BUCKET_ROWS
+            if bottom_bucket > top_bucket:  # Rare: only edges crossing a bucket boundary
+                for bucket in range(top_bucket + 1, bottom_bucket + 1):
+                    edges_by_bucket.setdefault(bucket, []).append(edge_index)
+        self._edges_by_top = edges_by_top
+        self._edges_by_bucket = edges_by_bucket
+
+    def _reserve(self, parent_hash: str, lane: int):
+        """Reserves a lane for an edge to a parent that isn't placed yet."""
+        self._active[lane] = parent_hash
+        if parent_hash in self._expect:
+            self._expect_extra.setdefault(parent_hash, []).append(lane)
+        else:
+            self._expect[parent_hash] = lane
+
+    def _claim_expected_lane(self, commit_hash: str) -> int:
+        """Returns the lane reserved for a commit (or -1), releasing any extra reservations."""
+        lane = self._expect.pop(commit_hash, -1)
+        for extra_lane in self._expect_extra.pop(commit_hash, ()):
+            self._active[extra_lane] = None
+            heapq.heappush(self._free, extra_lane)
+        return lane
+
+    def _link_children(self, commit_hash: str, row: int):
+        """Creates the edges of already placed children waiting for this commit."""
+        for child_row, via_lane in self._pending.pop(commit_hash, ()):
+            self._add_edge(child_row, row, via_lane)
+
+    def append(self, commits: Iterable[Dict[str, Any]]) -> int:
+        """Places commits below the existing rows. Returns the number of commits placed."""
+        row_of = self._row_of
+        active = self._active
+        expect = self._expect
+        pending = self._pending
+        placed = 0
+        first_row = self.end_row
+        self._batch_rows = (first_row, float("inf"))
+
+        for commit in commits:
+            commit_hash = commit["hash"]
+            if commit_hash in row_of:
+                print(
+                    f"Warning: Duplicate commit hash {commit_hash} encountered in layout."
+                )
+                continue  # Skip duplicates
+            row = len(self._hashes_down)
+
+            # --- Lane: the one reserved by a child, else the leftmost free one ---
+            lane = self._claim_expected_lane(commit_hash) if commit_hash in expect else -1
+            if lane < 0:
+                lane = self._take_free_lane()
+            active[lane] = None  # Occupied by this node; re-reserved below for a parent
+
+            self._hashes_down.append(commit_hash)
+            self._lanes_down.append(lane)
+            row_of[commit_hash] = row
+            if lane not in self._lane_head:
+                self._lane_head[lane] = commit_hash
+                self._head_lane[commit_hash] = lane
+            self._link_children(commit_hash, row)
+
+            # --- Parents: continue this lane with the first new parent, reserve more if needed ---
+            lane_continued = False
+            for parent_hash in commit.get("parents", ()):
+                parent_row = row_of.get(parent_hash)
+                if parent_row is not None:
+                    # Parent already placed (input not in strict child-first order)
+                    self._add_edge(row, parent_row, lane)
+                    continue
+                via_lane = expect.get(parent_hash, -1)
+                if via_lane < 0:
+                    if not lane_continued:
+                        via_lane = lane
+                        lane_continued = True
+                    else:
+                        via_lane = self._take_free_lane()
+                    active[via_lane] = parent_hash
+                    expect[parent_hash] = via_lane
+                pending.setdefault(parent_hash, []).append((row, via_lane))
+            if not lane_continued:
+                heapq.heappush(self._free, lane)  # Branch ends here (or merges into another lane)
+            placed += 1
+        if placed:
+            self._dirty_spans.append((first_row, self.end_row - 1))
+        return placed
+
+    def prepend(self, commits: List[Dict[str, Any]]) -> int:
+        """
+        Places commits newer than the current top row above it, in O(len(commits)).
+        `commits` is in 'git log' order (newest first). A commit continues its first
+        parent's lane when the parent heads it (nothing above it yet); otherwise it
+        opens a new lane. Returns the number of commits placed.
+        """
+        row_of = self._row_of
+        placed = 0
+        new_lanes = []
+        last_row = self.top_row - 1
+        self._batch_rows = (float("-inf"), last_row)
+        # Oldest first, so parents are placed before their children
+        for commit in reversed(commits):
+            commit_hash = commit["hash"]
+            if commit_hash in row_of:
+                continue  # Already shown (e.g. arrived with a page in the meantime)
+            parents = commit.get("parents", [])
+            if parents and parents[0] in self._head_lane:
+                lane = self._head_lane.pop(parents[0])
+            else:
+                lane = self._new_lane()
+                new_lanes.append(lane)
+            row = self.top_row - 1
+
+            self._hashes_up.append(commit_hash)
+            self._lanes_up.append(lane)
+            row_of[commit_hash] = row
+            self._link_children(commit_hash, row)
+
+            for index, parent_hash in enumerate(parents):
+                parent_row = row_of.get(parent_hash)
+                if index == 0:
+                    via_lane = lane  # The commit's own lane leads to its first parent
+                elif parent_row is not None and parent_hash in self._head_lane:
+                    via_lane = self._head_lane[parent_hash]
+                else:
+                    via_lane = self._new_lane()  # Only a fresh lane is clear all the way down
+                    new_lanes.append(via_lane)
+                    if parent_row is not None:
+                        self._lane_head[via_lane] = parent_hash
+                        self._head_lane[parent_hash] = via_lane
+                if parent_row is not None:
+                    self._add_edge(row, parent_row, via_lane)
+                else:
+                    # Parent is on a page not loaded yet: keep the lane free of other nodes
+                    self._reserve(parent_hash, via_lane)
+                    self._pending.setdefault(parent_hash, []).append((row, via_lane))
+
+            self._lane_head[lane] = commit_hash
+            self._head_lane[commit_hash] = lane
+            placed += 1
+
+        # Below their edges, new lanes are empty and can be reused by later pages
+        for lane in new_lanes:
+            if self._active[lane] is None:
+                heapq.heappush(self._free, lane)
+        if placed:
+            self._dirty_spans.append((self.top_row, last_row))
+        return placed
+
+    # --- Persistence ---
+
+    def export_state(self) -> Dict[str, Any]:
+        """
+        Returns everything needed to continue this layout later (see from_state).
+        Derived indexes (row_of, edge buckets) are left out and rebuilt on load.
+        """
+        return {
+            "hashes_down": self._hashes_down,
+            "hashes_up": self._hashes_up,
+            "lanes_down": self._lanes_down,
+            "lanes_up": self._lanes_up,
+            "edge_child": self.edge_child,
+            "edge_parent": self.edge_parent,
+            "edge_via": self.edge_via,
+            "active": self._active,
+            "expect": self._expect,
+            "expect_extra": self._expect_extra,
+            "free": self._free,
+            "pending": self._pending,
+            "lane_head": self._lane_head,
+            "head_lane": self._head_lane,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "GraphLayout":
+        """Rebuilds a layout from export_state() output, without placing any commit again."""
+        layout = cls()
+        layout._hashes_down = list(state["hashes_down"])
+        layout._hashes_up = list(state["hashes_up"])
+        layout._lanes_down = array("i", state["lanes_down"])
+        layout._lanes_up = array("i", state["lanes_up"])
+        layout.edge_child = array("i", state["edge_child"])
+        layout.edge_parent = array("i", state["edge_parent"])
+        layout.edge_via = array("i", state["edge_via"])
+        layout._active = list(state["active"])
+        layout._expect = dict(state["expect"])
+        layout._expect_extra = {h: list(lanes) for h, lanes in state["expect_extra"].items()}
+        layout._free = list(state["free"])  # Already in heap order
+        layout._pending = {h: list(edges) for h, edges in state["pending"].items()}
+        layout._lane_head = dict(state["lane_head"])
+        layout._head_lane = dict(state["head_lane"])
+        # --- Derived indexes ---
+        row_of = layout._row_of
+        for row, commit_hash in enumerate(layout._hashes_down):
+            row_of[commit_hash] = row
+        for index, commit_hash in enumerate(layout._hashes_up):
+            row_of[commit_hash] = -index - 1
+        layout._rebuild_edge_index()
+        if len(row_of):
+            layout._dirty_spans.append((layout.top_row, layout.end_row - 1))
+        return layout
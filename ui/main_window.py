@@ -1,6 +1,7 @@
 import sys
 import os
-from typing import Optional, Dict
+import time
+from typing import Optional, Dict, List
 
 from PyQt6.QtWidgets import (
     QMainWindow,
@@ -11,6 +12,7 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QFileDialog,
     QLabel,
+    QCheckBox,
     QListWidget,
     QHBoxLayout,
     QSplitter,
@@ -26,31 +28,65 @@ from PyQt6.QtWidgets import (
     QFormLayout,
 )
 from PyQt6.QtCore import Qt, QPoint, QTimer, QModelIndex
-from PyQt6.QtGui import (
-    QAction,
-    QStandardItemModel,
-    QStandardItem,
-    QFont,
-    QColor,
-    QTextCharFormat,
-)
+from PyQt6.QtGui import QAction
 
 from .commit_graph_widget import CommitGraphWidget, ScrollableCommitGraphWidget
+from .graph_layout import GraphLayout
+from .status_list import StatusListModel, StatusListView, UNTRACKED_CODE
+from .branch_tree import BranchTreeModel, LOCAL_PREFIX, REMOTE_PREFIX
+from .diff_view import DiffView, DiffDocument
 
 try:
-    from git_ops.commands import GitCommandThread
-    from utils.helpers import extract_file_path
+    from git_ops.scheduler import GitCommandScheduler, GitJob
+    from git_ops.object_reader import GitObjectReader
+    from git_ops.object_store import GitObjectStore, resolve_ref
+    from git_ops.objects import (
+        commit_details,
+        commit_details_size,
+        commit_summaries,
+    )
+    from git_ops.commit_graph import CommitGraph, HistoryWalker
+    from git_ops.worktree_status import WorkingTreeStatus
+    from git_ops.diff_filter import diff_skip_reason, generated_exclude_pathspecs, read_file_head
+    from git_ops.patch_index import COMMIT_PATCH_COMMAND, PatchIndex, read_commit_patch, read_worktree_patch
+    from git_ops.repo_watcher import RepositoryWatcher
+    from git_ops.porcelain import (
+        literal_pathspecs,
+        read_status,
+        status_caches_enabled,
+        enable_status_caches,
+    )
+    from utils.helpers import parse_graph_log_line
+    from utils.history_cache import load_history_cache, save_history_cache
+    from utils.cache import LRUCache
 except ImportError as e:
     print(f"Error importing modules: {e}")
     sys.exit(1)
 
 GIT_LOG_FORMAT = "%H%x09%an%x09%ad%x09%s"
 GIT_LOG_DATE_FORMAT = "iso"
-MAX_LOG_COUNT = 200
-DIFF_ADDED_COLOR = QColor("darkgreen")
-DIFF_REMOVED_COLOR = QColor("darkred")
-DIFF_HEADER_COLOR = QColor("darkblue")
-DIFF_DEFAULT_COLOR = QColor("black")
+GIT_GRAPH_LOG_FORMAT = "%H%x00%P%x00%an%x00%ad%x00%s"  # NUL separated, parsed by parse_graph_log_line
+HISTORY_PAGE_SIZE = 500  # Commits per 'git log' page; further pages load on scroll
+# Show staged/unstaged changes first and scan for untracked files as a second job
+DEFER_UNTRACKED_DEFAULT = True
+# Diffs are streamed into the viewer and stop at whichever cap comes first;
+# 'Load Rest' fetches the remainder. None disables a cap.
+DIFF_MAX_BYTES = 4 * 1024 * 1024
+DIFF_MAX_LINES = 50000
+# Results addressed by commit hash never go stale; revisited commits and their
+# file diffs are shown from memory, within these budgets
+COMMIT_DETAILS_CACHE_BYTES = 8 * 1024 * 1024
+COMMIT_DIFF_CACHE_BYTES = 64 * 1024 * 1024
+# Details of this many commits above and below the selected one are read ahead
+PREFETCH_NEIGHBOURS = 5
+# The shown commit's whole patch is read at once, up to this size; files past
+# it (very large commits) are diffed one by one when selected
+COMMIT_PATCH_MAX_BYTES = 16 * 1024 * 1024
+# File parts of a whole patch up to this size are indexed on the spot, larger ones on a worker thread
+PATCH_INLINE_BYTES = 1024 * 1024
+# After each status refresh the staged and unstaged changes are read as two whole
+# patches, up to this size each; files past it are diffed one by one when selected
+WORKTREE_PATCH_MAX_BYTES = 16 * 1024 * 1024
 
 
 class SimpleGitApp(QMainWindow):
@@ -61,17 +97,51 @@ class SimpleGitApp(QMainWindow):
         )  # Updated title
         self.setGeometry(50, 50, 1250, 800)
         self.repo_path = None
-        self.current_git_thread = None
-        self.current_operation_name = None
-        self._output_parser_slot = None
-        self._is_initial_load_status = False
-        self._is_initial_load_history = False
-        self._is_initial_load_branches = False
+        # Runs read-only git commands in parallel and mutating ones exclusively
+        self.git_scheduler = GitCommandScheduler(self)
+        self._ui_busy = False  # True while a mutating command locks the UI
+        # Reads commits/trees/blobs for details and diffs straight from .git/objects,
+        # falling back to a long-lived 'git cat-file --batch' for anything else
+        self.object_reader: Optional[GitObjectStore] = None
+        # Computes status in-process for the open repository (None: no repository)
+        self.worktree_status: Optional[WorkingTreeStatus] = None
+        # Refreshes panels when the work tree or the repository changes on disk
+        self.repo_watcher = RepositoryWatcher(self)
+        # True when the repository has git's untracked cache on; untracked files are
+        # then listed by 'git status', which uses it, instead of the in-process walk
+        self._status_git_caches = False
+        self._status_started = 0.0  # perf_counter() when the running status refresh started
+        self._status_tracked_seconds = 0.0  # Time until its staged/unstaged lists were shown
+        self._diff_job: Optional[GitJob] = None  # Latest streamed diff job
+        self._diff_started = False  # True once the streamed diff replaced the 'Loading...' text
+        self._diff_skip_chars = 0  # Streamed text already shown (when loading the rest)
+        self._diff_received_chars = 0  # Streamed text passed to the diff view so far
+        self._diff_load_rest = None  # Loads what the shown diff left out, if anything
+        # Map: commit hash -> commit_details() result (filled on the worker threads)
+        self._commit_details_cache = LRUCache(COMMIT_DETAILS_CACHE_BYTES, sizeof=commit_details_size)
+        # Patch of the commit in the detail view, for its file diffs (None: not read (yet))
+        self._commit_patch_hash: Optional[str] = None
+        self._commit_patch: Optional[PatchIndex] = None
+        self._commit_patch_loading = False
+        self._commit_patch_waiting = None  # (path, limited) to show once the patch is read
+        # Map: (commit hash, path) -> (DiffDocument, truncated)
+        self._commit_diff_cache = LRUCache(
+            COMMIT_DIFF_CACHE_BYTES, sizeof=lambda entry: entry[0].byteSize()
+        )
+        # Map: 'staged'/'unstaged' -> patch read after the last status refresh (dropped by the next one)
+        self._worktree_patches: Dict[str, PatchIndex] = {}
         self.current_branch = None
         self.graph_widget_container: Optional[ScrollableCommitGraphWidget | QLabel] = (
             None
         )
         self.graph_widget: Optional[CommitGraphWidget] = None
+        self._history_tip: Optional[str] = None  # Commit the paginated history starts from
+        self._history_head: Optional[str] = None  # Newest commit shown (top row of the graph)
+        self._history_paged_count = 0  # Commits loaded by walking from _history_tip
+        self._history_page_count = 0  # Commits received for the page being loaded
+        self._history_exhausted = False  # True once the last page has been loaded
+        # Walks pages from _history_tip through the commit-graph file (None: use 'git log')
+        self._history_walker: Optional[HistoryWalker] = None
         self._selected_commit_hash_details: Optional[str] = (
             None  # Track hash being detailed
         )
@@ -128,7 +198,9 @@ class SimpleGitApp(QMainWindow):
         self.branches_view = QTreeView()
         self.branches_view.setHeaderHidden(True)
         self.branches_view.setEditTriggers(QTreeView.EditTrigger.NoEditTriggers)
-        self.branches_model = QStandardItemModel()
+        self.branches_view.setUniformRowHeights(True)
+        # Remote groups make their branch rows only when expanded (see BranchTreeModel)
+        self.branches_model = BranchTreeModel()
         self.branches_view.setModel(self.branches_model)
         self.branches_layout.addWidget(self.branches_label)
         self.branches_layout.addWidget(self.branches_view)
@@ -156,8 +228,10 @@ class SimpleGitApp(QMainWindow):
         self.staged_area_layout.addWidget(self.staged_label)
         self.staged_area_layout.addStretch()
         self.staged_area_layout.addWidget(self.unstage_button)
-        self.staged_list = QListWidget()
-        self.staged_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        # Status lists are models kept up to date by diffing (see ui/status_list.py)
+        self.staged_model = StatusListModel(self)
+        self.staged_list = StatusListView()
+        self.staged_list.setModel(self.staged_model)
         self.unstaged_area_layout = QHBoxLayout()
         self.unstaged_label = QLabel("Unstaged Changes:")
         self.stage_button = QPushButton("Stage Selected")
@@ -165,31 +239,50 @@ class SimpleGitApp(QMainWindow):
         self.unstaged_area_layout.addWidget(self.unstaged_label)
         self.unstaged_area_layout.addStretch()
         self.unstaged_area_layout.addWidget(self.stage_button)
-        self.unstaged_list = QListWidget()
-        self.unstaged_list.setSelectionMode(QListWidget.SelectionMode.ExtendedSelection)
+        self.unstaged_model = StatusListModel(self)
+        self.unstaged_list = StatusListView()
+        self.unstaged_list.setModel(self.unstaged_model)
         self.unstaged_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.untracked_area_layout = QHBoxLayout()
         self.untracked_label = QLabel("Untracked Files:")
-        self.untracked_list = QListWidget()
-        self.untracked_list.setSelectionMode(
-            QListWidget.SelectionMode.ExtendedSelection
+        self.defer_untracked_check = QCheckBox("Scan Separately")
+        self.defer_untracked_check.setChecked(DEFER_UNTRACKED_DEFAULT)
+        self.defer_untracked_check.setToolTip(
+            "Show staged and unstaged changes first, then scan for untracked files"
         )
+        self.status_cache_button = QPushButton("Enable Status Caches")
+        self.status_cache_button.setEnabled(False)
+        self.status_cache_button.setToolTip(
+            "Turn on git's untracked cache (and fsmonitor where supported) for this repository"
+        )
+        self.untracked_area_layout.addWidget(self.untracked_label)
+        self.untracked_area_layout.addStretch()
+        self.untracked_area_layout.addWidget(self.defer_untracked_check)
+        self.untracked_area_layout.addWidget(self.status_cache_button)
+        self.untracked_model = StatusListModel(self)
+        self.untracked_list = StatusListView()
+        self.untracked_list.setModel(self.untracked_model)
         self.untracked_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.status_layout.addLayout(self.staged_area_layout)
         self.status_layout.addWidget(self.staged_list, 1)
         self.status_layout.addLayout(self.unstaged_area_layout)
         self.status_layout.addWidget(self.unstaged_list, 1)
-        self.status_layout.addWidget(self.untracked_label)
+        self.status_layout.addLayout(self.untracked_area_layout)
         self.status_layout.addWidget(self.untracked_list, 1)
         self.status_frame.setLayout(self.status_layout)
         self.diff_frame = QFrame()
         self.diff_layout = QVBoxLayout(self.diff_frame)
         self.diff_layout.setContentsMargins(5, 5, 5, 5)
+        self.diff_header_layout = QHBoxLayout()
         self.diff_label = QLabel("Diff for selected file:")
-        self.diff_view = QTextEdit()
-        self.diff_view.setReadOnly(True)
-        self.diff_view.setFontFamily("monospace")
-        self.diff_view.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
-        self.diff_layout.addWidget(self.diff_label)
+        # Shown when a diff was cut at the size caps, or not loaded (binary/generated)
+        self.diff_load_button = QPushButton("Load Rest")
+        self.diff_load_button.setVisible(False)
+        self.diff_header_layout.addWidget(self.diff_label, 1)
+        self.diff_header_layout.addWidget(self.diff_load_button)
+        # Paints only the visible lines of the diff (see ui/diff_view.py)
+        self.diff_view = DiffView()
+        self.diff_layout.addLayout(self.diff_header_layout)
         self.diff_layout.addWidget(self.diff_view)
         self.status_diff_splitter.addWidget(self.status_frame)
         self.status_diff_splitter.addWidget(self.diff_frame)
@@ -327,6 +420,10 @@ class SimpleGitApp(QMainWindow):
 
     def _connect_signals(self):
         """Connect signals to slots."""
+        # --- Git Command Results ---
+        self.git_scheduler.job_finished.connect(self._on_git_command_finished)
+        self.git_scheduler.job_batch.connect(self._on_git_command_batch)
+        self.git_scheduler.activity_changed.connect(self._on_git_activity_changed)
         # --- Top Bar Actions ---
         self.open_button.clicked.connect(self.open_repository)
         self.status_button.clicked.connect(self.refresh_status)
@@ -339,12 +436,13 @@ class SimpleGitApp(QMainWindow):
 
         # --- State Update Triggers ---
         # Update button enable state when list selections change
-        self.staged_list.itemSelectionChanged.connect(self.update_button_states)
-        self.unstaged_list.itemSelectionChanged.connect(self.update_button_states)
-        self.untracked_list.itemSelectionChanged.connect(self.update_button_states)
+        self.staged_list.selectionModel().selectionChanged.connect(self.update_button_states)
+        self.unstaged_list.selectionModel().selectionChanged.connect(self.update_button_states)
+        self.untracked_list.selectionModel().selectionChanged.connect(self.update_button_states)
         # Update commit button enable state when staged list content changes
-        self.staged_list.model().rowsInserted.connect(self.update_button_states)
-        self.staged_list.model().rowsRemoved.connect(self.update_button_states)
+        self.staged_model.rowsInserted.connect(self.update_button_states)
+        self.staged_model.rowsRemoved.connect(self.update_button_states)
+        self.staged_model.modelReset.connect(self.update_button_states)
         # Update commit button enable state when commit message changes
         self.commit_message_box.textChanged.connect(self.update_button_states)
 
@@ -352,6 +450,7 @@ class SimpleGitApp(QMainWindow):
         self.stage_button.clicked.connect(self.stage_selected_files)
         self.unstage_button.clicked.connect(self.unstage_selected_files)
         self.commit_button.clicked.connect(self.commit_changes)
+        self.status_cache_button.clicked.connect(self.enable_status_caches)
 
         # --- Context Menus (Status Lists) ---
         self.unstaged_list.customContextMenuRequested.connect(
@@ -365,11 +464,19 @@ class SimpleGitApp(QMainWindow):
         self.branches_view.doubleClicked.connect(
             self.on_branch_double_clicked
         )  # For checkout
+        self.branches_model.rowsInserted.connect(self._expand_branch_category)
+
+        # Changes made outside the app (editor saves, builds, git in a terminal)
+        self.repo_watcher.refresh_needed.connect(self._on_repository_changed)
 
         # --- Commit History / Details Connections ---
         # Connect graph widget's selection signal to show details
         if self.graph_widget:  # Check if graph widget was initialized
             self.graph_widget.commit_selected.connect(self.show_commit_details)
+            self.graph_widget_container.more_commits_requested.connect(
+                self.load_more_history
+            )
+            self.graph_widget.text_needed.connect(self.load_commit_text)
         else:
             print("Warning: Graph widget not available for signal connection.")
         # Connect selection in commit detail's changed files list to show diff for that file
@@ -382,24 +489,25 @@ class SimpleGitApp(QMainWindow):
         )
 
         # --- Diff View Connections (Working Tree / Index) ---
+        self.diff_load_button.clicked.connect(self.load_rest_of_diff)
         # Show diff when item selection changes in status lists
-        self.staged_list.currentItemChanged.connect(self.show_diff)
-        self.unstaged_list.currentItemChanged.connect(self.show_diff)
+        self.staged_list.selectionModel().currentChanged.connect(self.show_diff)
+        self.unstaged_list.selectionModel().currentChanged.connect(self.show_diff)
         # Clear diff view when selection is lost in status lists
-        self.staged_list.itemSelectionChanged.connect(
+        self.staged_list.selectionModel().selectionChanged.connect(
             lambda: self.clear_diff_view()
-            if not self.staged_list.currentItem()
+            if not self.staged_list.currentEntry()
             else None
         )
-        self.unstaged_list.itemSelectionChanged.connect(
+        self.unstaged_list.selectionModel().selectionChanged.connect(
             lambda: self.clear_diff_view()
-            if not self.unstaged_list.currentItem()
+            if not self.unstaged_list.currentEntry()
             else None
         )
         # Clear diff view if an untracked file is selected
-        self.untracked_list.itemSelectionChanged.connect(
+        self.untracked_list.selectionModel().selectionChanged.connect(
             lambda: self.clear_diff_view()
-            if self.untracked_list.selectedItems()
+            if self.untracked_list.selectionModel().hasSelection()
             else None
         )
 
@@ -421,10 +529,10 @@ class SimpleGitApp(QMainWindow):
                 self.detail_files_list.clear()
                 self.clear_diff_view()  # Clear diff associated with commit details
                 self._selected_commit_hash_details = None  # Clear the stored hash
+                self.git_scheduler.cancelBackground("Prefetch Commit")  # No selection to read around
             # Deselect graph node visually?
             if self.graph_widget and self.graph_widget._selected_commit_hash:
-                self.graph_widget._selected_commit_hash = None
-                self.graph_widget.update()
+                self.graph_widget.setSelectedCommit(None)
 
             self.bottom_right_stack.setCurrentWidget(self.commit_area_frame)
             self.update_button_states()  # Ensure commit button state is correct
@@ -443,11 +551,24 @@ class SimpleGitApp(QMainWindow):
             self._show_commit_detail_view(True)  # Ensure detail view is visible
             return
 
+        cached = self._commit_details_cache.get(commit_hash)
+        if cached is not None:
+            # No job needed (so not even a running write blocks this); an earlier
+            # click's job must not replace it when it finishes
+            self.git_scheduler.cancel("commit details")
+            self._selected_commit_hash_details = commit_hash
+            self._show_commit_detail_view(True)
+            self.clear_diff_view()
+            self._display_commit_details(cached)
+            self._load_commit_patch(commit_hash)
+            self._prefetch_neighbour_commits(commit_hash)
+            return
+
         # Check if busy *before* proceeding
         if not self._can_run_git_command(f"show commit {commit_hash[:7]}"):
             # Don't switch view if busy, maybe provide feedback?
             self.error_output_area.setText(
-                f"Cannot show details: {self.current_operation_name} is running."
+                f"Cannot show details: {self.git_scheduler.writingOperation()} is running."
             )
             # Deselect node visually? (Requires graph widget modification)
             # if self.graph_widget: self.graph_widget.select_commit(None)
@@ -468,28 +589,102 @@ class SimpleGitApp(QMainWindow):
         self.clear_diff_view()  # Clear diff associated with previous selection
 
         self.error_output_area.setText(f"Loading details for {commit_hash[:7]}...")
-        self.set_ui_busy(True)  # Set busy while fetching details
 
-        # Command to get metadata and file status changes
-        # Use null separators for metadata, then rely on --stat format after null
-        git_show_format = "%H%x00%an%x00%ae%x00%aD%x00%cn%x00%ce%x00%cD%x00%B%x00"  # Note trailing null
-        command = [
-            "git",
-            "show",
-            f"--pretty=format:{git_show_format}",
-            "--stat=4096",
-            "--no-patch",
-            commit_hash,
-        ]  # Get stat, no diff yet
-
-        # Use the new parser slot for commit details
+        # Read the commit and its trees through the long-lived object reader
+        # instead of starting 'git show' for every click
+        reader = self.object_reader
+        cache = self._commit_details_cache
+
+        def fetch():
+            details = commit_details(reader, commit_hash)
+            if details is not None:
+                cache.put(commit_hash, details)  # Kept even if this click gets superseded
+            return details
+
+        # Clicking another commit supersedes this one (latest wins)
         self._start_git_thread(
-            command, "Show Commit", parser_slot=self._parse_and_display_commit_details
+            None,
+            "Show Commit",
+            parser_slot=self._display_commit_details,
+            key="commit details",
+            function=fetch,
         )
+        self._load_commit_patch(commit_hash)
+        self._prefetch_neighbour_commits(commit_hash)
+
+    def _load_commit_patch(self, commit_hash: str):
+        """Reads the whole patch of the commit shown in the detail view, for its file diffs."""
+        if commit_hash == self._commit_patch_hash:
+            return
+        self._commit_patch_hash = commit_hash
+        self._commit_patch = None
+        self._commit_patch_loading = True
+        self._commit_patch_waiting = None
+        repo_path = self.repo_path
+
+        def read():
+            try:
+                return read_commit_patch(repo_path, commit_hash, COMMIT_PATCH_MAX_BYTES)
+            except Exception as e:
+                # The files are then diffed one by one
+                print(f"Reading the patch of {commit_hash[:7]} failed: {e}")
+                return None
+
+        self._start_git_thread(
+            None,
+            "Commit Patch",
+            parser_slot=lambda patch: self._on_commit_patch(commit_hash, patch),
+            key="commit patch",
+            function=read,
+        )
+
+    def _on_commit_patch(self, commit_hash: str, patch: Optional[PatchIndex]):
+        if commit_hash != self._commit_patch_hash:
+            return
+        self._commit_patch = patch
+        self._commit_patch_loading = False
+        if patch is not None:
+            print(
+                f"Patch of {commit_hash[:7]}: {len(patch.files)} files, {len(patch.text)} chars"
+                + (" (truncated)" if patch.truncated else "")
+            )
+        waiting, self._commit_patch_waiting = self._commit_patch_waiting, None
+        if waiting and commit_hash == self._selected_commit_hash_details:
+            self._show_commit_file_patch(commit_hash, *waiting)
+
+    def _prefetch_neighbour_commits(self, commit_hash: str):
+        """
+        Reads the details of the PREFETCH_NEIGHBOURS commits above and below the
+        selected one into the cache, as background jobs (nearest first), so
+        stepping through history shows them at once. A new selection cancels
+        whatever hasn't started yet.
+        """
+        self.git_scheduler.cancelBackground("Prefetch Commit")
+        if not self.graph_widget or not self.object_reader:
+            return
+        reader = self.object_reader
+        cache = self._commit_details_cache
+        for neighbour in self.graph_widget.neighbourCommits(commit_hash, PREFETCH_NEIGHBOURS):
+            if neighbour in cache:
+                continue
+
+            def prefetch(neighbour=neighbour):
+                if neighbour in cache:  # e.g. the user got there first
+                    return
+                try:
+                    details = commit_details(reader, neighbour)
+                except Exception as e:
+                    # Speculative: a failure only matters if the commit is actually opened
+                    print(f"Prefetch of {neighbour[:7]} failed: {e}")
+                    return
+                if details is not None:
+                    cache.put(neighbour, details)
+
+            self._start_git_thread(None, "Prefetch Commit", function=prefetch, background=True)
 
-    def _parse_and_display_commit_details(self, show_output: str):
-        """Parses the output of 'git show --pretty=format --stat' and updates the detail view."""
-        print("Parsing commit details...")
+    def _display_commit_details(self, details: Optional[Dict]):
+        """Shows the result of commit_details() (metadata and changed files) in the detail view."""
+        print("Displaying commit details...")
         # Clear previous details first
         self.detail_hash_value.clear()
         self.detail_author_value.clear()
@@ -498,73 +693,21 @@ class SimpleGitApp(QMainWindow):
         self.detail_files_list.clear()
 
         try:
-            # --- Parse Metadata (separated by null bytes) ---
-            metadata_part, stat_part = show_output.split(
-                "\x00\n", 1
-            )  # Split metadata from stat part
-            metadata = metadata_part.split("\x00")
-            if len(metadata) < 8:
-                print(
-                    f"Warning: Could not parse commit metadata fully. Parts: {len(metadata)}"
-                )
-                self.detail_message_view.setText("Error parsing commit metadata.")
+            if not details:
+                self.detail_message_view.setText("Commit not found.")
                 return
 
-            commit_hash = metadata[0]
-            author_name = metadata[1]
-            author_email = metadata[2]
-            author_date = metadata[3]
-            # committer_name = metadata[4] # Not displayed currently
-            # committer_email = metadata[5] # Not displayed currently
-            # commit_date = metadata[6] # Not displayed currently
-            commit_body = metadata[7]  # The rest is the body
-
             # --- Populate Metadata UI ---
-            self.detail_hash_value.setText(commit_hash)
+            self.detail_hash_value.setText(details["hash"])
             # Maybe format author/date nicely
-            self.detail_author_value.setText(f"{author_name} <{author_email}>")
-            self.detail_date_value.setText(
-                author_date
-            )  # Use the formatted date from git
+            self.detail_author_value.setText(f"{details['author']} <{details['email']}>")
+            self.detail_date_value.setText(details["date"])  # RFC 2822, like git's %aD
             self.detail_message_view.setText(
-                commit_body.strip()
+                details["message"].strip()
             )  # Display full message
 
-            # --- Parse File Statistics (`--stat` output) ---
-            # Example stat line: " path/to/file.txt | 10 +++++-----"
-            # Example rename: " path/{old => new}.txt | Bin 0 -> 1024 bytes" (Handle binary later)
-            file_changes = []
-            # Split stat part carefully, handling potential empty lines
-            stat_lines = [
-                line.strip() for line in stat_part.strip().split("\n") if line.strip()
-            ]
-
-            # The last line of --stat is often a summary line, ignore it for file list
-            summary_line_index = -1
-            for i, line in reversed(list(enumerate(stat_lines))):
-                if "file changed" in line or "files changed" in line:
-                    summary_line_index = i
-                    break
-
-            if summary_line_index != -1:
-                stat_lines = stat_lines[:summary_line_index]  # Exclude summary line
-
-            for line in stat_lines:
-                parts = line.split("|", 1)
-                if len(parts) == 2:
-                    file_path = parts[0].strip()
-                    # Basic handling for rename syntax like " dir/{a.txt => b.txt}"
-                    if "{" in file_path and "=>" in file_path and "}" in file_path:
-                        # Extract the 'new' path part for simplicity
-                        prefix = file_path[: file_path.find("{")]
-                        suffix_part = file_path[
-                            file_path.find("=>") + 2 : file_path.find("}")
-                        ]
-                        file_path = prefix + suffix_part
-
-                    # Could add change summary (+/-) as tooltip later
-                    # change_summary = parts[1].strip()
-                    file_changes.append(file_path)
+            # Files changed relative to the first parent (all files for a root commit)
+            file_changes = [path for _status, path in details["files"]]
 
             # --- Populate File List ---
             if file_changes:
@@ -574,12 +717,10 @@ class SimpleGitApp(QMainWindow):
                     "No file changes in this commit."
                 )  # Or leave empty
 
-            print("Commit details parsed successfully.")
+            print("Commit details displayed successfully.")
 
         except Exception as e:
-            print(
-                f"Error parsing 'git show' output: {e}\nOutput was:\n{show_output[:500]}..."
-            )  # Log error and partial output
+            print(f"Error displaying commit details: {e}")
             self.detail_message_view.setText(f"Error displaying commit details.\n{e}")
             # Reset stored hash if parsing failed badly?
             # self._selected_commit_hash_details = None
@@ -601,45 +742,94 @@ class SimpleGitApp(QMainWindow):
             self.clear_diff_view()
             return
 
+        self.diff_label.setText(f"Changes to {file_path} in {commit_hash[:7]}:")
+        self._set_diff_load_rest(None)
+        cached = self._commit_diff_cache.get((commit_hash, file_path))
+        if cached is not None:
+            self.git_scheduler.cancel("diff")  # An earlier click's diff must not replace it
+            self._show_cached_commit_diff(commit_hash, file_path, *cached)
+            return
+
+        # Judged by the path alone; the blobs aren't read for this
+        reason = diff_skip_reason(file_path)
+        if reason:
+            self._show_skipped_diff(
+                reason, lambda: self._show_commit_file_patch(commit_hash, file_path, limited=False)
+            )
+            return
+        self._show_commit_file_patch(commit_hash, file_path, limited=True)
+
+    def _show_commit_file_patch(self, commit_hash: str, file_path: str, limited: bool):
+        """
+        Shows a file's part of the commit's patch. While the patch is being read
+        the file waits for it; files it doesn't hold (very large commits) are
+        streamed from git on their own, within the diff caps if `limited`.
+        """
+        patch = self._commit_patch if commit_hash == self._commit_patch_hash else None
+        text = patch.file_diff(file_path) if patch is not None else None
+        if text is not None:
+            self.git_scheduler.cancel("diff")  # An earlier click's diff must not replace it
+            if len(text) <= PATCH_INLINE_BYTES:
+                self._on_commit_file_patch(DiffDocument(text), commit_hash, file_path)
+            else:
+                self.diff_view.setText(f"Loading diff for {file_path} in commit {commit_hash[:7]}...")
+                self._start_git_thread(
+                    None,
+                    "Commit Diff",
+                    parser_slot=lambda document: self._on_commit_file_patch(document, commit_hash, file_path),
+                    key="diff",
+                    function=lambda: DiffDocument(text),
+                )
+            return
+        self.diff_view.setText(f"Loading diff for {file_path} in commit {commit_hash[:7]}...")
+        if commit_hash == self._commit_patch_hash and self._commit_patch_loading:
+            self.git_scheduler.cancel("diff")
+            self._commit_patch_waiting = (file_path, limited)
+            return
+
         # Don't run if busy
         if not self._can_run_git_command(
             f"show diff for {file_path} in {commit_hash[:7]}"
         ):
             return
-
-        self.diff_view.setText(
-            f"Loading diff for {file_path} in commit {commit_hash[:7]}..."
+        self._load_commit_file_diff(commit_hash, file_path, limited)
+
+    def _on_commit_file_patch(self, document: DiffDocument, commit_hash: str, file_path: str):
+        self._commit_diff_cache.put((commit_hash, file_path), (document, False))
+        self._display_diff(document)
+
+    def _load_commit_file_diff(
+        self, commit_hash: str, file_path: str, limited: bool, shown_chars: int = 0
+    ):
+        """
+        Streams one file's diff against the commit's first parent (all added for
+        a root commit) from git, into the view and the commit diff cache.
+        """
+        command = COMMIT_PATCH_COMMAND + [commit_hash, "--"] + literal_pathspecs([file_path])
+        self._load_streamed_diff(
+            command,
+            "Commit Diff",
+            limited=limited,
+            shown_chars=shown_chars,
+            cache_key=(commit_hash, file_path),
         )
-        self.diff_label.setText(f"Changes to {file_path} in {commit_hash[:7]}:")
-
-        # Command to show diff for a specific file within a commit vs its first parent
-        # Use hash^! syntax for merges? No, diff vs first parent is more typical for browsing.
-        # Use `git diff <parent> <commit> -- <file>` for robustness against octopus merges?
-        # Simpler: diff commit vs its immediate predecessor `hash^..hash`
-        # Note: This will fail for the initial commit (no parents). Handle this?
-        # Check if commit has parents? `git rev-list --parents -n 1 <hash>`
-        # Alternative: `git show <hash> -- <file>` (includes diff in output, needs parsing)
-
-        # Let's use `git diff <hash>^ <hash> -- <file>` (diff against first parent)
-        # This needs error handling if it's the root commit.
-        # Simpler robust option: `git diff-tree --no-commit-id --patch -r <hash>^ <hash> -- <file>`
-        # Safest might be `git show <hash> -- <file>` and parse the diff section.
 
-        # Using `git diff <hash>^.. <hash>` for now, assuming non-root commit primarily
-        # We will rely on git failing gracefully for the root commit for now.
-        command = ["git", "diff", f"{commit_hash}^..{commit_hash}", "--", file_path]
-
-        # Point parser to the existing diff display function
-        self._start_git_thread(command, "Commit Diff", parser_slot=self._display_diff)
+    def _show_cached_commit_diff(
+        self, commit_hash: str, file_path: str, document: DiffDocument, truncated: bool
+    ):
+        # A truncated diff was streamed; the rest continues after the text the document holds
+        load_rest = lambda: self._load_commit_file_diff(
+            commit_hash, file_path, limited=False, shown_chars=document.length
+        )
+        self._display_diff(document, truncated, load_rest)
 
     # --- Context Menu Slot ---
     def show_status_context_menu(self, point: QPoint):
         # (Unchanged from Step 10)
         source_list = self.sender()
         menu = QMenu(self)
-        if isinstance(source_list, QListWidget):
-            selected_items = source_list.selectedItems()
-            if selected_items:
+        if isinstance(source_list, StatusListView):
+            if source_list.selectionModel().hasSelection():
                 action_text = ""
                 if source_list is self.unstaged_list:
                     action_text = "Discard Changes..."
@@ -658,12 +848,28 @@ class SimpleGitApp(QMainWindow):
 
     def open_repository(self):
         # (Starts refresh chain)
-        if self.current_git_thread:
+        if self.git_scheduler.isWriting():
             return
         path = QFileDialog.getExistingDirectory(self, "Select Git Repository")
         if path:
             git_dir = os.path.join(path, ".git")
             if os.path.isdir(git_dir) or os.path.isfile(git_dir):
+                self._save_history_cache()  # Keep the previous repository's history
+                self.git_scheduler.clear()  # Results for the previous repository are obsolete
+                if self.object_reader:
+                    self.object_reader.close()
+                if self.worktree_status:
+                    self.worktree_status.close()
+                self.object_reader = GitObjectStore(
+                    path, fallback=GitObjectReader(path)  # Started on first use
+                )
+                self.worktree_status = WorkingTreeStatus(path, self.object_reader)
+                self._commit_details_cache.clear()
+                self._commit_diff_cache.clear()
+                self._commit_patch_hash = None
+                self._commit_patch = None
+                self._worktree_patches = {}
+                self._status_git_caches = status_caches_enabled(path)
                 self.repo_path = path
                 self.repo_label.setText(f"Repository: {self.repo_path}")
                 self.status_button.setEnabled(True)
@@ -673,11 +879,15 @@ class SimpleGitApp(QMainWindow):
                 self.fetch_button.setEnabled(True)  # Enable Fetch
                 self.clear_all_views()
                 self.error_output_area.clear()
-                self._is_initial_load_branches = True
-                self._is_initial_load_status = True
-                self._is_initial_load_history = True
-                self.refresh_branches()  # Start chain
+                # Show the cached graph now; the initial load then only adds new commits
+                self._restore_history_cache()
+                # The three loads run concurrently; each panel fills in as its result arrives
+                self.refresh_branches()
+                self.refresh_status()
+                self.update_history()  # Full load, or only new commits on top of the cache
+                self.repo_watcher.start(path)
             else:  # Invalid path
+                self.repo_watcher.stop()
                 self.repo_path = None
                 self.repo_label.setText("Not a valid Git repository.")
                 self.status_button.setEnabled(False)
@@ -726,21 +936,110 @@ class SimpleGitApp(QMainWindow):
         self._start_git_thread(command, "Push")
 
     def refresh_status(self):
-        # (Unchanged)
+        """Computes the status from the index and working tree, asking 'git status' only when needed."""
         if not self._can_run_git_command("refresh status"):
             return
-        self.clear_status_lists()
-        self.clear_diff_view()
+        # The lists stay as they are until the result arrives and then only change where
+        # the status did, so selections survive (e.g. staging part of a multi-selection)
         self.error_output_area.setText("Refreshing status...")
-        self.set_ui_busy(True)
+        self._start_status_job()
+
+    def _start_status_job(self):
+        """Schedules the status computation; the lists are updated when it finishes."""
+        self._status_started = time.perf_counter()
+        # The working tree patches describe the previous status; until this refresh
+        # has read them again, diffs of changed files are read one by one
+        self._worktree_patches = {}
+        self.git_scheduler.cancel("staged patch")
+        self.git_scheduler.cancel("unstaged patch")
+        deferred = self.defer_untracked_check.isChecked()
+        if not self.worktree_status:
+            self._run_git_status(deferred)
+            return
+        worktree_status = self.worktree_status
+        self._start_git_thread(
+            None,
+            "Status",
+            parser_slot=lambda entries: self._on_status_computed(entries, deferred),
+            key="status",
+            function=lambda: worktree_status.compute(include_untracked=not deferred),
+        )
+
+    def _run_git_status(self, deferred: bool):
+        """Runs 'git status --porcelain=v2 -z'; its bytes are parsed into records on the worker thread."""
+        repo_path = self.repo_path
         self._start_git_thread(
-            ["git", "status", "--porcelain=v1", "--untracked-files=normal"],
+            None,
             "Status",
-            parser_slot=self._parse_and_display_status,
+            parser_slot=lambda entries: self._on_status_computed(entries, deferred),
+            key="status",
+            function=lambda: read_status(repo_path, untracked="no" if deferred else "normal"),
+        )
+
+    def _on_status_computed(self, entries, deferred: bool):
+        """Shows a status (in-process or from git), falling back to 'git status' if it couldn't be computed."""
+        if entries is None:
+            self._run_git_status(deferred)
+            return
+        seconds = time.perf_counter() - self._status_started
+        if not deferred:
+            self._display_status(entries)
+            print(f"Status: {seconds * 1000:.0f} ms (tracked and untracked files in one scan)")
+            return
+        self._display_tracked_status(entries)
+        self._status_tracked_seconds = seconds
+        self._start_untracked_job()
+
+    def _start_untracked_job(self, use_git: bool = False):
+        """Second step of a deferred status refresh: lists the untracked files."""
+        repo_path = self.repo_path
+        # With git's untracked cache, a full 'git status' is the fast way to list them
+        # (its tracked part is cheap too with fsmonitor); its other records are ignored
+        function = lambda: read_status(repo_path, untracked="normal")
+        if self.worktree_status and not self._status_git_caches and not use_git:
+            function = self.worktree_status.compute_untracked
+        self._start_git_thread(
+            None,
+            "Untracked Files",
+            parser_slot=self._on_untracked_listed,
+            key="untracked",
+            function=function,
         )
 
+    def _on_untracked_listed(self, entries):
+        if entries is None:  # The in-process walk can't handle this repository
+            self._start_untracked_job(use_git=True)
+            return
+        self._display_untracked_status(entries)
+        total = time.perf_counter() - self._status_started
+        tracked = self._status_tracked_seconds
+        print(
+            f"Status: tracked changes after {tracked * 1000:.0f} ms, untracked files after "
+            f"{total * 1000:.0f} ms; lists usable {(total - tracked) * 1000:.0f} ms sooner"
+        )
+
+    def enable_status_caches(self):
+        """Turns on git's untracked cache (and fsmonitor where supported) for the repository."""
+        if not self._can_run_git_command("enable status caches"):
+            return
+        repo_path = self.repo_path
+        self.error_output_area.setText("Enabling git status caches...")
+        self.set_ui_busy(True)
+        self._start_git_thread(
+            None,
+            "Enable Status Caches",
+            parser_slot=self._on_status_caches_enabled,
+            function=lambda: enable_status_caches(repo_path),
+            read_only=False,  # Writes the repository config and index
+        )
+
+    def _on_status_caches_enabled(self, enabled):
+        self._status_git_caches = True
+        self.error_output_area.setText(f"Enabled for this repository: {', '.join(enabled)}.")
+        QTimer.singleShot(0, self._start_status_job)  # Keeps the message, unlike refresh_status()
+
     def refresh_history(self):
-        """Runs 'git log' for graph and updates the graph widget."""
+        """Loads the first page of history (commit-graph walk or 'git log') into the graph widget."""
         if not self._can_run_git_command("refresh history"):
             return
         # Check if the graph widget exists before proceeding
@@ -750,90 +1049,216 @@ class SimpleGitApp(QMainWindow):
 
         self.clear_history_view()  # Clear graph data immediately
         self.error_output_area.setText("Refreshing history graph...")
-        self.set_ui_busy(True)
+        self.git_scheduler.cancel("history update")  # Superseded by the full reload
+
+        # Pagination is pinned to the commit HEAD points at now (known after the first batch)
+        self._history_tip = None
+        self._history_head = None
+        self._history_paged_count = 0
+        self._history_exhausted = False
+        # With a commit-graph the topology comes from there and the text is loaded
+        # only for rows on screen; otherwise 'git log' provides both
+        tip = resolve_ref(self.repo_path, "HEAD")
+        self._history_walker = self._open_history_walker(tip) if tip else None
+        if self._history_walker:
+            self._history_tip = tip
+            self._history_head = tip
+            self._start_walker_page("History")
+        else:
+            self._start_history_page("HEAD", 0, "History")
+
+    def _open_history_walker(self, tip: str) -> Optional[HistoryWalker]:
+        """Returns a walker over the history from `tip`, or None if the repository has no commit-graph."""
+        graph = CommitGraph.open(self.repo_path)
+        if graph is None:
+            return None  # Without the graph every commit is parsed: 'git log' does that faster
+        try:
+            return HistoryWalker(graph, self.object_reader, tip)
+        except (OSError, ValueError) as e:
+            print(f"Cannot walk history from the commit-graph: {e}")
+            return None
+
+    def load_more_history(self):
+        """Loads the next page of history, continuing below the last loaded commit."""
+        if (
+            not self.repo_path
+            or not self.graph_widget
+            or not self._history_tip
+            or self._history_exhausted
+        ):
+            return
+        # Quietly skip while history is loading; the next scroll will ask again
+        if self.git_scheduler.isActive("history") or self.git_scheduler.isWriting():
+            return
+        if isinstance(self.graph_widget_container, ScrollableCommitGraphWidget):
+            self.graph_widget_container.setHasMoreCommits(False)
+        if self._history_walker is None:
+            # e.g. history restored from the cache; the walker skips what is shown
+            self._history_walker = self._open_history_walker(self._history_tip)
+        if self._history_walker:
+            self._start_walker_page("History Page")
+            return
+        # --skip over what is already shown, walking from the pinned tip so the
+        # pages line up even if HEAD has moved in the meantime
+        self._start_history_page(
+            self._history_tip, self._history_paged_count, "History Page"
+        )
 
-        # Use format string including Parent hashes (%P) and raw date for sorting
-        # Use null character \x00 as separator
-        git_graph_log_format = "%H%x00%P%x00%an%x00%ad%x00%s"
+    def _start_history_page(self, revision: str, skip: int, operation_name: str):
+        """Streams one page (HISTORY_PAGE_SIZE commits) of 'git log' into the graph."""
+        self._history_page_count = 0
         command = [
             "git",
             "log",
-            f"--pretty=format:{git_graph_log_format}",  # <<< Use new format
+            f"--pretty=format:{GIT_GRAPH_LOG_FORMAT}",
             f"--date=raw",  # Use raw timestamp (seconds + timezone)
-            f"--max-count={MAX_LOG_COUNT}",  # Limit for performance
-            "HEAD",  # Log current branch by default
+            f"--max-count={HISTORY_PAGE_SIZE}",  # One page; more is loaded on scroll
+            f"--skip={skip}",
+            revision,
+            "--",  # Don't let the revision be mistaken for a path
             # Consider adding '--all --branches' later to show more complex history
         ]
-        # Point to the new graph parser
+        # Stream the log: commits reach the graph in batches while git is still running
         self._start_git_thread(
-            command, "History", parser_slot=self._parse_and_update_graph
+            command,
+            operation_name,
+            parser_slot=self._on_history_loaded,
+            line_parser=parse_graph_log_line,
+            batch_slot=self._append_history_batch,
+            key="history",  # A full reload supersedes a page still loading
         )
 
-    def _parse_and_update_graph(self, log_output):
-        """Parses git log output (with parents) and updates the graph widget."""
-        # Check if graph widget exists (might fail during init)
-        if not self.graph_widget:
-            print("Error: Graph widget not initialized, cannot parse history.")
-            return
+    def _start_walker_page(self, operation_name: str):
+        """Walks one page (HISTORY_PAGE_SIZE commits) of history from the commit-graph on a worker thread."""
+        walker = self._history_walker
+        skip = self._history_paged_count
 
-        print("Parsing commit data for graph...")
-        commits_data = []
-        separator = "\x00"  # Null character used in format string
-        lines = log_output.strip().split("\n")
+        def walk_page():
+            if walker.produced < skip:
+                walker.skip(skip - walker.produced)  # Pages already shown (from the cache)
+            return walker.next_commits(HISTORY_PAGE_SIZE)
 
-        if not log_output.strip():
-            print("History is empty or git log output was empty.")
-            self.graph_widget.setData([])  # Ensure graph is cleared
+        self._history_page_count = 0
+        self._start_git_thread(
+            None,
+            operation_name,
+            parser_slot=self._on_history_page_walked,
+            key="history",  # A full reload supersedes a page still loading
+            function=walk_page,
+        )
+
+    def _on_history_page_walked(self, commits):
+        """Shows a page of commits from the history walker (topology only; text loads on demand)."""
+        self._append_history_batch(commits)
+        self._on_history_loaded("")
+
+    def load_commit_text(self, commit_hashes):
+        """Loads author and subject of commits the graph shows without them (see text_needed)."""
+        if not self.repo_path or not self.graph_widget or not self.object_reader:
             return
+        reader = self.object_reader
+        self._start_git_thread(
+            None,
+            "Commit Text",
+            parser_slot=self.graph_widget.setCommitText,
+            function=lambda: commit_summaries(reader, commit_hashes),
+        )
 
-        for line in lines:
-            if not line:
-                continue
-            parts = line.split(
-                separator, 4
-            )  # Hash, Parents, Author, Date(ts+tz), Subject
-            if len(parts) == 5:
-                commit_hash = parts[0]
-                parent_hashes = parts[1].split()  # Parents are space-separated
-                author = parts[2]
-                try:
-                    # Date is raw timestamp + timezone offset (e.g., "1678886400 -0700")
-                    # We mainly need the timestamp for sorting.
-                    date_ts = int(parts[3].split()[0])
-                except (ValueError, IndexError):
-                    print(f"Warning: Could not parse date timestamp from: {parts[3]}")
-                    date_ts = 0  # Fallback timestamp
-                subject = parts[4]
-
-                commits_data.append(
-                    {
-                        "hash": commit_hash,
-                        "parents": parent_hashes,
-                        "author": author,
-                        "date_ts": date_ts,  # Store timestamp for sorting
-                        "msg": subject,  # Simplified message for now
-                        # Could add full date string later if needed for display
-                    }
-                )
-            else:
-                print(
-                    f"Warning: Could not parse graph log line (expected 5 parts, got {len(parts)}): {line}"
-                )
+    def _save_history_cache(self):
+        """Writes the loaded history and its layout to the on-disk cache of the current repository."""
+        if not self.repo_path or not self.graph_widget or not self._history_head:
+            return
+        layout = self.graph_widget.graphLayout()
+        save_history_cache(
+            self.repo_path,
+            self.graph_widget.commitsData(),
+            layout.export_state(),
+            {
+                "tip": self._history_tip,
+                "head": self._history_head,
+                "paged_count": self._history_paged_count,
+                "exhausted": self._history_exhausted,
+            },
+        )
 
-        if commits_data:
-            print(f"Updating graph with {len(commits_data)} commits.")
-            # Pass the parsed data to the graph widget
-            self.graph_widget.setData(commits_data)
-        else:
-            print("No valid graph log entries parsed.")
-            self.graph_widget.setData([])  # Ensure graph is cleared if parsing fails
+    def _restore_history_cache(self) -> bool:
+        """Shows the cached history of the current repository, if any. Returns True if restored."""
+        if not self.repo_path or not self.graph_widget:
+            return False
+        cached = load_history_cache(self.repo_path)
+        if not cached:
+            return False
+        commits, layout_state, meta = cached
+        if not commits or not meta["head"] or not meta["tip"]:
+            return False
+        self.graph_widget.restoreData(commits, GraphLayout.from_state(layout_state))
+        # update_history (run by the initial load) continues from the cached head
+        self._history_tip = meta["tip"]
+        self._history_head = meta["head"]
+        self._history_paged_count = meta["paged_count"]
+        self._history_exhausted = meta["exhausted"]
+        if isinstance(self.graph_widget_container, ScrollableCommitGraphWidget):
+            self.graph_widget_container.setHasMoreCommits(not self._history_exhausted)
+        print(f"History restored from cache: {len(commits)} commits.")
+        return True
+
+    def update_history(self):
+        """Brings the graph up to date after HEAD moved, adding only the new commits when possible."""
+        if not self._history_head or not self.graph_widget:
+            if self.git_scheduler.isActive("history"):
+                return  # A full load is already on its way and will show the new HEAD
+            self.refresh_history()  # Nothing to extend yet
+            return
+        if not self._can_run_git_command("update history"):
+            return
+        head = resolve_ref(self.repo_path, "HEAD")
+        if head == self._history_head:
+            return  # Already shown
+        if not head:
+            self._history_head = None
+            self.refresh_history()
+            return
+        self.error_output_area.setText("Updating history graph...")
+        # Checked first, so a HEAD that didn't just move forward (reset, checkout
+        # of an unrelated branch, ...) costs no walk over the differing history.
+        # Pinned to the resolved HEAD so the check and the log see the same commit.
+        shown = self._history_head
+        self._start_git_thread(
+            ["git", "merge-base", "--is-ancestor", shown, head],
+            "History Ancestry",
+            parser_slot=lambda _output: self._start_history_update(shown, head),
+            key="history update",
+        )
+
+    def _start_history_update(self, shown: str, head: str):
+        """Streams the commits `head` has on top of the shown history, to be prepended once all arrived."""
+        commits = []  # Newest first, as git lists them
+        # Prepending doesn't disturb a page being appended, so this may run alongside it
+        self._start_git_thread(
+            [
+                "git",
+                "log",
+                f"--pretty=format:{GIT_GRAPH_LOG_FORMAT}",
+                f"--date=raw",
+                f"{shown}..{head}",
+                "--",
+            ],
+            "History Update",
+            parser_slot=lambda _output: self._prepend_history(commits),
+            line_parser=parse_graph_log_line,
+            batch_slot=commits.extend,
+            key="history update",
+        )
 
     def refresh_branches(self):
         if not self._can_run_git_command("refresh branches"):
             return
-        self.clear_branches_view()
+        # The tree stays as it is until the result arrives and then only changes
+        # where the refs did, so expanded groups and the selection survive
         self.error_output_area.setText("Refreshing branches...")
-        self.set_ui_busy(True)
+        self._start_branches_job()
+
+    def _start_branches_job(self):
         self._start_git_thread(
             [
                 "git",
@@ -844,8 +1269,21 @@ class SimpleGitApp(QMainWindow):
             ],
             "Branches",
             parser_slot=self._parse_and_display_branches,
+            key="branches",
         )
 
+    def _on_repository_changed(self, panels):
+        """Refreshes the panels the file system watcher found affected, without clearing them first."""
+        if not self.repo_path or self.git_scheduler.isWriting():
+            return  # Our own operation: its completion refreshes what it changed
+        print(f"Repository changed on disk, refreshing: {', '.join(panels)}")
+        if "status" in panels:
+            self._start_status_job()
+        if "branches" in panels:
+            self._start_branches_job()
+        if "history" in panels:
+            self.update_history()
+
     def create_new_branch(self):
         if not self._can_run_git_command("create branch"):
             return
@@ -876,40 +1314,34 @@ class SimpleGitApp(QMainWindow):
         self._start_git_thread(["git", "checkout", branch_name], "Checkout")
 
     def on_branch_double_clicked(self, index: QModelIndex):
-        # (Unchanged)
-        item = self.branches_model.itemFromIndex(index)
-        parent = item.parent() if item else None
-        if item and parent and parent.text() == "Local":
-            branch_name = item.data(Qt.ItemDataRole.UserRole)
-            if branch_name:
-                self.checkout_branch(branch_name)
-        elif item:
+        branch_name = self.branches_model.localBranch(index)
+        if branch_name:
+            self.checkout_branch(branch_name)
+        elif index.isValid():
             self.error_output_area.setText(
                 "Can only check out local branches via double-click."
             )
 
+    def _expand_branch_category(self, parent: QModelIndex, first: int, last: int):
+        """Expands 'Local' and 'Remotes' when they appear; remotes stay collapsed until opened."""
+        if parent.isValid():
+            return
+        for row in range(first, last + 1):
+            self.branches_view.expand(self.branches_model.index(row, 0))
+
     def show_diff(self):
         """Shows git diff for the currently selected file in STAGED or UNSTAGED lists."""
-        source_list = None
-        selected_item = None
+        entry = None
         is_staged = False
         is_working_tree_diff = False  # Flag to distinguish from commit diff
 
         # Prioritize selection in status lists
-        if (
-            self.unstaged_list.currentItem()
-            and self.unstaged_list.currentItem().isSelected()
-        ):
-            source_list = self.unstaged_list
-            selected_item = source_list.currentItem()
+        if self.unstaged_list.currentEntry():
+            entry = self.unstaged_list.currentEntry()
             is_staged = False
             is_working_tree_diff = True
-        elif (
-            self.staged_list.currentItem()
-            and self.staged_list.currentItem().isSelected()
-        ):
-            source_list = self.staged_list
-            selected_item = source_list.currentItem()
+        elif self.staged_list.currentEntry():
+            entry = self.staged_list.currentEntry()
             is_staged = True
             is_working_tree_diff = True
 
@@ -918,30 +1350,56 @@ class SimpleGitApp(QMainWindow):
             # Ensure detail file list selection doesn't interfere / clear it?
             # self.detail_files_list.clearSelection() # Optional: enforce single focus
 
-            if not selected_item or not self.repo_path:
-                self.clear_diff_view()
-                return
-
-            file_path = extract_file_path(selected_item.text())
-            if not file_path:
+            if not entry or not self.repo_path:
                 self.clear_diff_view()
                 return
+            file_path = entry.path
 
             if not self._can_run_git_command("show working tree diff"):
                 return
 
             diff_type = "Staged" if is_staged else "Unstaged"
-            self.diff_view.setText(f"Loading {diff_type} diff for {file_path}...")
             self.diff_label.setText(f"{diff_type} Changes to {file_path}:")
+            self._set_diff_load_rest(None)
 
             command = ["git", "diff"]
             if is_staged:
-                command.append("--cached")
-            command.extend(["--", file_path])
-
-            self._start_git_thread(
-                command, "Working Tree Diff", parser_slot=self._display_diff
-            )
+                # A staged rename is diffed against its source (both paths given)
+                command.extend(["--cached", "-M", "--"] + literal_pathspecs(entry.paths))
+            else:
+                command.extend(["--"] + literal_pathspecs([file_path]))
+
+            # Checked on the work tree file (a staged version is nearly always the
+            # same kind of file) before git is started
+            head = read_file_head(os.path.join(self.repo_path, file_path))
+            reason = diff_skip_reason(file_path, head)
+            if reason:
+                self._show_skipped_diff(
+                    reason, lambda: self._load_streamed_diff(command, "Working Tree Diff", limited=False)
+                )
+                return
+            # Sliced from the patch read after the status refresh, if it holds the file
+            # (staged renames name two paths and are always diffed on their own)
+            patch = self._worktree_patches.get("staged" if is_staged else "unstaged")
+            text = None
+            if patch is not None and not (is_staged and entry.orig_path):
+                text = patch.file_diff(file_path)
+            if text is not None:
+                self.git_scheduler.cancel("diff")  # An earlier selection's diff must not replace it
+                if len(text) <= PATCH_INLINE_BYTES:
+                    self._display_diff(DiffDocument(text))
+                    return
+                self.diff_view.setText(f"Loading {diff_type} diff for {file_path}...")
+                self._start_git_thread(
+                    None,
+                    "Working Tree Diff",
+                    parser_slot=self._display_diff,
+                    key="diff",
+                    function=lambda: DiffDocument(text),
+                )
+                return
+            self.diff_view.setText(f"Loading {diff_type} diff for {file_path}...")
+            self._load_streamed_diff(command, "Working Tree Diff", limited=True)
 
         # If no selection in status lists, don't clear diff unless explicitly needed
         # (e.g., if selection is lost in detail list, handled by its itemSelectionChanged)
@@ -950,62 +1408,134 @@ class SimpleGitApp(QMainWindow):
         #    # self.clear_diff_view()
         #    pass
 
+    def _load_streamed_diff(
+        self, command, operation_name: str, limited: bool, shown_chars: int = 0, cache_key=None
+    ):
+        """
+        Streams a git diff command's output into the diff view as it arrives,
+        stopping at DIFF_MAX_BYTES/DIFF_MAX_LINES if `limited`. With shown_chars
+        set, the view already holds that much of the output (a truncated load)
+        and only what follows it is appended. With cache_key set (commit diffs),
+        the result is kept in the commit diff cache.
+        """
+        self._diff_started = shown_chars > 0
+        self._diff_skip_chars = shown_chars
+        self._diff_received_chars = shown_chars
+        self._diff_job = self._start_git_thread(
+            command,
+            operation_name,
+            parser_slot=lambda _stdout: self._on_diff_streamed(command, operation_name, cache_key),
+            batch_slot=self._on_diff_chunks,
+            key="diff",
+            chunked=True,
+            max_bytes=DIFF_MAX_BYTES if limited else None,
+            max_lines=DIFF_MAX_LINES if limited else None,
+        )
+
+    def _on_diff_chunks(self, chunks):
+        """Shows streamed diff text: the first chunk replaces 'Loading...', later ones are appended."""
+        text = "".join(chunks)
+        if self._diff_skip_chars:
+            # The same output again, up to where the truncated load stopped
+            skipped = min(len(text), self._diff_skip_chars)
+            self._diff_skip_chars -= skipped
+            text = text[skipped:]
+        if not text:
+            return
+        self._diff_received_chars += len(text)
+        if self._diff_started:
+            self.diff_view.appendText(text)
+        else:
+            self.diff_view.setDiff(DiffDocument(text))
+            self._diff_started = True
+
+    def _on_diff_streamed(self, command, operation_name: str, cache_key=None):
+        if not self._diff_started:
+            self.diff_view.clear()  # No changes
+        truncated = self._diff_job is not None and self._diff_job.truncated
+        if cache_key is not None:
+            document = self.diff_view.document()
+            # The view may still be indexing the last chunks; their text is counted too
+            size = document.byteSize() + self._diff_received_chars - document.length
+            self._commit_diff_cache.put(cache_key, (document, truncated), size=size)
+        if truncated:
+            shown_chars = self._diff_received_chars
+            self._set_diff_load_rest(
+                lambda: self._load_streamed_diff(
+                    command, operation_name, limited=False, shown_chars=shown_chars, cache_key=cache_key
+                )
+            )
+        else:
+            self._set_diff_load_rest(None)
+
+    def _show_skipped_diff(self, reason: str, load):
+        """Shows why a diff wasn't loaded, with a button to load it anyway."""
+        self.diff_view.setText(f"Diff not loaded: {reason}.")
+        self._set_diff_load_rest(load, "Load Anyway")
+
+    def _set_diff_load_rest(self, load, text: str = "Load Rest"):
+        """Offers `load` (None: nothing left to load) on the diff header's button."""
+        self._diff_load_rest = load
+        self.diff_load_button.setText(text)
+        self.diff_load_button.setEnabled(True)
+        self.diff_load_button.setVisible(load is not None)
+
+    def load_rest_of_diff(self):
+        if self._diff_load_rest is None or not self._can_run_git_command("load the rest of the diff"):
+            return
+        load = self._diff_load_rest
+        self.diff_load_button.setText("Loading...")
+        self.diff_load_button.setEnabled(False)
+        self._diff_load_rest = None
+        load()
+
     def stage_selected_files(self):
         """Runs 'git add' on selected files in the unstaged AND untracked lists."""
         # <<< Get selections from BOTH lists >>>
-        selected_unstaged_items = self.unstaged_list.selectedItems()
-        selected_untracked_items = self.untracked_list.selectedItems()
+        selected_unstaged_paths = [entry.path for entry in self.unstaged_list.selectedEntries()]
+        selected_untracked_paths = [entry.path for entry in self.untracked_list.selectedEntries()]
 
-        # Combine items from both lists
-        all_selected_items = selected_unstaged_items + selected_untracked_items
+        # Combine paths from both lists
+        all_selected_paths = selected_unstaged_paths + selected_untracked_paths
 
-        if not all_selected_items:
+        if not all_selected_paths:
             self.error_output_area.setText("No unstaged or untracked files selected.")
             return  # Exit if nothing is selected in either list
 
         if not self._can_run_git_command("stage files"):
             return
 
-        # Extract unique file paths from all selected items
-        # Use a set to automatically handle duplicates if a file is somehow selected in both (unlikely)
-        files_to_stage_set = set()
-        for item in all_selected_items:
-            path = extract_file_path(item.text())
-            if path:  # Ensure path extraction was successful
-                files_to_stage_set.add(path)
-
-        files_to_stage = list(files_to_stage_set)  # Convert back to list for command
+        # Drop duplicates in case a file is somehow selected in both lists (unlikely)
+        files_to_stage = list(dict.fromkeys(path for path in all_selected_paths if path))
 
         if not files_to_stage:
             self.error_output_area.setText("Could not determine files to stage.")
-            return  # Exit if path extraction failed for all items
+            return
 
         # Proceed with git add command
         self.error_output_area.setText(f"Staging {len(files_to_stage)} file(s)...")
         self.set_ui_busy(True)
         # Use '--' to handle filenames starting with '-'
-        command = ["git", "add", "--"] + files_to_stage
+        command = ["git", "add", "--"] + literal_pathspecs(files_to_stage)
         self._start_git_thread(
             command, "Stage"
         )  # Central handler takes care of refresh
 
     def unstage_selected_files(self):
-        selected_items = self.staged_list.selectedItems()
-        if not selected_items or not self._can_run_git_command("unstage files"):
-            return
-        files = [extract_file_path(item.text()) for item in selected_items]
-        if not files:
+        entries = self.staged_list.selectedEntries()
+        if not entries or not self._can_run_git_command("unstage files"):
             return
-        self.error_output_area.setText(f"Unstaging {len(files)} file(s)...")
+        # Both paths of a rename, so its deletion side is unstaged too
+        files = [path for entry in entries for path in entry.paths]
+        self.error_output_area.setText(f"Unstaging {len(entries)} file(s)...")
         self.set_ui_busy(True)
-        self._start_git_thread(["git", "reset", "HEAD", "--"] + files, "Unstage")
+        self._start_git_thread(
+            ["git", "reset", "HEAD", "--"] + literal_pathspecs(files), "Unstage"
+        )
 
-    def discard_selected_files(self, source_list: QListWidget):
-        selected_items = source_list.selectedItems()
-        if not selected_items or not self._can_run_git_command("discard changes/files"):
-            return
-        files = [extract_file_path(item.text()) for item in selected_items]
-        if not files:
+    def discard_selected_files(self, source_list: StatusListView):
+        files = [entry.path for entry in source_list.selectedEntries()]
+        if not files or not self._can_run_git_command("discard changes/files"):
             return
         num_files, file_plural = len(files), "file" if len(files) == 1 else "files"
         list_sample = (
@@ -1039,12 +1569,12 @@ class SimpleGitApp(QMainWindow):
             return
         self.error_output_area.setText(f"{action_name}ing files...")
         self.set_ui_busy(True)
-        self._start_git_thread(command_base + files, action_name)
+        self._start_git_thread(command_base + literal_pathspecs(files), action_name)
 
     def commit_changes(self):
         if not self._can_run_git_command("commit"):
             return
-        if self.staged_list.count() == 0:
+        if self.staged_model.rowCount() == 0:
             self.error_output_area.setText("Cannot commit: No files staged.")
             return
         commit_message = self.commit_message_box.toPlainText().strip()
@@ -1077,64 +1607,79 @@ class SimpleGitApp(QMainWindow):
         if not self.repo_path:
             self.error_output_area.setText("No repository open.")
             return False
-        if self.current_git_thread and self.current_git_thread.isRunning():
-            running_op = self.current_operation_name or "a Git command"
+        # Reads run alongside each other; only a mutating command locks everything
+        writing_op = self.git_scheduler.writingOperation()
+        if writing_op:
             self.error_output_area.setText(
-                f"Cannot {operation_name}: {running_op} is already running."
+                f"Cannot {operation_name}: {writing_op} is already running."
             )
             return False
         return True
 
-    def _start_git_thread(self, command, operation_name, parser_slot=None):
+    def _start_git_thread(
+        self,
+        command,
+        operation_name,
+        parser_slot=None,
+        line_parser=None,
+        batch_slot=None,
+        key=None,
+        function=None,
+        read_only=None,
+        chunked=False,
+        max_bytes=None,
+        max_lines=None,
+        background=False,
+    ):
+        """
+        Schedules a git command. Its results are routed to parser_slot (and, with
+        line_parser set, streamed in parsed batches to batch_slot). Jobs with the
+        same key supersede each other, so only the latest one's result is shown.
+        With `function` set (and command None), the function runs on a worker
+        thread and its return value is passed to parser_slot instead of stdout
+        (function jobs count as reads unless read_only=False). A `chunked` job
+        streams stdout as text to batch_slot, up to max_bytes/max_lines. A
+        `background` job only starts while nothing else is waiting.
+        """
+        self.git_scheduler.cwd = self.repo_path
+        job = GitJob(
+            command,
+            operation_name,
+            parser_slot=parser_slot,
+            line_parser=line_parser,
+            batch_slot=batch_slot,
+            key=key,
+            read_only=read_only,
+            function=function,
+            chunked=chunked,
+            max_bytes=max_bytes,
+            max_lines=max_lines,
+            background=background,
+        )
+        return self.git_scheduler.submit(job)
+
+    def _on_git_command_batch(self, job, batch):
+        """Forwards a batch of streamed, parsed output to the job's batch slot."""
+        if not job.batch_slot:
+            return
         try:
-            self.current_operation_name = operation_name
-            self._output_parser_slot = parser_slot
-            thread = GitCommandThread(command, self.repo_path)
-            if self.current_git_thread:
-                try:
-                    self.current_git_thread.command_finished.disconnect(
-                        self._on_git_command_finished
-                    )
-                except TypeError:
-                    pass
-            thread.command_finished.connect(self._on_git_command_finished)
-            self.current_git_thread = thread
-            self.current_git_thread.start()
+            job.batch_slot(batch)
         except Exception as e:
-            self.error_output_area.setText(
-                f"Failed to start Git thread for {operation_name}: {e}"
-            )
-            self.current_operation_name = None
-            self.current_git_thread = None
-            self._output_parser_slot = None
-            self.set_ui_busy(False)
+            print(f"Batch Error ({job.operation_name}): {e}")
 
-    # --- Central Finished Slot ---
+    def _on_git_activity_changed(self):
+        """Locks the UI exactly while a mutating command is running or queued."""
+        self.set_ui_busy(self.git_scheduler.isWriting())
 
-    def _on_git_command_finished(self, finished_thread, success, stdout, stderr):
-        """Central handler for when any GitCommandThread finishes."""
-        if finished_thread != self.current_git_thread:
-            print(f"Ignoring finished signal from unexpected thread: {finished_thread}")
-            return
+    # --- Central Finished Slot ---
 
-        op_name = self.current_operation_name
-        parser = self._output_parser_slot
-        initial_load_branches = self._is_initial_load_branches and op_name == "Branches"
-        initial_load_status = self._is_initial_load_status and op_name == "Status"
-        initial_load_history = self._is_initial_load_history and op_name == "History"
+    def _on_git_command_finished(self, job, success, stdout, stderr):
+        """Central handler for when any scheduled git command finishes."""
+        op_name = job.operation_name
+        parser = job.parser_slot
 
         print(f"Git command finished: {op_name}, Success: {success}")
 
-        self.current_git_thread = None
-        self.current_operation_name = None
-        self._output_parser_slot = None
-        if initial_load_branches:
-            self._is_initial_load_branches = False
-        if initial_load_status:
-            self._is_initial_load_status = False
-        if initial_load_history:
-            self._is_initial_load_history = False
-
         error_occurred = not success
         post_action_refresh_status = False
         post_action_refresh_history = False
@@ -1143,7 +1688,7 @@ class SimpleGitApp(QMainWindow):
         if success:
             if parser:
                 try:
-                    parser(stdout)
+                    parser(job.result if job.function is not None else stdout)
                 except Exception as e:
                     self.error_output_area.setText(
                         f"Error processing output for {op_name}: {e}"
@@ -1183,20 +1728,21 @@ class SimpleGitApp(QMainWindow):
                     )
             elif op_name == "Create Branch":
                 post_action_refresh_branches = True
-            elif op_name == "Branches" and initial_load_branches:
-                post_action_refresh_status = True
-            elif op_name == "Status" and initial_load_status:
-                post_action_refresh_history = True
             elif op_name in ["Stage", "Unstage", "Discard", "Clean"]:
                 post_action_refresh_status = True
             elif op_name in ["Diff", "Show Commit", "Commit Diff", "Working Tree Diff"]:
                 pass  # No automatic refreshes needed
 
-            if op_name == "Status":  # Update clean message
+            # Update clean message (unless a fallback or untracked scan is still to come)
+            if (
+                op_name in ("Status", "Untracked Files")
+                and not self.git_scheduler.isActive("status")
+                and not self.git_scheduler.isActive("untracked")
+            ):
                 is_clean = (
-                    self.staged_list.count() == 0
-                    and self.unstaged_list.count() == 0
-                    and self.untracked_list.count() == 0
+                    self.staged_model.rowCount() == 0
+                    and self.unstaged_model.rowCount() == 0
+                    and self.untracked_model.rowCount() == 0
                 )
                 if is_clean:
                     self.error_output_area.setText("Working tree clean.")
@@ -1220,6 +1766,9 @@ class SimpleGitApp(QMainWindow):
                 or "Repository not found" in stderr
             ):
                 error_message = f"{op_name} failed: Authentication/permission issue. Check credentials/keys/URL.\nDetails:\n{stderr.strip()}"
+            elif op_name == "History Ancestry" and not stderr.strip():
+                # Exit status 1: the shown history is no longer an ancestor of HEAD
+                print("History diverged from HEAD, reloading the graph.")
             elif (
                 op_name == "Commit Diff"
                 and "unknown revision or path not in the working tree" in stderr
@@ -1242,6 +1791,12 @@ class SimpleGitApp(QMainWindow):
                 self.clear_diff_view()
             if op_name == "History":
                 self.clear_history_view()
+            if op_name == "History Page":
+                self._history_exhausted = True  # Don't keep retrying a failing page
+            if op_name in ("History Ancestry", "History Update"):
+                # Diverged, or the previously shown head no longer exists; reload from scratch
+                self._history_head = None
+                post_action_refresh_history = True
             if op_name == "Show Commit":  # Clear detail view and revert stack on error
                 self._show_commit_detail_view(False)
                 self._selected_commit_hash_details = None
@@ -1255,287 +1810,178 @@ class SimpleGitApp(QMainWindow):
             QTimer.singleShot(delay, self.refresh_status)
             delay += 20
         if post_action_refresh_history:
-            QTimer.singleShot(delay, self.refresh_history)
+            # Extends the graph when HEAD only moved forward, else reloads it
+            QTimer.singleShot(delay, self.update_history)
             delay += 20
 
-        # --- Update UI Busy State ---
-        # Unlock UI only if no further actions are queued
-        if (
-            not post_action_refresh_status
-            and not post_action_refresh_history
-            and not post_action_refresh_branches
-        ):
-            # Use QTimer to ensure unlock happens after potential signal processing
-            QTimer.singleShot(0, lambda: self.set_ui_busy(False))
-        else:
-            # If actions are queued, just update button states for now
-            QTimer.singleShot(0, self.update_button_states)
+        # --- Update UI State ---
+        # The busy lock follows the scheduler (see _on_git_activity_changed)
+        QTimer.singleShot(0, self.update_button_states)
 
     # --- Parsing / Display Slots ---
 
-    def _parse_and_display_status(self, status_output):
-        self.clear_status_lists()
-        staged, unstaged, untracked = [], [], []
-        lines = status_output.strip().split("\n")
-        for line in lines:  # ... (rest of parsing logic) ...
-            if not line:
-                continue
-            xy_status = line[:2]
-            path = extract_file_path(line)
-            index_status, work_tree_status = xy_status[0], xy_status[1]
-            if xy_status == "??":
-                untracked.append(path)
+    def _display_status(self, entries):
+        """Updates the status lists from StatusEntry records (in-process or 'git status')."""
+        # Only these states are listed (e.g. unmerged or type changed entries aren't).
+        # The models take path-sorted rows and only signal what differs from the
+        # rows already shown, so unchanged files keep their selection.
+        self._display_tracked_status(entries)
+        self._display_untracked_status(entries)
+
+    def _display_tracked_status(self, entries):
+        """Updates the staged and unstaged lists; untracked records are ignored."""
+        staged, unstaged = [], []
+        for entry in entries:
+            if entry.kind in ("1", "2"):
+                if entry.index_code in "MADRC":
+                    staged.append((entry.index_code, entry))
+                if entry.worktree_code in "MD":
+                    unstaged.append((entry.worktree_code, entry))
+        self.staged_model.setEntries(sorted(staged, key=lambda row: row[1].path))
+        self.unstaged_model.setEntries(sorted(unstaged, key=lambda row: row[1].path))
+        self._load_worktree_patches(staged=bool(staged), unstaged=bool(unstaged))
+
+    def _load_worktree_patches(self, staged: bool, unstaged: bool):
+        """
+        Reads all staged and all unstaged changes as two patches indexed by path,
+        as background jobs, so selecting a changed file slices its diff instead
+        of starting git. Generated files are left out (they're skipped anyway).
+        """
+        repo_path = self.repo_path
+        exclude = generated_exclude_pathspecs()
+        for side, wanted in (("staged", staged), ("unstaged", unstaged)):
+            if not wanted:
                 continue
-            if index_status in "MADRC":
-                staged.append(f"{index_status}  {path}")
-            if work_tree_status in "MD":
-                unstaged.append(f"{work_tree_status}  {path}")
-            if index_status == "A" and work_tree_status == "M":
-                if f"M  {path}" not in unstaged:
-                    unstaged.append(f"M  {path}")
-        if staged:
-            self.staged_list.addItems(sorted(staged))
-        if unstaged:
-            self.unstaged_list.addItems(sorted(unstaged))
-        if untracked:
-            self.untracked_list.addItems(sorted(untracked))
-
-    def _parse_and_update_graph(
-        self, log_output: str
-    ):  # <<< This is the active parser for the graph
-        """Parses git log output (with parents) and updates the graph widget."""
-        # Check if graph widget exists (might fail during init)
-        if not self.graph_widget:
-            print("Error: Graph widget not initialized, cannot parse history.")
-            return
 
-        print("Parsing commit data for graph...")
-        commits_data = []
-        separator = "\x00"  # Null character used in format string
-        lines = log_output.strip().split("\n")
+            def read(side=side):
+                try:
+                    return read_worktree_patch(repo_path, side == "staged", exclude, WORKTREE_PATCH_MAX_BYTES)
+                except Exception as e:
+                    # The files are then diffed one by one
+                    print(f"Reading the {side} patch failed: {e}")
+                    return None
 
-        if not log_output.strip():
-            print("History is empty or git log output was empty.")
-            # Ensure graph is cleared if no data
-            if self.graph_widget:
-                self.graph_widget.setData([])
+            self._start_git_thread(
+                None,
+                "Working Tree Patch",
+                parser_slot=lambda patch, side=side: self._on_worktree_patch(side, patch),
+                key=f"{side} patch",
+                function=read,
+                background=True,
+            )
+
+    def _on_worktree_patch(self, side: str, patch: Optional[PatchIndex]):
+        if patch is None:
             return
+        self._worktree_patches[side] = patch
+        print(
+            f"{side.capitalize()} patch: {len(patch.files)} files, {len(patch.text)} chars"
+            + (" (truncated)" if patch.truncated else "")
+        )
 
-        for line in lines:
-            if not line:
-                continue
-            parts = line.split(
-                separator, 4
-            )  # Hash, Parents, Author, Date(ts+tz), Subject
-            if len(parts) == 5:
-                commit_hash = parts[0]
-                parent_hashes = parts[
-                    1
-                ].split()  # Parents are space-separated if multiple
-                author = parts[2]
-                try:
-                    # Date is raw timestamp + timezone offset (e.g., "1678886400 -0700")
-                    # We mainly need the timestamp for sorting.
-                    date_ts = int(parts[3].split()[0])
-                except (ValueError, IndexError):
-                    print(f"Warning: Could not parse date timestamp from: {parts[3]}")
-                    date_ts = 0  # Fallback timestamp
-                subject = parts[4]
-
-                commits_data.append(
-                    {
-                        "hash": commit_hash,
-                        "parents": parent_hashes,
-                        "author": author,
-                        "date_ts": date_ts,  # Store timestamp for sorting in the layout
-                        "msg": subject,  # Simplified message for now
-                        # Could add full date string later if needed for display
-                    }
-                )
-            else:
-                # Log parsing errors for debugging
-                print(
-                    f"Warning: Could not parse graph log line (expected 5 parts, got {len(parts)}): '{line}'"
-                )
+    def _display_untracked_status(self, entries):
+        """Updates the untracked list; other records are ignored."""
+        untracked = [(UNTRACKED_CODE, entry) for entry in entries if entry.kind == "?"]
+        self.untracked_model.setEntries(sorted(untracked, key=lambda row: row[1].path))
 
-        if commits_data:
-            print(f"Updating graph with {len(commits_data)} commits.")
-            # Pass the parsed data list to the graph widget's setData method
-            if self.graph_widget:
-                self.graph_widget.setData(commits_data)
+    def _append_history_batch(self, commits_batch):
+        """Receives a batch of commits (streamed 'git log' or a walked page) and extends the graph."""
+        if not self.graph_widget:
+            print("Error: Graph widget not initialized, cannot show history.")
+            return
+        if self._history_tip is None and commits_batch:
+            self._history_tip = commits_batch[0]["hash"]  # First commit of page one is HEAD
+            self._history_head = self._history_tip
+        self._history_page_count += len(commits_batch)
+        self._history_paged_count += len(commits_batch)
+        self.graph_widget.appendData(commits_batch)
+
+    def _on_history_loaded(self, _stdout: str):
+        """Called once a page of streaming 'git log' has finished (all batches already delivered)."""
+        if not self.graph_widget:
+            return
+        commit_count = self.graph_widget.commitCount()
+        if commit_count:
+            print(f"History loaded: {commit_count} commits.")
         else:
-            print("No valid graph log entries parsed.")
-            # Ensure graph is cleared if parsing fails for all lines
-            if self.graph_widget:
-                self.graph_widget.setData([])
+            print("History is empty or git log output was empty.")
+        # A short page means we reached the root commit(s)
+        self._history_exhausted = self._history_page_count < HISTORY_PAGE_SIZE
+        if isinstance(self.graph_widget_container, ScrollableCommitGraphWidget):
+            container = self.graph_widget_container
+            has_more = not self._history_exhausted
+            # Deferred so a follow-up page starts after this command is fully finished
+            QTimer.singleShot(0, lambda: container.setHasMoreCommits(has_more))
+
+    def _prepend_history(self, new_commits: List[Dict]):
+        """Prepends the commits HEAD gained since the last refresh (see _start_history_update())."""
+        if new_commits:
+            print(f"Adding {len(new_commits)} new commits to the history graph.")
+            self.graph_widget.prependData(new_commits)
+            self._history_head = new_commits[0]["hash"]
+        if "Updating history graph..." in self.error_output_area.toPlainText():
+            self.error_output_area.clear()
 
     def _parse_and_display_branches(self, refs_output: str):
-        """Parses 'git for-each-ref' output and populates the branches tree model."""
+        """Parses 'git for-each-ref' output and updates the branches tree model."""
         print("Parsing branches data...")
-        self.clear_branches_view()  # Ensure model is clear before populating
-        root_node = self.branches_model.invisibleRootItem()  # Get the hidden root
-
-        # Create top-level category nodes (Local, Remotes)
-        local_node = QStandardItem("Local")
-        local_node.setEditable(False)  # Make category nodes non-editable
-        local_node.setSelectable(False)
-        remotes_root_node = QStandardItem("Remotes")
-        remotes_root_node.setEditable(False)
-        remotes_root_node.setSelectable(False)
-
-        # Dictionary to store remote name nodes (e.g., "origin") to avoid duplicates
-        remote_nodes: Dict[str, QStandardItem] = {}
-
-        lines = refs_output.strip().split("\n")
+        local: List[str] = []
+        remotes: Dict[str, List[str]] = {}  # Map: remote name -> branch names
         current_local_branch: Optional[str] = None  # Track the current branch name
 
-        # Check if the output is empty
-        if not refs_output.strip():
-            print("No branches found or git for-each-ref output was empty.")
-            # Optionally add placeholder items?
-            # root_node.appendRow(local_node) # Still show categories maybe?
-            # root_node.appendRow(remotes_root_node)
-            return
-
-        # Font for highlighting the current branch
-        bold_font = QFont()
-        bold_font.setBold(True)
-
-        has_local = False  # Track if any local branches were added
-        has_remotes = False  # Track if any remote branches were added
-
-        # Process each line from git for-each-ref
-        for line in lines:
+        # Each line is the full ref name, preceded by '*' for the current HEAD
+        for line in refs_output.splitlines():
             if not line:
                 continue  # Skip empty lines
-
-            # Check if this ref is the current HEAD (marked with '*')
             is_head = line.startswith("*")
-            # Get the full ref name (e.g., refs/heads/main, refs/remotes/origin/main)
             ref_name = line.lstrip("*").strip()
-
-            item_text = ref_name  # Default text if parsing fails
-            item_data = ref_name  # Default data (full ref)
-            target_parent_node = None  # Where to add this item
-            item_font = None  # Specific font for the item (e.g., bold for HEAD)
-
-            # --- Parse Local Branches ---
-            if ref_name.startswith("refs/heads/"):
-                branch_name = ref_name[len("refs/heads/") :]
-                item_text = branch_name  # Display only the short name
-                item_data = branch_name  # Store simple name for checkout convenience
-                target_parent_node = local_node  # Add under "Local"
-                has_local = True
+            if ref_name.startswith(LOCAL_PREFIX):
+                branch_name = ref_name[len(LOCAL_PREFIX) :]
+                local.append(branch_name)
                 if is_head:
-                    item_font = bold_font  # Make current branch bold
-                    current_local_branch = branch_name  # Store the current branch
-
-            # --- Parse Remote Branches ---
-            elif ref_name.startswith("refs/remotes/"):
-                # Format: refs/remotes/REMOTE_NAME/BRANCH_NAME...
-                # Handle potential slashes in branch names by splitting only once after remote name
-                remote_part = ref_name[len("refs/remotes/") :]
-                parts = remote_part.split("/", 1)
+                    current_local_branch = branch_name
+            elif ref_name.startswith(REMOTE_PREFIX):
+                # Format: refs/remotes/REMOTE_NAME/BRANCH_NAME, where the branch name may contain slashes
+                parts = ref_name[len(REMOTE_PREFIX) :].split("/", 1)
                 if len(parts) == 2:
-                    remote_name, branch_name = parts
-                    item_text = (
-                        branch_name  # Display the branch name relative to remote
-                    )
-                    item_data = ref_name  # Store the full remote ref name
-                    has_remotes = True
-
-                    # Find or create the node for the remote name (e.g., "origin")
-                    if remote_name not in remote_nodes:
-                        remote_node = QStandardItem(remote_name)
-                        remote_node.setEditable(False)
-                        remote_node.setSelectable(False)
-                        remote_nodes[remote_name] = remote_node
-                        remotes_root_node.appendRow(remote_node)  # Add under "Remotes"
-
-                    target_parent_node = remote_nodes[
-                        remote_name
-                    ]  # Add under the specific remote node
-
-            # --- Create and Add Item if Parsed ---
-            if target_parent_node is not None:
-                item = QStandardItem(item_text)
-                item.setEditable(False)  # Branches shouldn't be renamed here
-                item.setData(
-                    item_data, Qt.ItemDataRole.UserRole
-                )  # Store relevant data (short local name or full remote ref)
-                item.setToolTip(ref_name)  # Show full ref name on hover
-
-                if item_font:
-                    item.setFont(item_font)  # Apply bold font if it's the HEAD
-
-                target_parent_node.appendRow(item)  # Add item to its parent node
-            else:
-                print(f"Warning: Could not parse ref: {ref_name}")
+                    remotes.setdefault(parts[0], []).append(parts[1])
+                else:
+                    print(f"Warning: Could not parse ref: {ref_name}")
 
-        # --- Add Top-Level Nodes to Model ---
-        # Only add categories if they contain branches
-        if has_local:
-            root_node.appendRow(local_node)
-        if has_remotes:
-            root_node.appendRow(remotes_root_node)
-
-        # Expand the tree view to show branches initially (optional)
-        self.branches_view.expandAll()
+        if not local and not remotes:
+            print("No branches found or git for-each-ref output was empty.")
+        # Only the refs that changed since the last refresh are signalled; remote
+        # groups aren't expanded by default, so their branches cost nothing until opened
+        self.branches_model.setBranches(local, remotes, current_local_branch)
         # Store the detected current branch name
         self.current_branch = current_local_branch
-        print(f"Branches parsed. Current branch: {self.current_branch}")
-
-    def _display_diff(self, diff_output: str):
-        """Displays the diff output in the diff_view, with simple syntax highlighting."""
-        # Ensure diff view exists (might not if UI init fails)
-        if not hasattr(self, "diff_view") or not self.diff_view:
-            print("Error: Diff view widget not available.")
-            return
+        print(
+            f"Branches parsed: {len(local)} local, {sum(map(len, remotes.values()))} remote. "
+            f"Current branch: {self.current_branch}"
+        )
 
-        self.diff_view.clear()
-        cursor = self.diff_view.textCursor()
-        for line in diff_output.splitlines():
-            cursor.movePosition(cursor.MoveOperation.End)
-            line_text = line + "\n"  # Add newline back
-            # Get current format to modify, otherwise might inherit previous line's format
-            fmt = (
-                QTextCharFormat()
-            )  # Start fresh or use self.diff_view.currentCharFormat()? Fresh is safer.
-
-            if line.startswith("+"):
-                fmt.setForeground(DIFF_ADDED_COLOR)
-            elif line.startswith("-"):
-                fmt.setForeground(DIFF_REMOVED_COLOR)
-            elif (
-                line.startswith("diff --git")
-                or line.startswith("index ")
-                or line.startswith("---")
-                or line.startswith("+++")
-            ):
-                fmt.setForeground(DIFF_HEADER_COLOR)
-                fmt.setFontWeight(QFont.Weight.Bold)
-            elif line.startswith("@@"):
-                fmt.setForeground(DIFF_HEADER_COLOR)
-                fmt.setFontWeight(QFont.Weight.Normal)
-            else:  # Default line
-                fmt.setForeground(DIFF_DEFAULT_COLOR)
-                fmt.setFontWeight(QFont.Weight.Normal)
-
-            cursor.insertText(line_text, fmt)  # Apply format with text
-        self.diff_view.moveCursor(cursor.MoveOperation.Start)  # Scroll to top
+    def _display_diff(self, document: DiffDocument, truncated: bool = False, load_rest=None):
+        """Shows a diff (already indexed by line) in the diff view; lines are colored as they are painted."""
+        self.diff_view.setDiff(document)
+        self._set_diff_load_rest(load_rest if truncated else None)
 
     # --- UI State & Helpers ---
 
     def clear_status_lists(self):
-        self.staged_list.clear()
-        self.unstaged_list.clear()
-        self.untracked_list.clear()
+        self.staged_model.clear()
+        self.unstaged_model.clear()
+        self.untracked_model.clear()
 
     def clear_history_view(self):
         """Clears the history graph widget."""
         # Check if graph widget exists before calling its method
         if self.graph_widget:
             self.graph_widget.setData([])  # Tell widget to clear its data/drawing
+        self._history_tip = None
+        self._history_head = None
+        self._history_walker = None  # A page still walking keeps its own reference
+        if isinstance(self.graph_widget_container, ScrollableCommitGraphWidget):
+            self.graph_widget_container.setHasMoreCommits(False)
         # Also clear table if it exists as a fallback? No, assume replacement.
 
     def clear_commit_box(self):
@@ -1547,6 +1993,7 @@ class SimpleGitApp(QMainWindow):
     def clear_diff_view(self):
         self.diff_view.clear()
         self.diff_label.setText("Diff:")
+        self._set_diff_load_rest(None)
 
     def clear_all_views(self):
         """Clears status lists, history graph, branches tree, diff view, detail view and commit message box."""
@@ -1567,7 +2014,7 @@ class SimpleGitApp(QMainWindow):
     def update_button_states(self):
         """Enable/disable buttons based on repo status, busy state, selections, etc."""
         repo_loaded = bool(self.repo_path)
-        is_busy = self.current_git_thread and self.current_git_thread.isRunning()
+        is_busy = self.git_scheduler.isWriting()
         current_branch_exists = bool(self.current_branch)
 
         # --- Top Bar Buttons ---
@@ -1576,6 +2023,9 @@ class SimpleGitApp(QMainWindow):
         self.refresh_branches_button.setEnabled(repo_loaded and not is_busy)
         self.new_branch_button.setEnabled(repo_loaded and not is_busy)
         self.fetch_button.setEnabled(repo_loaded and not is_busy)
+        self.status_cache_button.setEnabled(
+            repo_loaded and not is_busy and not self._status_git_caches
+        )
         self.pull_button.setEnabled(
             repo_loaded and not is_busy and current_branch_exists
         )
@@ -1594,18 +2044,18 @@ class SimpleGitApp(QMainWindow):
             self.commit_message_box.setReadOnly(False)  # Re-enable if not busy
 
         # --- State-dependent Buttons ---
-        has_unstaged_selection = len(self.unstaged_list.selectedItems()) > 0
-        has_untracked_selection = len(self.untracked_list.selectedItems()) > 0
+        has_unstaged_selection = self.unstaged_list.selectionModel().hasSelection()
+        has_untracked_selection = self.untracked_list.selectionModel().hasSelection()
         self.stage_button.setEnabled(
             (has_unstaged_selection or has_untracked_selection) and repo_loaded
         )
 
         # Unstage button logic remains the same
-        has_staged_selection = len(self.staged_list.selectedItems()) > 0
+        has_staged_selection = self.staged_list.selectionModel().hasSelection()
         self.unstage_button.setEnabled(has_staged_selection and repo_loaded)
 
         # Commit button logic remains the same
-        has_staged_files = self.staged_list.count() > 0
+        has_staged_files = self.staged_model.rowCount() > 0
         has_commit_message = bool(self.commit_message_box.toPlainText().strip())
         self.commit_button.setEnabled(
             repo_loaded and has_staged_files and has_commit_message
@@ -1613,6 +2063,9 @@ class SimpleGitApp(QMainWindow):
 
     def set_ui_busy(self, busy: bool):
         """Disable/enable UI elements during background operations."""
+        if busy == self._ui_busy:
+            return  # The override cursor is a stack; only push/pop it on changes
+        self._ui_busy = busy
         disabled = busy
         # Top bar buttons
         self.open_button.setDisabled(disabled)
@@ -1623,6 +2076,7 @@ class SimpleGitApp(QMainWindow):
         self.fetch_button.setDisabled(disabled)
         self.pull_button.setDisabled(disabled)
         self.push_button.setDisabled(disabled)
+        self.status_cache_button.setDisabled(disabled or self._status_git_caches)
 
         # Action buttons and commit area
         self.stage_button.setDisabled(disabled)
@@ -1637,9 +2091,6 @@ class SimpleGitApp(QMainWindow):
         self.untracked_list.setEnabled(not disabled)
         if self.graph_widget_container:  # Check if it was initialized successfully
             self.graph_widget_container.setEnabled(not disabled)
-        self.diff_view.setReadOnly(
-            disabled
-        )  # Keep diff view read-only matching busy state
 
         if busy:
             QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
@@ -1653,13 +2104,19 @@ class SimpleGitApp(QMainWindow):
     # --- Application Exit Handling ---
     def closeEvent(self, event):
         wait_cursor = None
-        if self.current_git_thread and self.current_git_thread.isRunning():
-            print(f"Waiting for '{self.current_operation_name}' to finish...")
+        if not self.git_scheduler.isIdle():
+            print("Waiting for running git commands to finish...")
             self.setEnabled(False)
             wait_cursor = QApplication.overrideCursor()
             QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            self.current_git_thread.wait()
+            self.git_scheduler.waitForAll()
             QApplication.restoreOverrideCursor()
+        if self.object_reader:
+            self.object_reader.close()
+        if self.worktree_status:
+            self.worktree_status.close()
+        self.repo_watcher.stop()
+        self._save_history_cache()
         if wait_cursor:
             QApplication.setOverrideCursor(wait_cursor)
             print("Finished. Closing.")
@@ -0,0 +1,59 @@
+# ui/model_rows.py
+
+from typing import Callable, List, Sequence, Tuple
+
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex
+
+
+def row_runs(rows: List[int]) -> List[List[int]]:
+    """Groups ascending row numbers into [first, last] runs of consecutive rows."""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
+
+
+def row_diff_runs(old_keys: Sequence, new_keys: Sequence) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Compares two lists of unique keys in the same order (e.g. sorted paths) and
+    returns (removed runs, inserted runs): the runs of old rows that are gone
+    and of new rows that are new, as positions in old_keys and new_keys.
+    """
+    # Set lookups and list comprehensions keep the comparison fast for
+    # 100k rows; only the rows that differ are visited one by one.
+    new_set = set(new_keys)
+    old_set = set(old_keys)
+    removed = row_runs([row for row, key in enumerate(old_keys) if key not in new_set])
+    inserted = row_runs([row for row, key in enumerate(new_keys) if key not in old_set])
+    return removed, inserted
+
+
+def signal_row_runs(
+    model: QAbstractItemModel,
+    parent: QModelIndex,
+    removed_runs: List[List[int]],
+    inserted_runs: List[List[int]],
+    remove: Callable[[int, int], None],
+    insert: Callable[[int, int], None],
+    offset: int = 0,
+):
+    """
+    Applies the runs from row_diff_runs() to a model: remove(first, last) and
+    insert(first, last) change the model's data for one run (positions in the
+    key lists), and each is wrapped in the model's remove/insert signals for
+    rows offset + first .. offset + last under `parent`.
+    """
+    # Removals from the bottom up, so earlier runs keep their row numbers
+    for first, last in reversed(removed_runs):
+        model.beginRemoveRows(parent, offset + first, offset + last)
+        remove(first, last)
+        model.endRemoveRows()
+    # The remaining rows are all still listed, in order; inserting the new
+    # runs top-down at their final row numbers interleaves them correctly.
+    for first, last in inserted_runs:
+        model.beginInsertRows(parent, offset + first, offset + last)
+        insert(first, last)
+        model.endInsertRows()
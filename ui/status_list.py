@@ -0,0 +1,180 @@
+# ui/status_list.py
+
+import bisect
+from typing import List, Tuple, Iterable, Optional
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QItemSelection, QItemSelectionModel
+from PyQt6.QtWidgets import QListView, QAbstractItemView
+
+from git_ops.porcelain import StatusEntry
+from .model_rows import row_runs, row_diff_runs, signal_row_runs
+
+UNTRACKED_CODE = " "  # Untracked files have no status letter; only the path is shown
+RENAME_CODES = "RC"
+# Above this many separate runs of inserted/removed rows, one model reset is
+# cheaper than signalling (and moving the arrays for) every run; the view then
+# restores its selection by path.
+STATUS_MAX_ROW_RUNS = 500
+STATUS_LAYOUT_BATCH = 2000  # Rows laid out per event loop pass, so huge lists don't freeze the UI
+
+
+class StatusListModel(QAbstractListModel):
+    """
+    One status list (staged, unstaged or untracked files) as a list model.
+
+    Rows are kept sorted by path in parallel arrays: the paths, one status
+    letter per row (a bytearray) and the StatusEntry records the rows were
+    made from, which actions use instead of the displayed text. A refresh
+    doesn't replace the rows: setEntries() compares the new status with the
+    current one and signals only the runs of rows that were removed,
+    inserted or are shown differently (letter or rename source).
+    Unchanged rows keep their model indexes, so the view's selection, current
+    item and scroll position survive, and a refresh that changes nothing
+    causes no view update at all.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths: List[str] = []
+        self._codes = bytearray()
+        self._entries: List[StatusEntry] = []
+
+    # --- Model interface ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            code = chr(self._codes[row])
+            entry = self._entries[row]
+            # Like 'git status': a rename or copy shows its source
+            path = f"{entry.orig_path} -> {entry.path}" if code in RENAME_CODES else entry.path
+            return path if code == UNTRACKED_CODE else f"{code}  {path}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self._paths[row]
+        return None
+
+    # --- Access ---
+
+    def path(self, row: int) -> str:
+        return self._paths[row]
+
+    def entry(self, row: int) -> StatusEntry:
+        return self._entries[row]
+
+    def entries(self, indexes: Iterable[QModelIndex]) -> List[StatusEntry]:
+        """Returns the records of the given indexes in row order (e.g. a view's selection)."""
+        return [self._entries[row] for row in sorted({index.row() for index in indexes})]
+
+    def row_of(self, path: str) -> int:
+        """Returns the row listing `path`, or -1."""
+        row = bisect.bisect_left(self._paths, path)
+        return row if row < len(self._paths) and self._paths[row] == path else -1
+
+    # --- Updates ---
+
+    def clear(self):
+        self.setEntries([])
+
+    def setEntries(self, rows: List[Tuple[str, StatusEntry]]):
+        """Updates the rows to `rows`, a list of (status letter shown, record) sorted by path."""
+        new_paths = [entry.path for _, entry in rows]
+        new_codes = bytearray(ord(code) for code, _ in rows)
+        new_entries = [entry for _, entry in rows]
+        if new_paths == self._paths:
+            self._take_rows(new_codes, new_entries)
+            return
+        removed_runs, inserted_runs = row_diff_runs(self._paths, new_paths)
+        if len(removed_runs) + len(inserted_runs) > STATUS_MAX_ROW_RUNS:
+            self.beginResetModel()
+            self._paths, self._codes, self._entries = new_paths, new_codes, new_entries
+            self.endResetModel()
+            return
+        paths, codes, entries = self._paths, self._codes, self._entries
+
+        def remove(first: int, last: int):
+            del paths[first : last + 1]
+            del codes[first : last + 1]
+            del entries[first : last + 1]
+
+        def insert(first: int, last: int):
+            paths[first:first] = new_paths[first : last + 1]
+            codes[first:first] = new_codes[first : last + 1]
+            entries[first:first] = new_entries[first : last + 1]
+
+        signal_row_runs(self, QModelIndex(), removed_runs, inserted_runs, remove, insert)
+        self._take_rows(new_codes, new_entries)
+
+    def _take_rows(self, new_codes: bytearray, new_entries: List[StatusEntry]):
+        """Takes over letters and records for the same list of paths, signalling the rows shown differently."""
+        old_codes, old_entries = self._codes, self._entries
+        self._codes, self._entries = new_codes, new_entries
+        if new_codes == old_codes and new_entries == old_entries:
+            return
+        changed = [
+            row
+            for row, (old, new) in enumerate(zip(old_entries, new_entries))
+            if old_codes[row] != new_codes[row] or old.orig_path != new.orig_path
+        ]
+        for first, last in row_runs(changed):
+            self.dataChanged.emit(self.index(first), self.index(last))
+
+
+class StatusListView(QListView):
+    """
+    List view for a StatusListModel, set up for very long lists: uniform row
+    sizes and batched layout. If the model resets (too many scattered
+    changes), the selected and current paths are selected again afterwards.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(STATUS_LAYOUT_BATCH)
+        self._selected_before_reset: List[str] = []
+        self._current_before_reset = None
+
+    def setModel(self, model: StatusListModel):
+        super().setModel(model)
+        model.modelAboutToBeReset.connect(self._remember_selection)
+        model.modelReset.connect(self._restore_selection)
+
+    def selectedEntries(self) -> List[StatusEntry]:
+        return self.model().entries(self.selectionModel().selectedIndexes())
+
+    def currentEntry(self) -> Optional[StatusEntry]:
+        """Returns the record of the current row if it is selected, else None."""
+        index = self.currentIndex()
+        if index.isValid() and self.selectionModel().isSelected(index):
+            return self.model().entry(index.row())
+        return None
+
+    def _remember_selection(self):
+        self._selected_before_reset = [entry.path for entry in self.selectedEntries()]
+        index = self.currentIndex()
+        self._current_before_reset = self.model().path(index.row()) if index.isValid() else None
+
+    def _restore_selection(self):
+        model = self.model()
+        selection_model = self.selectionModel()
+        if self._current_before_reset is not None:
+            row = model.row_of(self._current_before_reset)
+            if row >= 0:
+                selection_model.setCurrentIndex(
+                    model.index(row), QItemSelectionModel.SelectionFlag.NoUpdate
+                )
+        selection = QItemSelection()
+        for path in self._selected_before_reset:
+            row = model.row_of(path)
+            if row >= 0:
+                selection.select(model.index(row), model.index(row))
+        if not selection.isEmpty():
+            selection_model.select(selection, QItemSelectionModel.SelectionFlag.Select)
+        self._selected_before_reset = []
+        self._current_before_reset = None
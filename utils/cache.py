@@ -0,0 +1,64 @@
+# utils/cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by total size.
+
+    The size of each value is given by `sizeof` (default: len()), so the same
+    class can bound a cache by bytes (e.g. inflated objects) or by item count
+    (sizeof=lambda value: 1). Values larger than the whole budget aren't cached.
+    """
+
+    def __init__(self, max_size: int, sizeof: Optional[Callable[[Any], int]] = None):
+        self.max_size = max_size
+        self._sizeof = sizeof or len
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes = {}  # Map: key -> size accounted for its value
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    @property
+    def total_size(self) -> int:
+        return self._total
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._items[key]
+            except KeyError:
+                return default
+            self._items.move_to_end(key)  # Most recently used
+            return value
+
+    def put(self, key: Hashable, value: Any, size: Optional[int] = None):
+        """Stores `value`; `size` overrides sizeof (e.g. for a value that is still growing)."""
+        if size is None:
+            size = self._sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self._total -= self._sizes.pop(key)
+                del self._items[key]
+            if size > self.max_size:
+                return
+            self._items[key] = value
+            self._sizes[key] = size
+            self._total += size
+            while self._total > self.max_size:
+                old_key, _old_value = self._items.popitem(last=False)
+                self._total -= self._sizes.pop(old_key)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._total = 0
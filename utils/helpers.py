@@ -1,17 +1,24 @@
-import re
-
-
-def extract_file_path(item_text):
-    """Extracts the file path from the list item text (strips status prefix)."""
-    # Assumes format like "XY  path" or just "path" for untracked
-    # Handle potential 'R path -> newpath' or 'C path -> newpath' in future if needed
-    match = re.match(r"^[ MADRC?]{1,2}\s+(.*)", item_text)
-    if match:
-        path = match.group(1).strip()
-        # Basic handling for rename shown in status like 'R  orig -> new'
-        if " -> " in path:
-            return path.split(" -> ")[-1]
-        return path
-    else:
-        # Handle untracked files or cases where prefix might be missing
-        return item_text.strip()
+def parse_graph_log_line(line):
+    """Parses one 'git log' line (hash, parents, author, raw date, subject separated by NUL) into a commit dict."""
+    if not line:
+        return None
+    parts = line.split("\x00", 4)  # Hash, Parents, Author, Date(ts+tz), Subject
+    if len(parts) != 5:
+        print(
+            f"Warning: Could not parse graph log line (expected 5 parts, got {len(parts)}): '{line}'"
+        )
+        return None
+    try:
+        # Date is raw timestamp + timezone offset (e.g., "1678886400 -0700")
+        # We mainly need the timestamp for sorting.
+        date_ts = int(parts[3].split()[0])
+    except (ValueError, IndexError):
+        print(f"Warning: Could not parse date timestamp from: {parts[3]}")
+        date_ts = 0  # Fallback timestamp
+    return {
+        "hash": parts[0],
+        "parents": parts[1].split(),  # Parents are space-separated if multiple
+        "author": parts[2],
+        "date_ts": date_ts,  # Store timestamp for sorting in the layout
+        "msg": parts[4],  # Simplified message for now
+    }
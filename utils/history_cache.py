@@ -0,0 +1,328 @@
+# utils/history_cache.py
+"""
+On-disk cache of a repository's loaded history (commits + graph layout).
+
+Reopening a repository shows the cached graph at once; afterwards only the
+commits HEAD gained since the cache was written are fetched and laid out.
+
+File format (little-endian), all but the header zlib-compressed:
+    header:  MAGIC, u32 version, u32 hash size in bytes
+    body:    a fixed sequence of sections, each either
+               - an int array:  u32 typecode, u32 count, raw items
+               - a blob:        u32 length, bytes
+Hashes are stored once in a hash table and referenced by index everywhere
+else; author names are deduplicated into their own table.
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from array import array
+from typing import List, Dict, Tuple, Optional, Any
+
+CACHE_MAGIC = b"GAHC"
+CACHE_VERSION = 1
+CACHE_APP_DIR = "git-app"  # Directory below the user's cache directory
+CACHE_COMPRESS_LEVEL = 1  # Fast; the data is mostly hashes which don't compress anyway
+
+_HEADER = struct.Struct("<4sII")
+_U32 = struct.Struct("<I")
+
+
+def history_cache_path(repo_path: str) -> str:
+    """Returns the cache file used for a repository (one file per repository)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    repo_key = hashlib.sha1(os.path.realpath(repo_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_home, CACHE_APP_DIR, "history", f"{repo_key}.bin")
+
+
+# --- Encoding ---
+
+
+class _Writer:
+    """Collects the sections of a cache file body."""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def ints(self, values, typecode: str = "i"):
+        values = values if isinstance(values, array) else array(typecode, values)
+        self.parts.append(struct.pack("<II", ord(values.typecode), len(values)))
+        self.parts.append(values.tobytes())
+
+    def blob(self, data: bytes):
+        self.parts.append(_U32.pack(len(data)))
+        self.parts.append(data)
+
+    def texts(self, values: List[str]):
+        # Fields come from NUL separated 'git log' output, so NUL can't occur in them
+        self.blob("\x00".join(values).encode("utf-8"))
+
+
+class _Reader:
+    """Reads back the sections written by _Writer, in the same order."""
+
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def ints(self) -> array:
+        typecode, count = struct.unpack_from("<II", self.data, self.pos)
+        self.pos += 8
+        values = array(chr(typecode))
+        size = count * values.itemsize
+        values.frombytes(self.data[self.pos : self.pos + size])
+        self.pos += size
+        return values
+
+    def blob(self) -> bytes:
+        (size,) = _U32.unpack_from(self.data, self.pos)
+        self.pos += 4
+        data = bytes(self.data[self.pos : self.pos + size])
+        self.pos += size
+        return data
+
+    def texts(self, count: int) -> List[str]:
+        if not count:
+            self.blob()
+            return []
+        values = self.blob().decode("utf-8").split("\x00")
+        if len(values) != count:
+            raise ValueError("text section has the wrong number of entries")
+        return values
+
+
+def _split_grouped(keys: List[int], counts: array, flat: List[Any]) -> Dict[int, list]:
+    """Inverse of flattening a dict of lists into (keys, counts, flat)."""
+    grouped = {}
+    offset = 0
+    for key, count in zip(keys, counts):
+        grouped[key] = flat[offset : offset + count]
+        offset += count
+    return grouped
+
+
+def save_history_cache(
+    repo_path: str,
+    commits: List[Dict[str, Any]],
+    layout_state: Dict[str, Any],
+    meta: Dict[str, Any],
+) -> bool:
+    """
+    Writes commits (in arrival order), a GraphLayout.export_state() and the
+    pagination state in `meta` (tip, head, paged_count, exhausted). Returns success.
+    """
+    # --- Hash table: loaded commits first, then hashes only the layout knows about ---
+    hash_list = [commit["hash"] for commit in commits]
+    index_of = {commit_hash: index for index, commit_hash in enumerate(hash_list)}
+
+    def hash_index(commit_hash: str) -> int:
+        index = index_of.get(commit_hash)
+        if index is None:
+            index = index_of[commit_hash] = len(hash_list)
+            hash_list.append(commit_hash)
+        return index
+
+    writer = _Writer()
+    # --- Commits ---
+    parent_counts = array("i")
+    parents = array("i")
+    authors: Dict[str, int] = {}
+    author_refs = array("i")
+    for commit in commits:
+        commit_parents = commit.get("parents", ())
+        parent_counts.append(len(commit_parents))
+        parents.extend(hash_index(parent) for parent in commit_parents)
+        if "author" in commit:
+            author_refs.append(authors.setdefault(commit["author"], len(authors)))
+        else:
+            author_refs.append(-1)  # Text not loaded yet (e.g. walked from the commit-graph)
+    writer.ints(parent_counts)
+    writer.ints(parents)
+    writer.ints((commit.get("date_ts", 0) for commit in commits), "q")
+    writer.ints(author_refs)
+    writer.ints([len(authors)])
+    writer.texts(list(authors))
+    writer.texts([commit.get("msg", "") for commit in commits])
+
+    # --- Layout (hashes as indexes, dicts flattened into parallel arrays) ---
+    state = layout_state
+    writer.ints(hash_index(h) for h in state["hashes_down"])
+    writer.ints(hash_index(h) for h in state["hashes_up"])
+    writer.ints(state["lanes_down"])
+    writer.ints(state["lanes_up"])
+    writer.ints(state["edge_child"])
+    writer.ints(state["edge_parent"])
+    writer.ints(state["edge_via"])
+    writer.ints(-1 if h is None else hash_index(h) for h in state["active"])
+    writer.ints(hash_index(h) for h in state["expect"])
+    writer.ints(state["expect"].values())
+    writer.ints(hash_index(h) for h in state["expect_extra"])
+    writer.ints(len(lanes) for lanes in state["expect_extra"].values())
+    writer.ints(lane for lanes in state["expect_extra"].values() for lane in lanes)
+    writer.ints(state["free"])
+    writer.ints(hash_index(h) for h in state["pending"])
+    writer.ints(len(edges) for edges in state["pending"].values())
+    writer.ints(row for edges in state["pending"].values() for row, _via in edges)
+    writer.ints(via for edges in state["pending"].values() for _row, via in edges)
+    writer.ints(state["lane_head"])
+    writer.ints(hash_index(h) for h in state["lane_head"].values())
+    writer.ints(hash_index(h) for h in state["head_lane"])
+    writer.ints(state["head_lane"].values())
+
+    # --- Pagination state ---
+    writer.ints(
+        [
+            hash_index(meta["tip"]) if meta.get("tip") else -1,
+            hash_index(meta["head"]) if meta.get("head") else -1,
+            meta.get("paged_count", 0),
+            1 if meta.get("exhausted") else 0,
+        ]
+    )
+
+    # --- Hash table (last, as the sections above may still add to it) ---
+    try:
+        hash_blob = bytes.fromhex("".join(hash_list))
+    except ValueError:
+        print("Warning: Not caching history, unexpected commit hash format.")
+        return False
+    hash_size = len(hash_blob) // len(hash_list) if hash_list else 20
+    table = _Writer()
+    table.ints([len(hash_list)])
+    table.blob(hash_blob)
+
+    path = history_cache_path(repo_path)
+    temp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        body = zlib.compress(b"".join(table.parts + writer.parts), CACHE_COMPRESS_LEVEL)
+        with open(temp_path, "wb") as cache_file:
+            cache_file.write(_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, hash_size))
+            cache_file.write(body)
+        os.replace(temp_path, path)  # Never leave a half-written cache behind
+    except OSError as e:
+        print(f"Warning: Could not write history cache {path}: {e}")
+        return False
+    print(f"History cache written: {len(commits)} commits -> {path}")
+    return True
+
+
+def load_history_cache(
+    repo_path: str,
+) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]]:
+    """
+    Reads the cache written by save_history_cache.
+    Returns (commits, layout_state, meta), or None if there is no usable cache.
+    """
+    path = history_cache_path(repo_path)
+    try:
+        with open(path, "rb") as cache_file:
+            data = cache_file.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f"Warning: Could not read history cache {path}: {e}")
+        return None
+
+    try:
+        magic, version, hash_size = _HEADER.unpack_from(data, 0)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            print(f"Ignoring history cache {path} (unknown format).")
+            return None
+        reader = _Reader(zlib.decompress(data[_HEADER.size :]))
+
+        # --- Hash table ---
+        (hash_count,) = reader.ints()
+        hex_table = reader.blob().hex()
+        hex_size = hash_size * 2
+        hashes = [hex_table[i : i + hex_size] for i in range(0, len(hex_table), hex_size)]
+        if len(hashes) != hash_count:
+            raise ValueError("hash table has the wrong size")
+
+        # --- Commits ---
+        parent_counts = reader.ints()
+        parents = reader.ints()
+        dates = reader.ints()
+        author_refs = reader.ints()
+        (author_count,) = reader.ints()
+        authors = reader.texts(author_count)
+        authors.append("")  # What author_ref -1 (text not loaded) indexes
+        messages = reader.texts(len(parent_counts))
+        parent_hashes = [hashes[p] for p in parents]
+        parent_lists = []
+        offset = 0
+        for count in parent_counts:
+            parent_lists.append(parent_hashes[offset : offset + count])
+            offset += count
+        commits = [
+            {
+                "hash": commit_hash,
+                "parents": commit_parents,
+                "author": authors[author_ref],
+                "date_ts": date_ts,
+                "msg": message,
+            }
+            for commit_hash, commit_parents, author_ref, date_ts, message in zip(
+                hashes, parent_lists, author_refs, dates, messages
+            )
+        ]
+        if -1 in author_refs:
+            # Leave the text out so the graph fetches it again when shown
+            for commit, author_ref in zip(commits, author_refs):
+                if author_ref < 0:
+                    del commit["author"], commit["msg"]
+
+        # --- Layout ---
+        hashes_down = [hashes[i] for i in reader.ints()]
+        hashes_up = [hashes[i] for i in reader.ints()]
+        lanes_down = reader.ints()
+        lanes_up = reader.ints()
+        edge_child = reader.ints()
+        edge_parent = reader.ints()
+        edge_via = reader.ints()
+        active = [None if i < 0 else hashes[i] for i in reader.ints()]
+        expect_keys = [hashes[i] for i in reader.ints()]
+        expect = dict(zip(expect_keys, reader.ints()))
+        extra_keys = [hashes[i] for i in reader.ints()]
+        extra_counts = reader.ints()
+        expect_extra = _split_grouped(extra_keys, extra_counts, reader.ints().tolist())
+        free = reader.ints().tolist()
+        pending_keys = [hashes[i] for i in reader.ints()]
+        pending_counts = reader.ints()
+        pending_edges = list(zip(reader.ints(), reader.ints()))
+        pending = _split_grouped(pending_keys, pending_counts, pending_edges)
+        lane_head = dict(zip(reader.ints(), (hashes[i] for i in reader.ints())))
+        head_lane_keys = [hashes[i] for i in reader.ints()]
+        head_lane = dict(zip(head_lane_keys, reader.ints()))
+        layout_state = {
+            "hashes_down": hashes_down,
+            "hashes_up": hashes_up,
+            "lanes_down": lanes_down,
+            "lanes_up": lanes_up,
+            "edge_child": edge_child,
+            "edge_parent": edge_parent,
+            "edge_via": edge_via,
+            "active": active,
+            "expect": expect,
+            "expect_extra": expect_extra,
+            "free": free,
+            "pending": pending,
+            "lane_head": lane_head,
+            "head_lane": head_lane,
+        }
+
+        # --- Pagination state ---
+        tip, head, paged_count, exhausted = reader.ints()
+        meta = {
+            "tip": hashes[tip] if tip >= 0 else None,
+            "head": hashes[head] if head >= 0 else None,
+            "paged_count": paged_count,
+            "exhausted": bool(exhausted),
+        }
+    except (struct.error, zlib.error, ValueError, IndexError, UnicodeDecodeError) as e:
+        print(f"Ignoring corrupt history cache {path}: {e}")
+        return None
+    return commits, layout_state, meta